@@ -0,0 +1,209 @@
+# app/analytics.py
+"""
+Vectorized reading analytics (NumPy).
+
+Loaders pull a user's (or a group's) ReadingActivity or library once into
+NumPy arrays; the functions below then work on whole arrays instead of the
+per-row Python loops the endpoints used:
+
+    ActivitySeries     days: datetime64[D] (sorted, unique), pages: int64
+    dense()            pages on every day of a window (zeros filled in)
+    rolling_average    mean pages/day over a trailing window, for every day
+    monthly_totals     pages per calendar month for the last N months
+    project_finishes   days left + finish date for many books at once (insights)
+    percentiles        distribution of a value array
+    library_stats      status counts, recent finishes, pages read (user / profile stats)
+
+Streaks are not recomputed here: they come from the reading-day bitmaps
+(app/reading_bitmap.py). All pure functions take arrays, so they are cheap
+to benchmark without a database (benchmarks/bench_analytics.py).
+"""
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Optional, Sequence
+
+import numpy as np
+from sqlmodel import Session, select, func
+
+from . import reading_bitmap
+from .models import Book, GroupMember, ReadingActivity, UserBook
+
+
+@dataclass
+class ActivitySeries:
+    days: np.ndarray    # datetime64[D], sorted ascending, unique
+    pages: np.ndarray   # int64, pages read on that day
+
+    @classmethod
+    def from_pairs(cls, pairs: Sequence[tuple]) -> "ActivitySeries":
+        """Build from (day, pages) pairs; days may repeat and come in any order."""
+        if not len(pairs):
+            return cls(np.array([], dtype="datetime64[D]"), np.array([], dtype=np.int64))
+        days = np.array([d for d, _ in pairs], dtype="datetime64[D]")
+        pages = np.array([p or 0 for _, p in pairs], dtype=np.int64)
+        unique, inverse = np.unique(days, return_inverse=True)
+        return cls(unique, np.bincount(inverse, weights=pages).astype(np.int64))
+
+    def dense(self, start: np.datetime64, end: np.datetime64) -> np.ndarray:
+        """Pages for every day in [start, end], zeros on days without activity."""
+        n = int((end - start).astype(int)) + 1
+        out = np.zeros(max(n, 0), dtype=np.int64)
+        mask = (self.days >= start) & (self.days <= end)
+        out[(self.days[mask] - start).astype(int)] = self.pages[mask]
+        return out
+
+
+# ── Loaders ───────────────────────────────────────────────────────────────────
+
+def load_user_activity(db: Session, user_id: int, since: Optional[date] = None) -> ActivitySeries:
+    """A user's pages per day (days with pages_read > 0), one grouped query."""
+    day = func.date(ReadingActivity.date)
+    query = (
+        select(day, func.sum(ReadingActivity.pages_read))
+        .where(ReadingActivity.user_id == user_id, ReadingActivity.pages_read > 0)
+        .group_by(day)
+    )
+    if since:
+        query = query.where(ReadingActivity.date >= datetime(since.year, since.month, since.day))
+    return ActivitySeries.from_pairs(db.exec(query).all())
+
+
+def load_group_pages(db: Session, group_id: int, since: date) -> tuple[np.ndarray, np.ndarray]:
+    """
+    (user_ids, pages) for every active member of a group since a date — members
+    without activity get 0. One grouped query.
+    """
+    members = np.array(
+        db.exec(select(GroupMember.user_id).where(
+            GroupMember.group_id == group_id, GroupMember.status == "active",
+        )).all(),
+        dtype=np.int64,
+    )
+    rows = db.exec(
+        select(ReadingActivity.user_id, func.sum(ReadingActivity.pages_read))
+        .where(
+            ReadingActivity.user_id.in_(members.tolist()),
+            ReadingActivity.date >= datetime(since.year, since.month, since.day),
+        )
+        .group_by(ReadingActivity.user_id)
+    ).all() if len(members) else []
+    totals = dict(rows)
+    return members, np.array([int(totals.get(int(uid)) or 0) for uid in members], dtype=np.int64)
+
+
+# ── Vectorized computations ──────────────────────────────────────────────────
+
+def rolling_average(daily: np.ndarray, window: int) -> np.ndarray:
+    """Trailing mean over `window` days for each position (days before the array count as 0)."""
+    csum = np.cumsum(np.concatenate(([0], daily)))
+    ends = np.arange(1, len(daily) + 1)
+    starts = np.maximum(ends - window, 0)
+    return (csum[ends] - csum[starts]) / window
+
+
+def avg_pages_per_day(series: ActivitySeries, today: date, days: int = 30) -> float:
+    """Pages over the last `days` days (inclusive of today - days) / days, like insights."""
+    start = np.datetime64(today) - np.timedelta64(days, "D")
+    mask = series.days >= start
+    return round(float(series.pages[mask].sum()) / days, 1)
+
+
+def monthly_totals(series: ActivitySeries, today: date, months: int = 12) -> dict[str, int]:
+    """Pages per calendar month, for the `months` months ending with today's."""
+    last = np.datetime64(today, "M")
+    first = last - np.timedelta64(months - 1, "M")
+    buckets = series.days.astype("datetime64[M]")
+    mask = buckets >= first
+    index = (buckets[mask] - first).astype(int)
+    totals = np.bincount(index, weights=series.pages[mask], minlength=months)[:months]
+    labels = np.arange(first, last + np.timedelta64(1, "M"))
+    return {str(m): int(t) for m, t in zip(labels, totals)}
+
+
+def project_finishes(
+    current_pages: np.ndarray, total_pages: np.ndarray, avg_per_day: float, today: date,
+) -> tuple[np.ndarray, np.ndarray]:
+    """(days_left, finish dates as datetime64[D]) for many books at once."""
+    pages_left = np.maximum(total_pages - current_pages, 0)
+    if avg_per_day <= 0:
+        days_left = np.full(len(pages_left), -1, dtype=np.int64)
+        return days_left, np.full(len(pages_left), np.datetime64("NaT"), dtype="datetime64[D]")
+    days_left = np.maximum(1, np.rint(pages_left / avg_per_day)).astype(np.int64)
+    return days_left, np.datetime64(today) + days_left.astype("timedelta64[D]")
+
+
+def percentiles(values: np.ndarray, qs: Sequence[int] = (25, 50, 75, 90)) -> dict[str, float]:
+    if not len(values):
+        return {f"p{q}": 0.0 for q in qs}
+    return {f"p{q}": round(float(v), 1) for q, v in zip(qs, np.percentile(values, qs))}
+
+
+def percentile_rank(values: np.ndarray, value: float) -> int:
+    """Share of values strictly below `value`, as a 0-100 integer."""
+    if not len(values):
+        return 0
+    return int(round(float((values < value).mean()) * 100))
+
+
+# ── Summaries ─────────────────────────────────────────────────────────────────
+
+def library_stats(db: Session, user_id: int, now: Optional[datetime] = None) -> dict:
+    """
+    Counts over a user's library from one userbook ⟕ book query. Pages read:
+    `pages_read` counts a finished book at its page count, or at its current
+    page when the book has none; `pages_read_paged` counts it only when it has one.
+    """
+    now = now or datetime.utcnow()
+    rows = db.exec(
+        select(UserBook.status, UserBook.updated_at, UserBook.current_page, Book.total_pages)
+        .outerjoin(Book, Book.id == UserBook.book_id)
+        .where(UserBook.user_id == user_id)
+    ).all()
+    status = np.array([r[0] or "" for r in rows], dtype=object)
+    updated = np.array([r[1] or datetime.min for r in rows], dtype="datetime64[us]")
+    current = np.array([r[2] or 0 for r in rows], dtype=np.int64)
+    total = np.array([r[3] or 0 for r in rows], dtype=np.int64)
+
+    finished, reading = status == "finished", status == "reading"
+    pages_read_paged = int(total[finished].sum() + current[reading].sum())
+    return {
+        "total_books": len(rows),
+        "finished": int(finished.sum()),
+        "reading": int(reading.sum()),
+        "to_read": int((status == "to-read").sum()),
+        "finished_last_30_days": int((finished & (updated >= np.datetime64(now - timedelta(days=30)))).sum()),
+        "finished_this_year": int((finished & (updated >= np.datetime64(datetime(now.year, 1, 1)))).sum()),
+        "pages_read": pages_read_paged + int(current[finished & (total == 0)].sum()),
+        "pages_read_paged": pages_read_paged,
+    }
+
+
+def user_trends(db: Session, user_id: int, today: Optional[date] = None, months: int = 12) -> dict:
+    """Rolling averages, monthly buckets and active-day percentiles for one user, plus bitmap streaks."""
+    today = today or datetime.utcnow().date()
+    series = load_user_activity(db, user_id)
+    end = np.datetime64(today)
+    daily = series.dense(end - np.timedelta64(89, "D"), end)
+    active = series.pages[series.pages > 0]
+    return {
+        "avg_pages_per_day_7": round(float(rolling_average(daily, 7)[-1]), 1),
+        "avg_pages_per_day_30": round(float(rolling_average(daily, 30)[-1]), 1),
+        "avg_pages_per_day_90": round(float(rolling_average(daily, 90)[-1]), 1),
+        "monthly_pages": [{"month": m, "pages_read": p} for m, p in monthly_totals(series, today, months).items()],
+        "active_day_pages": percentiles(active),
+        **reading_bitmap.streaks(db, user_id, today),
+    }
+
+
+def group_distribution(db: Session, group_id: int, user_id: int, today: Optional[date] = None, days: int = 30) -> dict:
+    """Percentiles of member pages over the last `days` days, and where `user_id` sits."""
+    today = today or datetime.utcnow().date()
+    members, pages = load_group_pages(db, group_id, today - timedelta(days=days))
+    mine = pages[members == user_id]
+    return {
+        "members": int(len(members)),
+        "days": days,
+        "pages": percentiles(pages),
+        "my_pages": int(mine[0]) if len(mine) else 0,
+        "my_percentile": percentile_rank(pages, mine[0]) if len(mine) else None,
+    }
@@ -0,0 +1,282 @@
+# app/book_resolver.py
+"""
+Canonical book identity: one Book row per ISBN-13 / Google Books volume.
+
+Book creation used to dedupe ad hoc — add-to-library on an exact `isbn`
+string, set_group_book on isbn and then google_books_id in two unindexed
+queries, crud.create_book not at all — so the catalog collected duplicates
+("0441172717" vs "978-0441172719", or the same volume with and without an
+ISBN) that split reader counts.
+
+Keys (unique indexes, migrations/add_book_canonical_keys.py):
+    book.isbn13            any ISBN-10 / ISBN-13 normalized to 13 digits
+    book.google_books_id   Google volume id, '' stored as NULL
+
+Every creation path calls resolve(), which returns the book holding either
+key or adds a new one (caller commits). Two requests creating the same book
+at once: the loser's insert hits the unique index inside a savepoint and
+resolve() returns the winner's row instead.
+
+Duplicates that predate the keys are folded by merge_duplicates(): per
+cluster of books sharing an ISBN-13 or Google id, the lowest id is kept, its
+empty fields are filled from the others, and UserBook rows and every other
+reference to the book (ReadingGroup.current_book_id, ...) are repointed. A
+user holding the book twice keeps one UserBook (the furthest along); the
+rows referencing the other (notes, journal entries, group posts, reading
+activity) move to it. References are found with models.foreign_keys_to(),
+which the deletion plans (app/deletion.py) use as well.
+
+    python -m app.book_resolver --merge [--dry-run] [--batch-size 200]
+"""
+import argparse
+import re
+from collections import defaultdict
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, func, select
+
+from . import progress_hooks
+from .models import Book, ReadingActivity, UserBook, foreign_keys_to
+
+
+# Fields copied onto the kept book when it has none
+_FILLED = ("author", "cover_url", "description", "total_pages", "publisher",
+           "published_date", "format", "pages_source", "tags", "isbn")
+_STATUS_RANK = {"finished": 2, "reading": 1}
+
+
+# ── Keys ──────────────────────────────────────────────────────────────────────
+
+def compact_isbn(value: Optional[str]) -> Optional[str]:
+    """`value` without hyphens / spaces if it is shaped like an ISBN-10 or -13, else None."""
+    compact = re.sub(r"[\s-]", "", value or "").upper()
+    return compact if re.fullmatch(r"\d{9}[\dX]|\d{13}", compact) else None
+
+
+def isbn13(value: Optional[str]) -> Optional[str]:
+    """An ISBN-10 or ISBN-13 (hyphens / spaces ignored) as 13 digits; None if it is not one."""
+    compact = compact_isbn(value)
+    if compact is None or len(compact) == 13:
+        return compact
+    digits = "978" + compact[:9]
+    check = sum(int(d) * (3 if i % 2 else 1) for i, d in enumerate(digits))
+    return digits + str((10 - check % 10) % 10)
+
+
+def google_id(value: Optional[str]) -> Optional[str]:
+    return (value or "").strip() or None
+
+
+# ── Resolve ───────────────────────────────────────────────────────────────────
+
+def find(db: Session, *, isbn: Optional[str] = None, google_books_id: Optional[str] = None) -> Optional[Book]:
+    """The book holding this ISBN (any form) or Google id — the ISBN match when they differ."""
+    key13, gid = isbn13(isbn), google_id(google_books_id)
+    conditions = ([Book.isbn13 == key13] if key13 else []) + ([Book.google_books_id == gid] if gid else [])
+    if not conditions:
+        return None
+    books = db.exec(select(Book).where(or_(*conditions)).limit(2)).all()
+    return next((b for b in books if key13 and b.isbn13 == key13), books[0] if books else None)
+
+
+def resolve(
+    db: Session,
+    *,
+    title: str,
+    author: Optional[str] = None,
+    isbn: Optional[str] = None,
+    google_books_id: Optional[str] = None,
+    **fields,
+) -> tuple[Book, bool]:
+    """
+    The existing book for this ISBN / Google id, or a new one flushed inside a
+    savepoint (caller commits). Returns (book, created). A found book missing
+    one of the keys gets it, unless another book already holds it.
+    """
+    key13, gid = isbn13(isbn), google_id(google_books_id)
+    book = find(db, isbn=key13, google_books_id=gid)
+    if book is not None:
+        _claim_keys(db, book, key13, gid)
+        return book, False
+
+    book = Book(title=title, author=author, isbn=isbn, isbn13=key13, google_books_id=gid, **fields)
+    try:
+        with db.begin_nested():
+            db.add(book)
+    except IntegrityError:
+        # Created concurrently by another request: the unique key now finds it
+        existing = find(db, isbn=key13, google_books_id=gid)
+        if existing is None:
+            raise
+        return existing, False
+    return book, True
+
+
+def _claim_keys(db: Session, book: Book, key13: Optional[str], gid: Optional[str]) -> None:
+    changed = False
+    if key13 and not book.isbn13 and find(db, isbn=key13) is None:
+        book.isbn13, changed = key13, True
+    if gid and not book.google_books_id and find(db, google_books_id=gid) is None:
+        book.google_books_id, changed = gid, True
+    if changed:
+        db.add(book)
+
+
+# ── Merge ─────────────────────────────────────────────────────────────────────
+
+def duplicate_clusters(db: Session) -> list[list[int]]:
+    """Ids of books sharing an ISBN-13 or Google id, grouped transitively, lowest id first."""
+    parent: dict[int, int] = {}
+
+    def root(i: int) -> int:
+        while parent.setdefault(i, i) != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for column in (Book.isbn13, Book.google_books_id):
+        dup_keys = select(column).where(column.isnot(None)).group_by(column).having(func.count() > 1)
+        first_by_key: dict[str, int] = {}
+        for book_id, key in db.exec(select(Book.id, column).where(column.in_(dup_keys))).all():
+            parent[root(book_id)] = root(first_by_key.setdefault(key, book_id))
+
+    clusters = defaultdict(list)
+    for book_id in parent:
+        clusters[root(book_id)].append(book_id)
+    return sorted((sorted(ids) for ids in clusters.values() if len(ids) > 1), key=lambda ids: ids[0])
+
+
+def _further_along(a: UserBook, b: UserBook) -> UserBook:
+    rank = lambda ub: (_STATUS_RANK.get(ub.status, 0), ub.current_page or 0, ub.updated_at or datetime.min)
+    return a if rank(a) >= rank(b) else b
+
+
+def _repoint(db: Session, column, old_ids: list[int], new_id: int) -> int:
+    """UPDATE column's table SET column = new_id WHERE column IN old_ids. Returns rows changed."""
+    return db.execute(
+        update(column.table).where(column.in_(old_ids)).values({column.name: new_id})
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+
+def _fold_userbook(db: Session, keep: UserBook, drop: UserBook) -> None:
+    """Move every row referencing `drop` (notes, journal, group posts, activity) onto `keep`, then delete it."""
+    activity_fk = ReadingActivity.__table__.c.userbook_id
+    for column in foreign_keys_to(UserBook):
+        if column is not activity_fk:      # merged per day below
+            _repoint(db, column, [drop.id], keep.id)
+    kept_days = {a.day: a for a in db.exec(select(ReadingActivity).where(ReadingActivity.userbook_id == keep.id)).all()}
+    for activity in db.exec(select(ReadingActivity).where(ReadingActivity.userbook_id == drop.id)).all():
+        same_day = kept_days.get(activity.day) if activity.day is not None else None
+        if same_day is not None:
+            same_day.pages_read = (same_day.pages_read or 0) + (activity.pages_read or 0)
+            same_day.current_page = max(same_day.current_page or 0, activity.current_page or 0)
+            db.add(same_day)
+            db.delete(activity)
+        else:
+            activity.userbook_id = keep.id
+            db.add(activity)
+    db.flush()
+    db.delete(drop)
+
+
+def merge_books(db: Session, book_ids: list[int]) -> dict:
+    """Fold book_ids[1:] into book_ids[0]. Caller commits. Returns row counts."""
+    keep, *dups = [db.get(Book, i) for i in book_ids]
+    counts = {"books_deleted": 0, "userbooks_moved": 0, "userbooks_merged": 0}
+
+    # Release the duplicates' keys before the kept book takes them over
+    keys = {"isbn13": keep.isbn13, "google_books_id": keep.google_books_id}
+    for dup in dups:
+        keys["isbn13"] = keys["isbn13"] or dup.isbn13
+        keys["google_books_id"] = keys["google_books_id"] or dup.google_books_id
+        for field in _FILLED:
+            if getattr(keep, field) in (None, "") and getattr(dup, field) not in (None, ""):
+                setattr(keep, field, getattr(dup, field))
+        dup.isbn13 = dup.google_books_id = None
+        db.add(dup)
+    db.flush()
+    keep.isbn13, keep.google_books_id = keys["isbn13"], keys["google_books_id"]
+    db.add(keep)
+
+    held = {ub.user_id: ub for ub in db.exec(select(UserBook).where(UserBook.book_id == keep.id)).all()}
+    dup_ids = [d.id for d in dups]
+    for ub in db.exec(select(UserBook).where(UserBook.book_id.in_(dup_ids)).order_by(UserBook.id)).all():
+        other = held.get(ub.user_id)
+        if other is None:
+            ub.book_id = keep.id
+            db.add(ub)
+            held[ub.user_id] = ub
+            counts["userbooks_moved"] += 1
+            continue
+        winner = _further_along(other, ub)
+        loser = ub if winner is other else other
+        winner.book_id = keep.id
+        db.add(winner)
+        _fold_userbook(db, winner, loser)
+        progress_hooks.on_status_change(db, ub.user_id, loser.status, None, recount=True)
+        held[ub.user_id] = winner
+        counts["userbooks_merged"] += 1
+
+    for column in foreign_keys_to(Book):
+        if column is not UserBook.__table__.c.book_id:     # folded per user above
+            counts[f"{column.table.name}_repointed"] = _repoint(db, column, dup_ids, keep.id)
+    db.flush()
+    for dup in dups:
+        db.delete(dup)
+    counts["books_deleted"] = len(dups)
+    return counts
+
+
+def merge_duplicates(db: Session, batch_size: int = 200, dry_run: bool = False) -> dict:
+    """Merge every duplicate cluster, committing every `batch_size` clusters. Returns totals."""
+    clusters = duplicate_clusters(db)
+    totals = defaultdict(int, clusters=len(clusters))
+    if dry_run:
+        totals["books_deleted"] = sum(len(ids) - 1 for ids in clusters)
+        return dict(totals)
+    for n, ids in enumerate(clusters, 1):
+        for key, value in merge_books(db, ids).items():
+            totals[key] += value
+        if n % batch_size == 0:
+            db.commit()
+    db.commit()
+    return dict(totals)
+
+
+def backfill_keys(db: Session, batch_size: int = 1000) -> int:
+    """Fill isbn13 from isbn and blank google ids with NULL, in batches. Commits. Returns rows changed."""
+    changed, last_id = 0, 0
+    while True:
+        books = db.exec(
+            select(Book).where(Book.id > last_id, or_(Book.isbn13.is_(None), Book.google_books_id == ""))
+            .order_by(Book.id).limit(batch_size)
+        ).all()
+        if not books:
+            return changed
+        for book in books:
+            key13 = book.isbn13 or isbn13(book.isbn)
+            if key13 != book.isbn13 or book.google_books_id == "":
+                book.isbn13, book.google_books_id = key13, google_id(book.google_books_id)
+                db.add(book)
+                changed += 1
+        last_id = books[-1].id
+        db.commit()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Deduplicate the book catalog on ISBN-13 / Google Books id.")
+    parser.add_argument("--merge", action="store_true", help="merge duplicate books into the lowest id")
+    parser.add_argument("--dry-run", action="store_true", help="only count the duplicates")
+    parser.add_argument("--batch-size", type=int, default=200, help="clusters per commit")
+    args = parser.parse_args()
+    if not args.merge:
+        parser.error("nothing to do — pass --merge")
+
+    from .database import engine
+    with Session(engine) as session:
+        print(f"[book_resolver] Merge{' (dry run)' if args.dry_run else ''}: "
+              f"{merge_duplicates(session, args.batch_size, args.dry_run)}")
@@ -0,0 +1,268 @@
+# app/book_search.py
+"""
+Indexed search over the local book catalog (title, author, ISBN).
+
+/books/search and the author-affinity part of /books/recommendations used
+`ILIKE '%q%'`, which no index can serve — every query scanned the catalog.
+Now:
+
+  SQLite     book_fts, an external-content FTS5 table over book(title, author,
+             isbn) kept in step by triggers, with 2/3-character prefix indexes.
+             Ranked by bm25, title weighted over author over isbn.
+  Postgres   GIN index on the 'simple' tsvector of title + author (prefix
+             matching through to_tsquery 'word:*'), plus pg_trgm GIN indexes
+             on title / author that serve the remaining ILIKE substring match.
+             Ranked by ts_rank + trigram similarity.
+  otherwise  (other dialects, or the index not created yet) the old ILIKE scan.
+
+Every query word must match the start of a word in the title or author, so
+"dun herb" finds "Dune" by Frank Herbert. A query that is an ISBN (10 or 13
+digits, hyphens and spaces ignored) also matches book.isbn13 / isbn exactly,
+ranked first.
+
+Indexes: create_index(engine), run by migrations/add_book_search_index.py.
+
+Hybrid search (GET /books/search/unified) answers from this index first and
+asks Google Books only when the catalog has fewer than HYBRID_SEARCH_MIN_LOCAL
+matches; merge() then drops Google volumes already in the catalog (same
+ISBN-13 or google_books_id), so the local book with its id wins.
+"""
+import os
+import re
+import time
+import weakref
+
+from sqlalchemy import or_, text
+from sqlmodel import Session, select
+
+from .book_resolver import compact_isbn, isbn13
+from .models import Book
+
+
+MAX_TOKENS = 8
+HYBRID_MIN_LOCAL: int = int(os.getenv("HYBRID_SEARCH_MIN_LOCAL", "5"))
+# A missing index is probed again after this long (picks up a migration run while the app is up)
+INDEX_REPROBE_SECONDS: int = int(os.getenv("BOOK_SEARCH_INDEX_REPROBE_SECONDS", "60"))
+
+# Shared by the index DDL and the query so Postgres can match the expression index
+_PG_VECTOR = "to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(author, ''))"
+
+# engine -> True once the index is found, else time.monotonic() of the last failed probe
+_ready: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+# ── Query parsing ─────────────────────────────────────────────────────────────
+
+def _tokens(q: str) -> list[str]:
+    return re.findall(r"\w+", q.lower())[:MAX_TOKENS]
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+# ── Index ─────────────────────────────────────────────────────────────────────
+
+_SQLITE_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS book_fts USING fts5(
+        title, author, isbn,
+        content='book', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS book_fts_ai AFTER INSERT ON book BEGIN
+        INSERT INTO book_fts(rowid, title, author, isbn) VALUES (new.id, new.title, new.author, new.isbn);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS book_fts_ad AFTER DELETE ON book BEGIN
+        INSERT INTO book_fts(book_fts, rowid, title, author, isbn) VALUES ('delete', old.id, old.title, old.author, old.isbn);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS book_fts_au AFTER UPDATE OF title, author, isbn ON book BEGIN
+        INSERT INTO book_fts(book_fts, rowid, title, author, isbn) VALUES ('delete', old.id, old.title, old.author, old.isbn);
+        INSERT INTO book_fts(rowid, title, author, isbn) VALUES (new.id, new.title, new.author, new.isbn);
+    END""",
+    "CREATE INDEX IF NOT EXISTS ix_book_isbn ON book (isbn)",
+    "INSERT INTO book_fts(book_fts) VALUES ('rebuild')",
+]
+
+_POSTGRES_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    f"CREATE INDEX IF NOT EXISTS ix_book_search_vector ON book USING gin ({_PG_VECTOR})",
+    "CREATE INDEX IF NOT EXISTS ix_book_title_trgm ON book USING gin (title gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_book_author_trgm ON book USING gin (author gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_book_isbn ON book (isbn)",
+]
+
+
+def create_index(engine) -> list[str]:
+    """Create (or rebuild, on SQLite) the search index. Idempotent. Returns the statements run."""
+    ddl = {"sqlite": _SQLITE_DDL, "postgresql": _POSTGRES_DDL}.get(engine.dialect.name, [])
+    with engine.begin() as conn:
+        for stmt in ddl:
+            conn.execute(text(stmt))
+    _ready.pop(engine, None)
+    return ddl
+
+
+_PROBES = {
+    "sqlite": "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'book_fts'",
+    # similarity() needs pg_trgm; the tsvector match needs its index to be fast
+    "postgresql": (
+        "SELECT 1 FROM pg_extension e, pg_indexes i "
+        "WHERE e.extname = 'pg_trgm' AND i.tablename = 'book' AND i.indexname = 'ix_book_search_vector'"
+    ),
+}
+
+
+def _index_ready(db: Session) -> bool:
+    """
+    Whether create_index() has run on this database. Found is remembered per
+    engine; not found is re-probed after INDEX_REPROBE_SECONDS.
+    """
+    engine = db.get_bind()
+    cached = _ready.get(engine)
+    if cached is True:
+        return True
+    if cached is not None and time.monotonic() - cached < INDEX_REPROBE_SECONDS:
+        return False
+    probe = _PROBES.get(engine.dialect.name)
+    if probe is not None and db.execute(text(probe)).first() is not None:
+        _ready[engine] = True
+        return True
+    _ready[engine] = time.monotonic()
+    return False
+
+
+def _mode(db: Session) -> str:
+    if not _index_ready(db):
+        return "scan"
+    return {"postgresql": "postgres", "sqlite": "fts"}[db.get_bind().dialect.name]
+
+
+def _load(db: Session, ids: list[int]) -> list[Book]:
+    """Books for ids, in the given order."""
+    if not ids:
+        return []
+    books = {b.id: b for b in db.exec(select(Book).where(Book.id.in_(ids))).all()}
+    return [books[i] for i in ids if i in books]
+
+
+# ── Queries ───────────────────────────────────────────────────────────────────
+
+def search(db: Session, q: str, limit: int = 20) -> list[Book]:
+    """Catalog books matching every word of `q` (prefix match), best first."""
+    tokens, isbn = _tokens(q), compact_isbn(q)
+    if not tokens:
+        return []
+
+    exact = db.exec(
+        select(Book.id).where(or_(Book.isbn13 == isbn13(isbn), Book.isbn == isbn)).limit(limit)
+    ).all() if isbn else []
+    mode = _mode(db)
+    if mode == "fts":
+        ids = db.execute(
+            text(
+                "SELECT rowid FROM book_fts WHERE book_fts MATCH :match "
+                "ORDER BY bm25(book_fts, 10.0, 5.0, 1.0) LIMIT :limit"
+            ),
+            {"match": " ".join(f'"{t}"*' for t in tokens), "limit": limit},
+        ).scalars().all()
+    elif mode == "postgres":
+        ids = db.execute(
+            text(
+                f"SELECT id FROM book "
+                f"WHERE {_PG_VECTOR} @@ to_tsquery('simple', :tsq) "
+                f"   OR title ILIKE :pattern OR author ILIKE :pattern "
+                f"ORDER BY ts_rank({_PG_VECTOR}, to_tsquery('simple', :tsq)) "
+                f"       + greatest(similarity(title, :q), similarity(coalesce(author, ''), :q)) DESC, id DESC "
+                f"LIMIT :limit"
+            ),
+            {
+                "tsq": " & ".join(f"{t}:*" for t in tokens),
+                "pattern": f"%{_escape_like(q.strip())}%",
+                "q": q.strip(),
+                "limit": limit,
+            },
+        ).scalars().all()
+    else:
+        pattern = f"%{_escape_like(q.strip())}%"
+        ids = db.exec(
+            select(Book.id)
+            .where(or_(Book.title.ilike(pattern, escape="\\"), Book.author.ilike(pattern, escape="\\")))
+            .order_by(Book.title)
+            .limit(limit)
+        ).all()
+
+    ordered = list(dict.fromkeys([*exact, *ids]))[:limit]
+    return _load(db, ordered)
+
+
+def by_authors(db: Session, authors: list[str], limit: int = 40) -> list[Book]:
+    """Books whose author contains any of the given names (author affinity)."""
+    authors = [a for a in authors if _tokens(a)]
+    if not authors:
+        return []
+    if _mode(db) == "fts":
+        match = " OR ".join(f'author : "{" ".join(_tokens(a))}"' for a in authors)
+        # Unranked, like the ILIKE it replaces: stops at `limit` instead of scoring every match
+        ids = db.execute(
+            text("SELECT rowid FROM book_fts WHERE book_fts MATCH :match LIMIT :limit"),
+            {"match": match, "limit": limit},
+        ).scalars().all()
+        return _load(db, list(ids))
+    # Postgres: served by ix_book_author_trgm
+    return db.exec(
+        select(Book).where(
+            or_(*[Book.author.ilike(f"%{_escape_like(a)}%", escape="\\") for a in authors])
+        ).limit(limit)
+    ).all()
+
+
+# ── Hybrid (catalog + Google Books) ───────────────────────────────────────────
+
+def needs_google(q: str, local_count: int, limit: int) -> bool:
+    """Whether the catalog's answer is too thin to return on its own."""
+    if compact_isbn(q):
+        return local_count == 0
+    return local_count < min(HYBRID_MIN_LOCAL, limit)
+
+
+def _local_result(book: Book) -> dict:
+    return {
+        "source": "local",
+        "id": book.id,
+        "google_books_id": book.google_books_id,
+        "title": book.title,
+        "author": book.author,
+        "cover_url": book.cover_url,
+        "total_pages": book.total_pages,
+        "isbn": book.isbn,
+        "description": book.description,
+        "published_date": book.published_date,
+    }
+
+
+def _google_result(item: dict) -> dict:
+    return {
+        "source": "google",
+        "id": None,
+        "google_books_id": item.get("google_id") or None,
+        "title": item.get("title"),
+        "author": ", ".join(item.get("authors") or []) or None,
+        "cover_url": item.get("cover_url"),
+        "total_pages": item.get("total_pages"),
+        "isbn": item.get("isbn_13") or item.get("isbn_10"),
+        "description": item.get("description"),
+        "published_date": item.get("published_date"),
+    }
+
+
+def merge(local: list[Book], google: list[dict], limit: int) -> list[dict]:
+    """Catalog books first, then Google results (GoogleBookResult dicts) not already among them."""
+    results, seen = [], set()
+    for result in [*map(_local_result, local), *map(_google_result, google)]:
+        keys = {("isbn", isbn13(result["isbn"])), ("gid", result["google_books_id"])}
+        keys = {k for k in keys if k[1]}
+        if keys & seen:
+            continue
+        seen |= keys
+        results.append(result)
+    return results[:limit]
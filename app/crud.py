@@ -1,8 +1,8 @@
 # app/crud.py
 from typing import Optional, List
-from sqlmodel import Session, select
-from . import models
-from datetime import datetime
+from sqlmodel import Session, select, func
+from . import book_resolver, models
+from datetime import date, datetime
 
 # -------- User helpers --------
 def get_user_by_id(db: Session, user_id: int) -> Optional[models.User]:
@@ -39,12 +39,16 @@ def create_book(db: Session, *, title: str, author: Optional[str] = None,
                 description: Optional[str] = None, isbn: Optional[str] = None,
                 cover_url: Optional[str] = None, total_pages: Optional[int] = None,
                 publisher: Optional[str] = None, published_date: Optional[str] = None,
-                format: Optional[str] = None, pages_source: Optional[str] = None) -> models.Book:
-    book = models.Book(
+                format: Optional[str] = None, pages_source: Optional[str] = None,
+                google_books_id: Optional[str] = None) -> models.Book:
+    """Returns the existing book for this ISBN-13 / Google Books id, if any (book_resolver)."""
+    book, _ = book_resolver.resolve(
+        db,
         title=title,
         author=author,
         description=description,
         isbn=isbn,
+        google_books_id=google_books_id,
         cover_url=cover_url,
         total_pages=total_pages,
         publisher=publisher,
@@ -52,7 +56,6 @@ def create_book(db: Session, *, title: str, author: Optional[str] = None,
         format=format,
         pages_source=pages_source
     )
-    db.add(book)
     db.commit()
     db.refresh(book)
     return book
@@ -108,6 +111,62 @@ def update_userbook(db: Session, userbook: models.UserBook, **fields) -> models.
     return userbook
 
 
+# -------- ReadingActivity helpers --------
+def log_pages_read(db: Session, *, user_id: int, userbook_id: int, day: date,
+                   pages_read: int, current_page: int) -> None:
+    """
+    Add pages to the book's ReadingActivity row for `day` in one statement:
+    INSERT ... ON CONFLICT (userbook_id, day) DO UPDATE SET pages_read = pages_read + excluded.pages_read.
+    Concurrent updates cannot create a second row for the same day. Caller commits.
+    Dialects without ON CONFLICT get the old SELECT-then-write (the unique key
+    still rejects a racing duplicate).
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        existing = db.exec(
+            select(models.ReadingActivity).where(
+                models.ReadingActivity.userbook_id == userbook_id,
+                models.ReadingActivity.day == day,
+            )
+        ).first()
+        if existing:
+            existing.pages_read = (existing.pages_read or 0) + pages_read
+            existing.current_page = current_page
+            db.add(existing)
+        else:
+            db.add(models.ReadingActivity(
+                user_id=user_id,
+                userbook_id=userbook_id,
+                date=datetime(day.year, day.month, day.day),
+                day=day,
+                pages_read=pages_read,
+                current_page=current_page,
+            ))
+        return
+
+    table = models.ReadingActivity.__table__
+    stmt = insert(table).values(
+        user_id=user_id,
+        userbook_id=userbook_id,
+        date=datetime(day.year, day.month, day.day),
+        day=day,
+        pages_read=pages_read,
+        current_page=current_page,
+        created_at=datetime.utcnow(),
+    )
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=[table.c.userbook_id, table.c.day],
+        set_={
+            "pages_read": func.coalesce(table.c.pages_read, 0) + stmt.excluded.pages_read,
+            "current_page": stmt.excluded.current_page,
+        },
+    ))
+
+
 # -------- Notes helpers (posts) --------
 def create_note(db: Session, *, user_id: int, text: Optional[str] = None,
                 emotion: Optional[str] = None, userbook_id: Optional[int] = None,
@@ -0,0 +1,326 @@
+# app/deletion.py
+"""
+Set-based cascading deletes for groups and user accounts, run as background jobs.
+
+DELETE /groups/{id} and POST /auth/delete-account/me used to load every dependent
+row and delete it one ORM object at a time, inside the request. Now they record
+a DeletionJob and hand it to the scheduler; run_deletion() then walks a plan of
+steps in foreign-key dependency order:
+
+    (label, Model, condition)            DELETE ... WHERE condition, in chunks
+    (label, Model, condition, values)    UPDATE ... SET values (nullable FKs)
+
+Each chunk is one short transaction — `DELETE WHERE pk IN (<DELETE_CHUNK_SIZE ids>)`
+— followed by a progress/heartbeat commit on the job, so no lock is held for
+long. Steps are idempotent: a job orphaned by a restart is claimed again by
+resume (every minute) and simply re-runs its plan. A job that fails is retried
+the same way after a backoff (RETRY_BACKOFF, doubling per attempt) up to
+DELETION_MAX_ATTEMPTS times; past that, POST /admin/deletion-jobs/{id}/retry
+queues it again. Until a job completes its target stays out of service.
+
+Until the job runs, the request has already taken the target out of service:
+  group   tombstone_group() sets reading_group.deleted_at (every lookup treats
+          the group as gone) and removes its memberships, so nothing new is
+          posted to it or fanned out into it. Rows that still arrive — another
+          worker's membership cache — are caught by re-running the child steps
+          when the final reading_group DELETE hits the foreign key.
+  user    get_current_user() rejects a user with a deletion job; their groups
+          are tombstoned.
+
+New tables that reference reading_group or user must be added to the plans
+(tests/test_deletion.py checks them against models.foreign_keys_to()); rows
+referencing the user's userbooks are found from the models directly.
+"""
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+
+from . import models
+from .group_activity import invalidate_user_groups
+
+
+DELETE_CHUNK_SIZE: int = int(os.getenv("DELETE_CHUNK_SIZE", "1000"))
+
+# A 'running' job whose heartbeat is older than this is treated as orphaned
+STALE_AFTER = timedelta(minutes=5)
+
+# Passes over a group's child tables before giving up on rows that keep arriving
+GROUP_DELETE_ATTEMPTS = 3
+
+# Failed jobs are retried after RETRY_BACKOFF * 2^(attempts - 1), at most MAX_ATTEMPTS runs in all
+MAX_ATTEMPTS: int = int(os.getenv("DELETION_MAX_ATTEMPTS", "5"))
+RETRY_BACKOFF = timedelta(minutes=2)
+
+
+def create_deletion_job(db: Session, kind: str, target_id: int, requested_by: Optional[int]):
+    """Record a queued deletion (commits). Returns the already active job for the same target, if any."""
+    J = models.DeletionJob
+    existing = db.exec(
+        select(J).where(J.kind == kind, J.target_id == target_id, J.status.in_(["queued", "running"]))
+    ).first()
+    if existing:
+        return existing
+    job = J(kind=kind, target_id=target_id, requested_by=requested_by, progress={})
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def tombstone_group(db: Session, group_id: int) -> list[int]:
+    """
+    Take a group out of service until its job deletes it (caller commits, then
+    passes the returned member ids to invalidate_user_groups).
+    """
+    from . import group_discovery
+
+    group = db.get(models.ReadingGroup, group_id)
+    group.deleted_at = group.deleted_at or datetime.utcnow()
+    db.add(group)
+    member_ids = list(db.exec(select(models.GroupMember.user_id).where(models.GroupMember.group_id == group_id)).all())
+    db.execute(
+        delete(models.GroupMember).where(models.GroupMember.group_id == group_id)
+        .execution_options(synchronize_session=False)
+    )
+    group_discovery.untrack_group(db, group_id)
+    return member_ids
+
+
+def user_deletion_requested(db: Session, user_id: int) -> bool:
+    """Whether the user asked for their account to be deleted (a job exists, in any state)."""
+    J = models.DeletionJob
+    return db.exec(select(J.id).where(J.kind == "user", J.target_id == user_id)).first() is not None
+
+
+def serialize_deletion_job(job) -> dict:
+    return {
+        "job_id": job.id,
+        "kind": job.kind,
+        "target_id": job.target_id,
+        "status": job.status,
+        "step": job.step,
+        "rows_deleted": job.rows_deleted,
+        "progress": job.progress or {},
+        "error": job.error,
+        "attempts": job.attempts,
+        "created_at": job.created_at.isoformat() + "Z",
+        "started_at": job.started_at.isoformat() + "Z" if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() + "Z" if job.finished_at else None,
+    }
+
+
+# ── Plans ─────────────────────────────────────────────────────────────────────
+
+def group_plan(group_id: int) -> list[tuple]:
+    """Everything hanging off one reading group, children first."""
+    m = models
+    return [
+        ("group_activity",       m.GroupActivity,      m.GroupActivity.group_id == group_id),
+        ("group_post",           m.GroupPost,          m.GroupPost.group_id == group_id),
+        ("group_member_stats",   m.GroupMemberStats,   m.GroupMemberStats.group_id == group_id),
+        ("group_goal_counter",   m.GroupGoalCounter,   m.GroupGoalCounter.group_id == group_id),
+        ("group_discovery_rank", m.GroupDiscoveryRank, m.GroupDiscoveryRank.group_id == group_id),
+        ("group_member",         m.GroupMember,        m.GroupMember.group_id == group_id),
+        ("reading_group",        m.ReadingGroup,       m.ReadingGroup.id == group_id),
+    ]
+
+
+def user_plan(user_id: int) -> list[tuple]:
+    """Everything a user owns, children first (groups they created are deleted separately, before this)."""
+    m = models
+    own_notes = select(m.Note.id).where(m.Note.user_id == user_id)
+    own_userbooks = select(m.UserBook.id).where(m.UserBook.user_id == user_id)
+    # Whatever still points at the user's userbooks once their own rows are gone
+    userbook_refs = [
+        (f"{c.table.name}.{c.name}", c.table, c.in_(own_userbooks), *([{c.name: None}] if c.nullable else []))
+        for c in m.foreign_keys_to(m.UserBook)
+    ]
+    return [
+        ("notification_log",        m.NotificationLog,   m.NotificationLog.user_id == user_id),
+        ("expo_push_ticket",        m.ExpoPushTicket,    m.ExpoPushTicket.user_id == user_id),
+        ("push_token",              m.PushToken,         m.PushToken.user_id == user_id),
+        ("group_activity",          m.GroupActivity,     m.GroupActivity.user_id == user_id),
+        ("group_post",              m.GroupPost,         m.GroupPost.user_id == user_id),
+        ("group_member_stats",      m.GroupMemberStats,  m.GroupMemberStats.user_id == user_id),
+        ("group_member.invited_by", m.GroupMember,       m.GroupMember.invited_by == user_id, {"invited_by": None}),
+        ("group_member",            m.GroupMember,       m.GroupMember.user_id == user_id),
+        ("follow",                  m.Follow,            or_(m.Follow.follower_id == user_id, m.Follow.followed_id == user_id)),
+        ("like.on_own_notes",       m.Like,              m.Like.note_id.in_(own_notes)),
+        ("comment.on_own_notes",    m.Comment,           m.Comment.note_id.in_(own_notes)),
+        ("like",                    m.Like,              m.Like.user_id == user_id),
+        ("comment",                 m.Comment,           m.Comment.user_id == user_id),
+        ("note",                    m.Note,              m.Note.user_id == user_id),
+        ("journal",                 m.Journal,           m.Journal.user_id == user_id),
+        ("user_reading_stats",      m.UserReadingStats,  m.UserReadingStats.user_id == user_id),
+        ("reading_day_bitmap",      m.ReadingDayBitmap,  m.ReadingDayBitmap.user_id == user_id),
+        ("reading_activity",        m.ReadingActivity,   m.ReadingActivity.user_id == user_id),
+        *userbook_refs,
+        ("userbook",                m.UserBook,          m.UserBook.user_id == user_id),
+        ("broadcast_job.created_by", m.BroadcastJob,     m.BroadcastJob.created_by == user_id, {"created_by": None}),
+        ("user",                    m.User,              m.User.id == user_id),
+    ]
+
+
+# ── Runner ────────────────────────────────────────────────────────────────────
+
+def _record(db: Session, job, label: str, rows: int) -> None:
+    """Heartbeat + progress, committed together with the chunk just processed."""
+    progress = dict(job.progress or {})
+    progress[label] = progress.get(label, 0) + rows
+    job.progress = progress          # reassign: JSON columns do not track in-place changes
+    job.step = label
+    job.rows_deleted += rows
+    job.updated_at = datetime.utcnow()
+    db.add(job)
+    db.commit()
+
+
+def run_step(db: Session, job, label: str, model, condition, values: Optional[dict] = None) -> int:
+    """
+    Apply one plan step DELETE_CHUNK_SIZE rows at a time, committing each chunk.
+    `model` is a model class or a Table. Returns rows affected.
+    """
+    pk = list(getattr(model, "__table__", model).primary_key.columns)[0]
+    total = 0
+    while True:
+        ids = db.exec(select(pk).where(condition).limit(DELETE_CHUNK_SIZE)).all()
+        if not ids:
+            break
+        stmt = update(model).values(**values) if values is not None else delete(model)
+        db.execute(stmt.where(pk.in_(ids)).execution_options(synchronize_session=False))
+        _record(db, job, label, len(ids))
+        total += len(ids)
+        if len(ids) < DELETE_CHUNK_SIZE:
+            break
+    return total
+
+
+def _run_plan(db: Session, job, plan: list[tuple]) -> None:
+    for label, model, condition, *values in plan:
+        run_step(db, job, label, model, condition, values[0] if values else None)
+
+
+def _delete_group(db: Session, job, group_id: int) -> None:
+    member_ids = db.exec(select(models.GroupMember.user_id).where(models.GroupMember.group_id == group_id)).all()
+    *children, group_step = group_plan(group_id)
+    for attempt in range(1, GROUP_DELETE_ATTEMPTS + 1):
+        _run_plan(db, job, children)
+        try:
+            _run_plan(db, job, [group_step])
+            break
+        except IntegrityError:
+            # Rows written for the group since its children were deleted
+            db.rollback()
+            if attempt == GROUP_DELETE_ATTEMPTS:
+                raise
+    invalidate_user_groups(*member_ids)
+
+
+def _delete_user(db: Session, job, user_id: int) -> None:
+    from . import group_goals
+
+    for group_id in db.exec(select(models.ReadingGroup.id).where(models.ReadingGroup.created_by == user_id)).all():
+        _delete_group(db, job, group_id)
+
+    # Goal counters of groups losing this member are re-seeded on next use
+    for group_id in db.exec(
+        select(models.GroupMember.group_id).where(
+            models.GroupMember.user_id == user_id, models.GroupMember.status == "active",
+        )
+    ).all():
+        group_goals.invalidate(db, group_id)
+    db.commit()
+
+    _run_plan(db, job, user_plan(user_id))
+    invalidate_user_groups(user_id)
+
+
+def _claimable(now: datetime):
+    """Queued jobs, orphaned running jobs, and failed jobs with attempts left (backoff is checked by the caller)."""
+    J = models.DeletionJob
+    return or_(
+        J.status == "queued",
+        (J.status == "running") & (J.updated_at < now - STALE_AFTER),
+        (J.status == "failed") & (J.attempts < MAX_ATTEMPTS),
+    )
+
+
+def retry_at(job) -> datetime:
+    """When a failed job is due for its next run."""
+    return (job.updated_at or job.created_at) + RETRY_BACKOFF * 2 ** max(job.attempts - 1, 0)
+
+
+def _claim(db: Session, job_id: int, now: datetime) -> bool:
+    """Atomically move a queued, orphaned or failed job to 'running'."""
+    J = models.DeletionJob
+    result = db.execute(
+        update(J)
+        .where(J.id == job_id, _claimable(now))
+        .values(status="running", updated_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount == 1
+
+
+def run_deletion(job_id: int, now: Optional[datetime] = None) -> None:
+    """Scheduler entry point. Opens its own session; safe to call again after a crash."""
+    from .database import engine
+
+    now = now or datetime.utcnow()
+    with Session(engine) as db:
+        if not _claim(db, job_id, now):
+            return
+        job = db.get(models.DeletionJob, job_id)
+        job.started_at = job.started_at or now
+        db.add(job)
+        db.commit()
+        print(f"[Deletion] Job {job_id} running: {job.kind} {job.target_id}")
+
+        try:
+            if job.kind == "group":
+                _delete_group(db, job, job.target_id)
+            elif job.kind == "user":
+                _delete_user(db, job, job.target_id)
+            else:
+                raise ValueError(f"unknown deletion kind {job.kind!r}")
+            job.status = "completed"
+            job.step = job.error = None
+        except Exception as e:
+            db.rollback()
+            job.status = "failed"
+            job.error = str(e)[:500]
+            job.attempts += 1
+            retry = "retrying later" if job.attempts < MAX_ATTEMPTS else "giving up"
+            print(f"[Deletion] ✗ Job {job_id} failed (attempt {job.attempts}, {retry}): {e}")
+
+        job.finished_at = job.updated_at = datetime.utcnow()
+        db.add(job)
+        db.commit()
+        print(f"[Deletion] Job {job_id} {job.status}: {job.rows_deleted} row(s)")
+
+
+def resumable_deletion_ids(now: Optional[datetime] = None) -> list[int]:
+    """Queued jobs, running jobs whose worker stopped heartbeating, and failed jobs due for a retry."""
+    from .database import engine
+
+    J = models.DeletionJob
+    now = now or datetime.utcnow()
+    with Session(engine) as db:
+        return [
+            job.id for job in db.exec(select(J).where(_claimable(now))).all()
+            if job.status != "failed" or retry_at(job) <= now
+        ]
+
+
+def requeue(db: Session, job) -> None:
+    """Give a failed job a fresh set of attempts (commits). The caller enqueues it."""
+    job.status = "queued"
+    job.attempts = 0
+    job.updated_at = datetime.utcnow()
+    db.add(job)
+    db.commit()
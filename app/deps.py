@@ -5,6 +5,7 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlmodel import Session
 from .database import get_session
 from . import crud, auth
+from .deletion import user_deletion_requested
 
 # Use HTTPBearer to parse the Authorization header (Bearer token)
 bearer_scheme = HTTPBearer(auto_error=False)
@@ -75,6 +76,10 @@ def get_current_user(
     if user is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
 
+    # Deleted accounts linger until their background deletion job has run
+    if user.deletion_requested_at is not None and user_deletion_requested(db, user.id):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Account deleted")
+
     # Touch last_active once per day — keeps the inactivity reminder accurate
     # (login only updates it on re-auth; this covers users with existing sessions)
     from datetime import datetime as _dt
@@ -119,6 +124,8 @@ def get_current_user_optional(
     if user is None and isinstance(sub, str) and "@" in sub:
         user = crud.get_user_by_email(db, email=sub)
 
+    if user is not None and user.deletion_requested_at is not None and user_deletion_requested(db, user.id):
+        return None
     return user
 
 def get_admin_user(
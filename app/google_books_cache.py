@@ -0,0 +1,275 @@
+# app/google_books_cache.py
+"""
+Two-tier cache for the Google Books proxy (/api/googlebooks/search and /book/{id}).
+
+    tier 1  in-process LRU, GOOGLE_BOOKS_LRU_SIZE entries
+    tier 2  google_books_cache table — shared by every worker, survives restarts
+
+Keys are "search:<normalized query>" and "volume:<google id>"; values are the
+processed response the endpoint returns. Freshness depends on the key kind:
+
+    age < TTL                   served
+    TTL <= age < TTL + STALE    served, and refreshed in the background
+                                (stale-while-revalidate)
+    older, or not cached        fetched inline, then stored in both tiers
+
+Within a process, concurrent lookups of the same key share one upstream call
+(single flight): the first caller starts the fetch, the rest await its result.
+A failed fetch is remembered per key for NEGATIVE_TTL (negative cache) — during
+that window its status code and detail are raised again, as a new HTTPException
+each time, without calling Google, and a stale entry is served without another
+refresh attempt. A database error degrades to the LRU alone.
+
+Hit / miss counters are per process — metrics(), GET /admin/googlebooks-cache.
+Rows past TTL + STALE are deleted daily by prune().
+"""
+import asyncio
+import hashlib
+import os
+import threading
+from collections import Counter, OrderedDict
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session
+from starlette.concurrency import run_in_threadpool
+
+from .models import GoogleBooksCache
+
+
+SEARCH_TTL = timedelta(seconds=int(os.getenv("GOOGLE_BOOKS_SEARCH_TTL", str(6 * 3600))))
+VOLUME_TTL = timedelta(seconds=int(os.getenv("GOOGLE_BOOKS_VOLUME_TTL", str(7 * 24 * 3600))))
+STALE_TTL = timedelta(seconds=int(os.getenv("GOOGLE_BOOKS_STALE_TTL", str(7 * 24 * 3600))))
+NEGATIVE_TTL = timedelta(seconds=int(os.getenv("GOOGLE_BOOKS_NEGATIVE_TTL", "60")))
+LRU_SIZE: int = int(os.getenv("GOOGLE_BOOKS_LRU_SIZE", "1024"))
+
+_lru: "OrderedDict[str, tuple[dict, datetime]]" = OrderedDict()
+_lock = threading.Lock()
+_inflight: dict[str, asyncio.Task] = {}
+_negative: dict[str, tuple[int, str, datetime]] = {}      # key -> (status_code, detail, failed at)
+_metrics: Counter = Counter()
+
+
+# ── Keys ──────────────────────────────────────────────────────────────────────
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+def _key(prefix: str, value: str) -> str:
+    key = f"{prefix}:{value}"
+    if len(key) > 255:
+        key = f"{prefix}:sha1:{hashlib.sha1(value.encode()).hexdigest()}"
+    return key
+
+
+def search_key(query: str) -> str:
+    return _key("search", normalize_query(query))
+
+
+def volume_key(google_id: str) -> str:
+    return _key("volume", google_id)
+
+
+def _ttl(key: str) -> timedelta:
+    return SEARCH_TTL if key.startswith("search:") else VOLUME_TTL
+
+
+# ── Tiers ─────────────────────────────────────────────────────────────────────
+
+def _lru_get(key: str) -> Optional[tuple[dict, datetime]]:
+    with _lock:
+        entry = _lru.get(key)
+        if entry:
+            _lru.move_to_end(key)
+        return entry
+
+
+def _lru_put(key: str, payload: dict, fetched_at: datetime) -> None:
+    with _lock:
+        _lru[key] = (payload, fetched_at)
+        _lru.move_to_end(key)
+        while len(_lru) > LRU_SIZE:
+            _lru.popitem(last=False)
+
+
+def _db_get(key: str) -> Optional[tuple[dict, datetime]]:
+    from .database import engine    # deferred: tests swap the engine
+
+    try:
+        with Session(engine) as db:
+            row = db.get(GoogleBooksCache, key)
+            return (row.payload, row.fetched_at) if row else None
+    except Exception as e:
+        _metrics["db_error"] += 1
+        print(f"[GoogleBooksCache] Read failed for {key}: {e}")
+        return None
+
+
+def _db_put(key: str, payload: dict, fetched_at: datetime) -> None:
+    from .database import engine
+
+    try:
+        with Session(engine) as db:
+            db.merge(GoogleBooksCache(key=key, payload=payload, fetched_at=fetched_at))
+            try:
+                db.commit()
+            except IntegrityError:
+                db.rollback()       # another worker stored the same key first
+    except Exception as e:
+        _metrics["db_error"] += 1
+        print(f"[GoogleBooksCache] Write failed for {key}: {e}")
+
+
+# ── Lookup ────────────────────────────────────────────────────────────────────
+
+async def _fetch_and_store(key: str, fetch: Callable[[], Awaitable[dict]]) -> dict:
+    try:
+        payload = await fetch()
+    except Exception as e:
+        _remember_failure(key, e)
+        raise
+    _negative.pop(key, None)
+    fetched_at = datetime.utcnow()
+    _lru_put(key, payload, fetched_at)
+    await run_in_threadpool(_db_put, key, payload, fetched_at)
+    return payload
+
+
+def _start_fetch(key: str, fetch: Callable[[], Awaitable[dict]]) -> asyncio.Task:
+    """The in-flight fetch for `key`, started if there is none (single flight)."""
+    task = _inflight.get(key)
+    if task is not None:
+        _metrics["coalesced"] += 1
+        return task
+
+    def done(t: asyncio.Task) -> None:
+        _inflight.pop(key, None)
+        if not t.cancelled():
+            t.exception()       # retrieved here so a fetch nobody awaits does not warn
+
+    task = asyncio.get_running_loop().create_task(_fetch_and_store(key, fetch))
+    task.add_done_callback(done)
+    _inflight[key] = task
+    return task
+
+
+# ── Negative cache ────────────────────────────────────────────────────────────
+
+def _remember_failure(key: str, error: Exception) -> None:
+    """Keep the status and detail only — an exception instance is not re-raised across requests."""
+    now = datetime.utcnow()
+    if len(_negative) >= LRU_SIZE:
+        for k in [k for k, (_, _, at) in _negative.items() if now - at >= NEGATIVE_TTL]:
+            del _negative[k]
+    if len(_negative) < LRU_SIZE:
+        if isinstance(error, HTTPException):
+            _negative[key] = (error.status_code, error.detail, now)
+        else:
+            _negative[key] = (502, "Google Books API error", now)
+
+
+def _recent_failure(key: str, now: datetime) -> Optional[HTTPException]:
+    """A fresh HTTPException for a failure remembered within NEGATIVE_TTL."""
+    entry = _negative.get(key)
+    if entry and now - entry[2] < NEGATIVE_TTL:
+        return HTTPException(status_code=entry[0], detail=entry[1])
+    return None
+
+
+def _refresh_in_background(key: str, fetch: Callable[[], Awaitable[dict]], now: datetime) -> None:
+    if key in _inflight or _recent_failure(key, now):
+        return
+
+    def done(t: asyncio.Task) -> None:
+        if t.cancelled() or t.exception():
+            _metrics["refresh_error"] += 1
+            print(f"[GoogleBooksCache] Refresh failed for {key}: {None if t.cancelled() else t.exception()}")
+        else:
+            _metrics["refresh"] += 1
+
+    _start_fetch(key, fetch).add_done_callback(done)
+
+
+async def get_or_fetch(
+    key: str, fetch: Callable[[], Awaitable[dict]], now: Optional[datetime] = None,
+) -> dict:
+    """The cached response for `key`, calling `fetch()` on a miss (see module docstring)."""
+    now = now or datetime.utcnow()
+    ttl = _ttl(key)
+    tier = "lru"
+    entry = _lru_get(key)
+    if entry is None or now - entry[1] >= ttl:
+        # Another worker may have refreshed the shared tier
+        stored = await run_in_threadpool(_db_get, key)
+        if stored and (entry is None or stored[1] > entry[1]):
+            entry, tier = stored, "db"
+            _lru_put(key, *stored)
+
+    if entry:
+        age = now - entry[1]
+        if age < ttl:
+            _metrics[f"{tier}_hit"] += 1
+            return entry[0]
+        if age < ttl + STALE_TTL:
+            _metrics["stale_hit"] += 1
+            _refresh_in_background(key, fetch, now)
+            return entry[0]
+
+    failure = _recent_failure(key, now)
+    if failure:
+        _metrics["negative_hit"] += 1
+        raise failure
+    _metrics["miss"] += 1
+    # shield: a caller that disconnects must not cancel the fetch others are awaiting
+    return await asyncio.shield(_start_fetch(key, fetch))
+
+
+def metrics() -> dict:
+    hits = _metrics["lru_hit"] + _metrics["db_hit"] + _metrics["stale_hit"]
+    lookups = hits + _metrics["miss"]
+    return {
+        "lru_hit": _metrics["lru_hit"],
+        "db_hit": _metrics["db_hit"],
+        "stale_hit": _metrics["stale_hit"],
+        "miss": _metrics["miss"],
+        "coalesced": _metrics["coalesced"],
+        "negative_hit": _metrics["negative_hit"],
+        "refresh": _metrics["refresh"],
+        "refresh_error": _metrics["refresh_error"],
+        "db_error": _metrics["db_error"],
+        "hit_ratio": round(hits / lookups, 3) if lookups else None,
+        "lru_size": len(_lru),
+        "lru_capacity": LRU_SIZE,
+        "in_flight": len(_inflight),
+        "negative_size": len(_negative),
+    }
+
+
+# ── Maintenance ───────────────────────────────────────────────────────────────
+
+def prune(db: Session, now: Optional[datetime] = None) -> int:
+    """Delete rows too old to be served even stale. Commits. Returns rows deleted."""
+    now = now or datetime.utcnow()
+    C = GoogleBooksCache
+    deleted = 0
+    for prefix, ttl in (("search:", SEARCH_TTL), ("volume:", VOLUME_TTL)):
+        deleted += db.execute(
+            delete(C)
+            .where(C.key.startswith(prefix), C.fetched_at < now - ttl - STALE_TTL)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+    db.commit()
+    return deleted
+
+
+def run_prune() -> None:
+    """Scheduler entry point — opens its own session."""
+    from .database import engine
+
+    with Session(engine) as db:
+        deleted = prune(db)
+    print(f"[GoogleBooksCache] Pruned {deleted} expired row(s)")
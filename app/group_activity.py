@@ -14,13 +14,56 @@ Event types:
     group_book_changed  — curator changed the group's current book
 """
 
-import json
+import os
+import threading
+import time
 from datetime import datetime
+from sqlalchemy import insert, literal
 from sqlalchemy.orm import Session
 from sqlmodel import select
-from .models import GroupActivity, GroupMember
+from .models import GroupActivity, GroupMember, ReadingGroup
 
 
+# ── Active-membership cache ───────────────────────────────────────────────────
+# fire_group_activity_for_user runs on every progress update, note and status
+# change; membership changes are rare. Cache user_id -> active group ids.
+# Invalidated by groups_router on join / leave / approve / remove etc. The TTL
+# bounds staleness on other workers, whose caches that invalidation can't reach.
+
+MEMBERSHIP_CACHE_TTL: int = int(os.getenv("GROUP_MEMBERSHIP_CACHE_SECONDS", "300"))
+
+_membership_cache: dict[int, tuple[float, tuple[int, ...]]] = {}
+_membership_lock = threading.Lock()
+
+
+def active_group_ids(db: Session, user_id: int) -> tuple[int, ...]:
+    """Ids of the groups where the user is an active member (cached)."""
+    now = time.monotonic()
+    with _membership_lock:
+        hit = _membership_cache.get(user_id)
+    if hit and hit[0] > now:
+        return hit[1]
+
+    group_ids = tuple(db.exec(
+        select(GroupMember.group_id).where(
+            GroupMember.user_id == user_id,
+            GroupMember.status == "active",
+        )
+    ).all())
+    with _membership_lock:
+        _membership_cache[user_id] = (now + MEMBERSHIP_CACHE_TTL, group_ids)
+    return group_ids
+
+
+def invalidate_user_groups(*user_ids: int) -> None:
+    """Drop cached memberships. Call after a user's active membership set changes."""
+    with _membership_lock:
+        for user_id in user_ids:
+            _membership_cache.pop(user_id, None)
+
+
+# ── Writers ───────────────────────────────────────────────────────────────────
+
 def fire_group_activity(
     db: Session,
     group_id: int,
@@ -33,7 +76,7 @@ def fire_group_activity(
         group_id=group_id,
         user_id=user_id,
         event_type=event_type,
-        payload=json.dumps(payload or {}),
+        payload=payload or {},
         created_at=datetime.utcnow(),
     )
     db.add(event)
@@ -45,29 +88,33 @@ def fire_group_activity_for_user(
     user_id: int,
     event_type: str,
     payload: dict | None = None,
+    commit: bool = True,
 ):
     """
     Fire a GroupActivity event for every active group the user belongs to.
     Used for book_started, book_finished, milestone_reached, note_posted —
     events that aren't scoped to a specific group but should appear in all
     groups the user is a member of.
+
+    Writes all rows with one INSERT … SELECT over reading_group, so a group
+    deleted (or tombstoned) since the membership cache was filled is skipped instead of
+    violating the group_id FK and taking the caller's writes down with it.
+    Pass commit=False to join the caller's transaction (the caller commits).
     """
-    memberships = db.exec(
-        select(GroupMember).where(
-            GroupMember.user_id == user_id,
-            GroupMember.status == "active",
-        )
-    ).all()
-
-    for m in memberships:
-        event = GroupActivity(
-            group_id=m.group_id,
-            user_id=user_id,
-            event_type=event_type,
-            payload=json.dumps(payload or {}),
-            created_at=datetime.utcnow(),
-        )
-        db.add(event)
+    group_ids = active_group_ids(db, user_id)
+    if not group_ids:
+        return
+
+    columns = GroupActivity.__table__.c
+    rows = select(
+        ReadingGroup.id,
+        literal(user_id),
+        literal(event_type),
+        literal(payload or {}, type_=columns.payload.type),
+        literal(datetime.utcnow(), type_=columns.created_at.type),
+    ).where(ReadingGroup.id.in_(group_ids), ReadingGroup.deleted_at == None)  # noqa: E711
+    stmt = insert(GroupActivity).from_select(["group_id", "user_id", "event_type", "payload", "created_at"], rows)
+    db.execute(stmt)
 
-    if memberships:
+    if commit:
         db.commit()
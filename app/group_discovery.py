@@ -0,0 +1,144 @@
+# app/group_discovery.py
+"""
+Group discovery: SQL search + precomputed ranking (group_discovery_rank table).
+
+/groups/discover used to load every public group and substring-match in Python.
+Now:
+
+  - Ranking signal lives in group_discovery_rank, one row per public group:
+        score = member_count + ACTIVITY_WEIGHT * GroupActivity rows in the last RECENT_DAYS
+    refresh_discovery_rank() rebuilds it with one INSERT ... SELECT (scheduler,
+    every 15 min); track_group() keeps single rows in step on create / privacy change.
+  - Text filter is ILIKE on name and description. On Postgres that is served by
+    pg_trgm GIN indexes (migrations/add_group_discovery.py); SQLite falls back
+    to a scan, which is fine for local dev.
+  - Keyset pagination on (score, group_id), backed by ix_group_discovery_rank_score.
+"""
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, insert, literal, not_, or_, exists
+from sqlmodel import Session, select, func
+
+from .models import GroupActivity, GroupDiscoveryRank, GroupMember, ReadingGroup
+from .pagination import before
+
+
+RECENT_DAYS = 30
+ACTIVITY_WEIGHT = 3
+
+
+def _member_count_sq():
+    return (
+        select(func.count(GroupMember.id))
+        .where(GroupMember.group_id == ReadingGroup.id, GroupMember.status == "active")
+        .scalar_subquery()
+    )
+
+
+def _recent_activity_sq(since: datetime):
+    return (
+        select(func.count(GroupActivity.id))
+        .where(GroupActivity.group_id == ReadingGroup.id, GroupActivity.created_at >= since)
+        .scalar_subquery()
+    )
+
+
+def refresh_discovery_rank(db: Session, now: Optional[datetime] = None) -> int:
+    """Rebuild the whole ranking table in one transaction. Commits. Returns rows written."""
+    now = now or datetime.utcnow()
+    members = _member_count_sq()
+    activity = _recent_activity_sq(now - timedelta(days=RECENT_DAYS))
+    source = select(
+        ReadingGroup.id,
+        members,
+        activity,
+        members + ACTIVITY_WEIGHT * activity,
+        literal(now),
+    ).where(ReadingGroup.is_private == False, ReadingGroup.deleted_at == None)  # noqa: E711,E712
+
+    db.execute(delete(GroupDiscoveryRank).execution_options(synchronize_session=False))
+    db.execute(insert(GroupDiscoveryRank).from_select(
+        ["group_id", "member_count", "recent_activity_count", "score", "refreshed_at"], source,
+    ))
+    db.commit()
+    return db.exec(select(func.count(GroupDiscoveryRank.group_id))).one()
+
+
+def track_group(db: Session, group: ReadingGroup, now: Optional[datetime] = None) -> None:
+    """
+    Bring one group's row in step after create / update (caller commits).
+    Private groups have no row; public ones get fresh counts.
+    """
+    db.execute(
+        delete(GroupDiscoveryRank)
+        .where(GroupDiscoveryRank.group_id == group.id)
+        .execution_options(synchronize_session=False)
+    )
+    if group.is_private:
+        return
+    now = now or datetime.utcnow()
+    members, activity = db.exec(
+        select(_member_count_sq(), _recent_activity_sq(now - timedelta(days=RECENT_DAYS)))
+        .where(ReadingGroup.id == group.id)
+    ).one()
+    db.add(GroupDiscoveryRank(
+        group_id=group.id, member_count=members, recent_activity_count=activity,
+        score=members + ACTIVITY_WEIGHT * activity, refreshed_at=now,
+    ))
+
+
+def untrack_group(db: Session, group_id: int) -> None:
+    """Remove a deleted group's row (caller commits)."""
+    db.execute(
+        delete(GroupDiscoveryRank)
+        .where(GroupDiscoveryRank.group_id == group_id)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _escape_like(q: str) -> str:
+    return q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def discover(
+    db: Session,
+    viewer_id: int,
+    q: Optional[str] = None,
+    after: Optional[list] = None,
+    limit: int = 50,
+) -> list[tuple[ReadingGroup, int]]:
+    """
+    Public groups the viewer is not an active member of, best-ranked first.
+    Returns up to limit + 1 (group, score) pairs so the caller can tell whether
+    another page exists. `after` is the decoded (score, group_id) cursor.
+    """
+    R = GroupDiscoveryRank
+    query = (
+        select(ReadingGroup, R.score)
+        .join(R, R.group_id == ReadingGroup.id)
+        .where(ReadingGroup.is_private == False)  # noqa: E712
+        .where(not_(exists().where(
+            GroupMember.group_id == ReadingGroup.id,
+            GroupMember.user_id == viewer_id,
+            GroupMember.status == "active",
+        )))
+    )
+    if q and q.strip():
+        pattern = f"%{_escape_like(q.strip())}%"
+        query = query.where(or_(
+            ReadingGroup.name.ilike(pattern, escape="\\"),
+            ReadingGroup.description.ilike(pattern, escape="\\"),
+        ))
+    if after:
+        query = query.where(before([R.score, R.group_id], after))
+    return db.exec(query.order_by(R.score.desc(), R.group_id.desc()).limit(limit + 1)).all()
+
+
+def run_discovery_refresh() -> None:
+    """Scheduler entry point — opens its own session."""
+    from .database import engine
+
+    with Session(engine) as db:
+        written = refresh_discovery_rank(db)
+    print(f"[group_discovery] Ranked {written} public group(s)")
@@ -0,0 +1,205 @@
+# app/group_goals.py
+"""
+Rolling page counters for group reading goals (group_goal_counter table).
+
+GET /groups/{id}/goal used to SUM every member's ReadingActivity for the whole
+period on each view. Instead each group keeps one counter per goal period:
+
+  pages logged     → record_pages_read() (via app/progress_hooks.py) adds the
+                     new pages to the current period's counter of every goal
+                     group the reader is in
+  period boundary  → the new period has no counter yet; it is seeded from
+                     ReadingActivity on first use (cheap — the period just began)
+  membership / goal change → invalidate() drops the group's counters; they are
+                     re-seeded on next use
+
+Periods: 'monthly' = calendar month. Any other period with a start date
+('yearly') = years anchored at goal_start_date. No start date = all time.
+
+Maintenance:
+    python -m app.group_goals --backfill   seed current-period counters for all goal groups
+    python -m app.group_goals --verify     recompute and fix drift (also run daily by the scheduler)
+"""
+import argparse
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select, func
+
+from .group_activity import active_group_ids
+from .models import GroupGoalCounter, GroupMember, ReadingActivity, ReadingGroup
+
+
+def period_bounds(group, now: Optional[datetime] = None) -> tuple[str, Optional[datetime]]:
+    """(period_key, period start) of the group's current goal period."""
+    start = group.goal_start_date
+    if not start:
+        return "all", None
+    now = now or datetime.utcnow()
+    if group.goal_period == "monthly":
+        since = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    else:
+        since = _anniversary(start, now.year)
+        if since > now:
+            since = _anniversary(start, now.year - 1)
+        if since < start:
+            since = start
+    return since.date().isoformat(), since
+
+
+def _anniversary(start: datetime, year: int) -> datetime:
+    try:
+        return start.replace(year=year)
+    except ValueError:          # Feb 29 start in a non-leap year
+        return start.replace(year=year, day=28)
+
+
+def _raw_pages(db: Session, group_id: int, since: Optional[datetime]) -> int:
+    """Ground truth from ReadingActivity for the group's current active members."""
+    members = select(GroupMember.user_id).where(
+        GroupMember.group_id == group_id, GroupMember.status == "active",
+    )
+    q = select(func.sum(ReadingActivity.pages_read)).where(ReadingActivity.user_id.in_(members))
+    if since:
+        q = q.where(ReadingActivity.date >= since)
+    return int(db.exec(q).one() or 0)
+
+
+def _seed(db: Session, group, now: datetime) -> int:
+    """Create the current period's counter from ReadingActivity (caller commits)."""
+    key, since = period_bounds(group, now)
+    pages = _raw_pages(db, group.id, since)
+    try:
+        with db.begin_nested():
+            db.add(GroupGoalCounter(group_id=group.id, period_key=key, pages=pages, updated_at=now))
+    except IntegrityError:
+        # Another request seeded it first — theirs already counts the same rows
+        pass
+    return pages
+
+
+def record_pages_read(db: Session, user_id: int, pages: int, now: Optional[datetime] = None) -> None:
+    """
+    Add pages to the current-period counter of every goal group the user is active in.
+    Call before the ReadingActivity row is committed, in the same transaction.
+    """
+    if pages <= 0:
+        return
+    group_ids = active_group_ids(db, user_id)
+    if not group_ids:
+        return
+    now = now or datetime.utcnow()
+    groups = db.exec(
+        select(ReadingGroup).where(
+            ReadingGroup.id.in_(group_ids), ReadingGroup.goal_pages != None, ReadingGroup.deleted_at == None,  # noqa: E711
+        )
+    ).all()
+    for g in groups:
+        key, _ = period_bounds(g, now)
+        result = db.execute(
+            update(GroupGoalCounter)
+            .where(GroupGoalCounter.group_id == g.id, GroupGoalCounter.period_key == key)
+            .values(pages=GroupGoalCounter.pages + pages, updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 0:
+            # New period (or invalidated): seed from raw — includes the pending activity row
+            _seed(db, g, now)
+
+
+def goal_pages_read(db: Session, group, now: Optional[datetime] = None) -> int:
+    """Pages read toward the group's goal this period; seeds the counter if missing (commits)."""
+    now = now or datetime.utcnow()
+    key, _ = period_bounds(group, now)
+    pages = db.exec(
+        select(GroupGoalCounter.pages).where(
+            GroupGoalCounter.group_id == group.id, GroupGoalCounter.period_key == key,
+        )
+    ).first()
+    if pages is None:
+        pages = _seed(db, group, now)
+        db.commit()
+    return pages
+
+
+def invalidate(db: Session, group_id: int) -> None:
+    """Drop a group's counters after its membership or goal period changed (caller commits)."""
+    db.execute(
+        delete(GroupGoalCounter)
+        .where(GroupGoalCounter.group_id == group_id)
+        .execution_options(synchronize_session=False)
+    )
+
+
+# ── Maintenance ───────────────────────────────────────────────────────────────
+
+def backfill(db: Session, now: Optional[datetime] = None) -> int:
+    """Seed missing current-period counters for every goal group. Commits. Returns counters created."""
+    now = now or datetime.utcnow()
+    created = 0
+    goal_groups = select(ReadingGroup).where(ReadingGroup.goal_pages != None, ReadingGroup.deleted_at == None)  # noqa: E711
+    for g in db.exec(goal_groups).all():
+        key, _ = period_bounds(g, now)
+        exists = db.exec(
+            select(GroupGoalCounter.id).where(GroupGoalCounter.group_id == g.id, GroupGoalCounter.period_key == key)
+        ).first()
+        if not exists:
+            _seed(db, g, now)
+            created += 1
+    db.commit()
+    return created
+
+
+def verify(db: Session, now: Optional[datetime] = None) -> dict:
+    """
+    Recompute every current-period counter from ReadingActivity, fix drift and
+    delete counters of past periods. Commits.
+    """
+    now = now or datetime.utcnow()
+    groups = {g.id: g for g in db.exec(select(ReadingGroup).where(ReadingGroup.goal_pages != None)).all()}  # noqa: E711
+    checked = fixed = removed = 0
+    for counter in db.exec(select(GroupGoalCounter)).all():
+        g = groups.get(counter.group_id)
+        key, since = period_bounds(g, now) if g else (None, None)
+        if counter.period_key != key:
+            db.delete(counter)
+            removed += 1
+            continue
+        checked += 1
+        actual = _raw_pages(db, g.id, since)
+        if actual != counter.pages:
+            print(f"[group_goals] Drift in group {g.id} ({key}): counter={counter.pages} actual={actual}")
+            counter.pages = actual
+            counter.updated_at = now
+            db.add(counter)
+            fixed += 1
+    db.commit()
+    return {"checked": checked, "fixed": fixed, "removed": removed}
+
+
+def run_goal_verification() -> None:
+    """Scheduler entry point — opens its own session."""
+    from .database import engine
+
+    with Session(engine) as db:
+        result = verify(db)
+    print(f"[group_goals] Verified {result['checked']} counter(s): "
+          f"{result['fixed']} fixed, {result['removed']} expired removed")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain group_goal_counter (group reading goals).")
+    parser.add_argument("--backfill", action="store_true", help="seed missing current-period counters")
+    parser.add_argument("--verify", action="store_true", help="recompute counters from ReadingActivity and fix drift")
+    args = parser.parse_args()
+    if not (args.backfill or args.verify):
+        parser.error("nothing to do — pass --backfill and/or --verify")
+
+    from .database import engine
+    with Session(engine) as session:
+        if args.backfill:
+            print(f"[group_goals] Seeded {backfill(session)} counter(s)")
+        if args.verify:
+            print(f"[group_goals] Verify: {verify(session)}")
@@ -0,0 +1,293 @@
+# app/group_stats.py
+"""
+Incrementally maintained group leaderboard (group_member_stats table).
+
+One row per active (group, member) holding the numbers the leaderboard shows:
+pages read and books finished, all-time and for the current month, plus the
+title of the member's current book. The leaderboard reads these rows directly
+instead of re-aggregating UserBook / ReadingActivity on every request.
+
+Writers (caller commits — they ride in the caller's transaction; library
+write paths reach them through app/progress_hooks.py):
+    record_pages_read(db, user_id, pages)             progress update logged pages
+    on_status_change(db, user_id, old, new)           finished / reading transitions
+    refresh_current_book(db, user_id)                 library changed
+    add_member_stats / remove_member_stats            membership changes
+
+Monthly counters roll over lazily: a row whose month_key is not the current
+month counts as zero and is reset by its next write.
+
+Repairs:
+    python -m app.group_stats --rebuild [--group-id N]
+"""
+import argparse
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import and_, case, delete, insert, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session, select, func
+
+from .models import Book, GroupMember, GroupMemberStats, ReadingActivity, User, UserBook
+
+
+def month_key(now: Optional[datetime] = None) -> str:
+    return (now or datetime.utcnow()).strftime("%Y-%m")
+
+
+def _month_start(now: datetime) -> datetime:
+    return now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+# ── Incremental writers ───────────────────────────────────────────────────────
+
+def _bump(db: Session, user_id: int, pages: int, books: int, now: datetime) -> None:
+    """Add to a user's counters in every group they are in — one UPDATE."""
+    S = GroupMemberStats
+    mk = month_key(now)
+    same_month = S.month_key == mk
+    db.execute(
+        update(S)
+        .where(S.user_id == user_id)
+        .values(
+            pages_alltime=S.pages_alltime + pages,
+            books_alltime=case((S.books_alltime + books < 0, 0), else_=S.books_alltime + books),
+            pages_month=case((same_month, S.pages_month + pages), else_=max(pages, 0)),
+            books_month=case(
+                (same_month & (S.books_month + books >= 0), S.books_month + books),
+                (same_month, 0),
+                else_=max(books, 0),
+            ),
+            month_key=mk,
+            updated_at=now,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def record_pages_read(db: Session, user_id: int, pages: int, now: Optional[datetime] = None) -> None:
+    if pages > 0:
+        _bump(db, user_id, pages, 0, now or datetime.utcnow())
+
+
+def on_status_change(
+    db: Session,
+    user_id: int,
+    old_status: Optional[str],
+    new_status: Optional[str],
+    now: Optional[datetime] = None,
+) -> None:
+    """Keep finished counts and the current book in step with a UserBook status change."""
+    if old_status == new_status:
+        return
+    now = now or datetime.utcnow()
+    if new_status == "finished":
+        _bump(db, user_id, 0, 1, now)
+    elif old_status == "finished":
+        _bump(db, user_id, 0, -1, now)
+    refresh_current_book(db, user_id)
+
+
+def refresh_current_book(db: Session, user_id: int) -> None:
+    """Current book = most recently updated 'reading' UserBook."""
+    title = db.exec(
+        select(Book.title)
+        .join(UserBook, UserBook.book_id == Book.id)
+        .where(UserBook.user_id == user_id, UserBook.status == "reading")
+        .order_by(UserBook.updated_at.desc())
+        .limit(1)
+    ).first()
+    db.execute(
+        update(GroupMemberStats)
+        .where(GroupMemberStats.user_id == user_id)
+        .values(current_book_title=title)
+        .execution_options(synchronize_session=False)
+    )
+
+
+# ── Membership ────────────────────────────────────────────────────────────────
+
+def _compute(db: Session, user_ids: list[int], now: datetime) -> dict[int, dict]:
+    """Aggregate stats for these users from the source tables (same rules as the old live query)."""
+    if not user_ids:
+        return {}
+    since = _month_start(now)
+    stats = {uid: {"pages_alltime": 0, "books_alltime": 0, "pages_month": 0, "books_month": 0,
+                   "current_book_title": None} for uid in user_ids}
+
+    finished = UserBook.status == "finished"
+    for uid, total, this_month in db.exec(
+        select(
+            UserBook.user_id,
+            func.count(UserBook.id),
+            func.sum(case((UserBook.updated_at >= since, 1), else_=0)),
+        )
+        .where(UserBook.user_id.in_(user_ids), finished)
+        .group_by(UserBook.user_id)
+    ).all():
+        stats[uid]["books_alltime"] = total or 0
+        stats[uid]["books_month"] = this_month or 0
+
+    for uid, total, this_month in db.exec(
+        select(
+            ReadingActivity.user_id,
+            func.sum(ReadingActivity.pages_read),
+            func.sum(case((ReadingActivity.date >= since, ReadingActivity.pages_read), else_=0)),
+        )
+        .where(ReadingActivity.user_id.in_(user_ids))
+        .group_by(ReadingActivity.user_id)
+    ).all():
+        stats[uid]["pages_alltime"] = int(total or 0)
+        stats[uid]["pages_month"] = int(this_month or 0)
+
+    # Most recently updated reading book per user
+    for uid, title, _ in db.exec(
+        select(UserBook.user_id, Book.title, UserBook.updated_at)
+        .join(Book, Book.id == UserBook.book_id)
+        .where(UserBook.user_id.in_(user_ids), UserBook.status == "reading")
+        .order_by(UserBook.user_id, UserBook.updated_at)
+    ).all():
+        stats[uid]["current_book_title"] = title   # ascending order: last one wins
+
+    return stats
+
+
+def add_member_stats(db: Session, group_id: int, user_id: int, now: Optional[datetime] = None) -> None:
+    """Create the stats row for a member who just became active (caller commits)."""
+    now = now or datetime.utcnow()
+    exists = db.exec(
+        select(GroupMemberStats.id).where(
+            GroupMemberStats.group_id == group_id, GroupMemberStats.user_id == user_id,
+        )
+    ).first()
+    if exists:
+        return
+    row = _compute(db, [user_id], now)[user_id]
+    db.execute(insert(GroupMemberStats).values(
+        group_id=group_id, user_id=user_id, month_key=month_key(now), updated_at=now, **row,
+    ))
+
+
+# Dialect inserts with ON CONFLICT DO NOTHING
+_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def heal(db: Session, group_id: int, now: Optional[datetime] = None) -> int:
+    """
+    Insert rows for active members that have none — missing since before this
+    table existed, or after drift (caller commits). Returns rows inserted.
+    Insert-or-ignore: concurrent readers healing the same member do not fail
+    on uq_group_member_stats.
+    """
+    S = GroupMemberStats
+    missing = list(db.exec(
+        select(GroupMember.user_id)
+        .outerjoin(S, and_(S.group_id == GroupMember.group_id, S.user_id == GroupMember.user_id))
+        .where(GroupMember.group_id == group_id, GroupMember.status == "active", S.id == None)  # noqa: E711
+    ).all())
+    if not missing:
+        return 0
+    now = now or datetime.utcnow()
+    stats, mk = _compute(db, missing, now), month_key(now)
+    stmt = _INSERTS[db.get_bind().dialect.name](S).values([
+        {"group_id": group_id, "user_id": uid, "month_key": mk, "updated_at": now, **stats[uid]}
+        for uid in missing
+    ])
+    db.execute(stmt.on_conflict_do_nothing(index_elements=["group_id", "user_id"]))
+    return len(missing)
+
+
+def remove_member_stats(db: Session, group_id: int, user_id: Optional[int] = None) -> None:
+    """Drop one member's row, or the whole group's when user_id is None (caller commits)."""
+    stmt = delete(GroupMemberStats).where(GroupMemberStats.group_id == group_id)
+    if user_id is not None:
+        stmt = stmt.where(GroupMemberStats.user_id == user_id)
+    db.execute(stmt.execution_options(synchronize_session=False))
+
+
+def rebuild(db: Session, group_id: Optional[int] = None, now: Optional[datetime] = None) -> int:
+    """Recompute rows from the source tables (one group, or all). Commits. Returns rows written."""
+    now = now or datetime.utcnow()
+    member_q = select(GroupMember.group_id, GroupMember.user_id).where(GroupMember.status == "active")
+    if group_id is not None:
+        member_q = member_q.where(GroupMember.group_id == group_id)
+    members = db.exec(member_q).all()
+
+    stats = _compute(db, list({uid for _, uid in members}), now)
+    remove_stmt = delete(GroupMemberStats)
+    if group_id is not None:
+        remove_stmt = remove_stmt.where(GroupMemberStats.group_id == group_id)
+    db.execute(remove_stmt.execution_options(synchronize_session=False))
+    if members:
+        mk = month_key(now)
+        db.execute(insert(GroupMemberStats).values([
+            {"group_id": gid, "user_id": uid, "month_key": mk, "updated_at": now, **stats[uid]}
+            for gid, uid in members
+        ]))
+    db.commit()
+    return len(members)
+
+
+# ── Reader ────────────────────────────────────────────────────────────────────
+
+def leaderboard(db: Session, group_id: int, period: str = "monthly", now: Optional[datetime] = None) -> list[dict]:
+    """
+    Ranked rows for GET /groups/{id}/leaderboard. Missing rows are healed
+    (commits then); rows of members no longer active are left to --rebuild
+    and skipped here.
+    """
+    S = GroupMemberStats
+    now = now or datetime.utcnow()
+
+    if heal(db, group_id, now):
+        db.commit()
+
+    monthly = period == "monthly"
+    order = (S.pages_month.desc(), S.books_month.desc()) if monthly else (S.pages_alltime.desc(), S.books_alltime.desc())
+    rows = db.exec(
+        select(S, User)
+        .join(User, User.id == S.user_id)
+        .join(GroupMember, and_(
+            GroupMember.group_id == S.group_id, GroupMember.user_id == S.user_id, GroupMember.status == "active",
+        ))
+        .where(S.group_id == group_id)
+        .order_by(*order, S.id)
+    ).all()
+
+    mk = month_key(now)
+    out = []
+    for stats, user in rows:
+        if monthly:
+            current = stats.month_key == mk
+            pages, books = (stats.pages_month, stats.books_month) if current else (0, 0)
+        else:
+            pages, books = stats.pages_alltime, stats.books_alltime
+        out.append({
+            "user_id": user.id,
+            "name": user.name,
+            "username": user.username,
+            "profile_picture": getattr(user, "profile_picture", None),
+            "books_finished": books,
+            "pages_read": int(pages),
+            "current_book": stats.current_book_title,
+        })
+
+    # Rows not yet rolled into this month sort as zero
+    out.sort(key=lambda r: (-r["pages_read"], -r["books_finished"]))
+    for i, r in enumerate(out):
+        r["rank"] = i + 1
+    return out
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain group_member_stats (group leaderboards).")
+    parser.add_argument("--rebuild", action="store_true", help="recompute rows from UserBook / ReadingActivity")
+    parser.add_argument("--group-id", type=int, default=None, help="limit the rebuild to one group")
+    args = parser.parse_args()
+    if not args.rebuild:
+        parser.error("nothing to do — pass --rebuild")
+
+    from .database import engine
+    with Session(engine) as session:
+        written = rebuild(session, args.group_id)
+    print(f"[group_stats] Rebuilt {written} row(s)" + (f" for group {args.group_id}" if args.group_id else ""))
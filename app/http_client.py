@@ -0,0 +1,83 @@
+# app/http_client.py
+"""
+One application-lifetime httpx.AsyncClient for outbound API calls.
+
+Opening an AsyncClient per request pays a new TCP + TLS handshake every time.
+This client is created on startup (main.py) and closed on shutdown, so calls
+to the same host reuse pooled keep-alive connections — multiplexed over one
+HTTP/2 connection where the server supports it.
+
+    from .. import http_client
+    response = await http_client.get_client().get(url, params=..., timeout=http_client.timeout(10.0))
+
+Pass per-call timeouts through timeout(): a bare float would replace the whole
+httpx.Timeout, dropping the tuned connect / pool limits below.
+
+HTTP/2 needs the `h2` package (httpx[http2]); without it the client falls back
+to pooled HTTP/1.1. Tuned by environment:
+
+    HTTP_MAX_CONNECTIONS      total pooled connections (default 100)
+    HTTP_MAX_KEEPALIVE        idle connections kept open (default 20)
+    HTTP_KEEPALIVE_EXPIRY     seconds an idle connection is kept (default 30)
+    HTTP_CONNECT_TIMEOUT      seconds (default 5); read / write default to 15 / 10
+"""
+import os
+from typing import Optional
+
+import httpx
+
+
+MAX_CONNECTIONS: int = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+MAX_KEEPALIVE: int = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+KEEPALIVE_EXPIRY: float = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+CONNECT_TIMEOUT: float = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+
+try:
+    import h2  # noqa: F401
+    HTTP2 = True
+except ImportError:
+    HTTP2 = False
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def timeout(read: float = 15.0) -> httpx.Timeout:
+    """A per-call timeout with a custom read limit that keeps the tuned connect / pool limits."""
+    return httpx.Timeout(read, connect=CONNECT_TIMEOUT, write=10.0, pool=CONNECT_TIMEOUT)
+
+
+def _build() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        http2=HTTP2,
+        limits=httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_KEEPALIVE,
+            keepalive_expiry=KEEPALIVE_EXPIRY,
+        ),
+        timeout=timeout(),
+        headers={"User-Agent": "TrackMyRead/1.0"},
+    )
+
+
+async def start() -> None:
+    """Create the shared client (startup hook)."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build()
+        print(f"[http_client] Shared client ready (http2={HTTP2}, max_connections={MAX_CONNECTIONS})")
+
+
+async def close() -> None:
+    """Close pooled connections (shutdown hook)."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """The shared client; created on first use if startup did not run (scripts, tests)."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build()
+    return _client
@@ -56,6 +56,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Deletion-Job"],   # keyset pagination (app/pagination.py), app/deletion.py
 )
 
 # ---------------------
@@ -90,13 +91,17 @@ app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
 @app.on_event("startup")
 async def startup_event():
     from .notifications.scheduler import start_scheduler
+    from . import http_client
+    await http_client.start()
     start_scheduler()
     print("✅ Application started.")
 
 @app.on_event("shutdown")
 async def shutdown_event():
     from .notifications.scheduler import stop_scheduler
+    from . import http_client
     stop_scheduler()
+    await http_client.close()
 
 @app.get("/")
 def root():
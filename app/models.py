@@ -5,9 +5,10 @@ This version matches your existing DB which uses `password_hash`.
 """
 
 from typing import Optional, List
-from datetime import datetime
+from datetime import date, datetime
 from sqlmodel import Field, Relationship, SQLModel
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON, Index, LargeBinary, UniqueConstraint
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func
 from .database import Base
 
@@ -48,10 +49,18 @@ class User(SQLModel, table=True):
 
 class Book(SQLModel, table=True):
     """Global book record."""
+    __table_args__ = (
+        # Canonical identity — app/book_resolver.py
+        UniqueConstraint("isbn13", name="uq_book_isbn13"),
+        UniqueConstraint("google_books_id", name="uq_book_google_books_id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     title: str = Field(nullable=False)
     author: Optional[str] = None
     isbn: Optional[str] = None
+    # `isbn` as entered; isbn13 is it normalized (ISBN-10 converted), the dedupe key
+    isbn13: Optional[str] = Field(default=None, max_length=13)
     cover_url: Optional[str] = None
     tags: Optional[str] = None
     description: Optional[str] = None
@@ -158,7 +167,67 @@ class NotificationLog(SQLModel, table=True):
     body: str
     data: Optional[dict] = Field(default=None, sa_column=Column(JSON, nullable=True))
     is_read: bool = Field(default=False)
-    sent_at: datetime = Field(default_factory=datetime.utcnow)
+    sent_at: datetime = Field(default_factory=datetime.utcnow, index=True)   # retention job scans by age
+
+
+class ExpoPushTicket(SQLModel, table=True):
+    """
+    Expo ticket id of a push that Expo accepted but has not delivered yet.
+    The receipt job (notifications/receipts.py) checks these in batches and
+    deletes them once their receipt is in.
+    """
+    id: Optional[int] = Field(default=None, primary_key=True)
+    ticket_id: str = Field(index=True, unique=True)
+    token: str                                              # PushToken.token the push went to
+    user_id: Optional[int] = Field(default=None, index=True)
+    created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+
+
+class BroadcastJob(SQLModel, table=True):
+    """
+    Admin push broadcast run as a background job (see notifications/broadcast.py).
+    last_token_id is the resume cursor: every PushToken with id <= it has been handled.
+    """
+    id: Optional[int] = Field(default=None, primary_key=True)
+    title: str
+    body: str
+    data: Optional[dict] = Field(default=None, sa_column=Column(JSON, nullable=True))
+    status: str = Field(default="queued", index=True)   # 'queued' | 'running' | 'completed' | 'failed'
+    created_by: Optional[int] = Field(default=None, foreign_key="user.id")
+    total_tokens: int = Field(default=0)                  # snapshot at enqueue time
+    last_token_id: int = Field(default=0)
+    sent_expo: int = Field(default=0)
+    sent_web: int = Field(default=0)
+    failed: int = Field(default=0)
+    stale_removed: int = Field(default=0)
+    error: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None                 # heartbeat — stale 'running' jobs are resumed
+    finished_at: Optional[datetime] = None
+
+
+class DeletionJob(SQLModel, table=True):
+    """
+    Background cascading delete of a group or a user account (see app/deletion.py).
+    Every step is an idempotent chunked DELETE, so a crashed job is simply run again.
+    """
+    __tablename__ = "deletion_job"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    kind: str = Field(index=True)                         # 'group' | 'user'
+    target_id: int = Field(index=True)                    # ReadingGroup.id / User.id — no FK, the row goes away
+    status: str = Field(default="queued", index=True)     # 'queued' | 'running' | 'completed' | 'failed'
+    requested_by: Optional[int] = None                    # no FK: may be the user being deleted
+    step: Optional[str] = None                            # table currently being cleared
+    rows_deleted: int = Field(default=0)
+    progress: Optional[dict] = Field(default=None, sa_column=Column(JSON, nullable=True))   # {step: rows}
+    error: Optional[str] = None
+    attempts: int = Field(default=0)                      # failed runs — 'failed' jobs are retried with backoff
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None                 # heartbeat — stale 'running' jobs are resumed
+    finished_at: Optional[datetime] = None
 
 
 # class ReadingActivity(SQLModel, table=True):
@@ -174,12 +243,21 @@ class NotificationLog(SQLModel, table=True):
 class ReadingActivity(SQLModel, table=True):
     """User reading activity log."""
     __tablename__ = "reading_activity"
+    __table_args__ = (
+        # Daily stats: WHERE user_id = ? AND date >= ? GROUP BY date(date)
+        Index("idx_reading_activity_user_date", "user_id", "date"),
+        # One row per book and day — crud.log_pages_read upserts on this key
+        UniqueConstraint("userbook_id", "day", name="uq_reading_activity_userbook_day"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
 
     user_id: int = Field(foreign_key="user.id", index=True)
     userbook_id: int = Field(foreign_key="userbook.id", index=True)
 
+    # Calendar day of `date` (declared first: the `date` field shadows the type);
+    # NULL only on rows written before the (userbook_id, day) key
+    day: Optional[date] = None
     # date used for stats queries
     date: datetime = Field(default_factory=datetime.utcnow, index=True)
 
@@ -188,6 +266,49 @@ class ReadingActivity(SQLModel, table=True):
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
 
+class UserReadingStats(SQLModel, table=True):
+    """
+    Precomputed reading insights, one row per user (see app/reading_stats.py).
+    Kept in step by progress / status writes; reconciled nightly.
+    """
+    __tablename__ = "user_reading_stats"
+
+    user_id: int = Field(foreign_key="user.id", primary_key=True)
+    daily_pages: Optional[dict] = Field(default=None, sa_column=Column(JSON, nullable=True))     # {"YYYY-MM-DD": pages}
+    monthly_pages: Optional[dict] = Field(default=None, sa_column=Column(JSON, nullable=True))   # {"YYYY-MM": pages}
+    finished_year: int = Field(default=0)
+    finished_this_year: int = Field(default=0)      # books finished in finished_year
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class ReadingDayBitmap(SQLModel, table=True):
+    """
+    One bit per day of the year a user read on, plus pages per day
+    (see app/reading_bitmap.py). Bit / slot i = day-of-year i + 1.
+    """
+    __tablename__ = "reading_day_bitmap"
+    __table_args__ = (UniqueConstraint("user_id", "year", name="uq_reading_day_bitmap_user_year"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="user.id", index=True)
+    year: int
+    days: bytes = Field(sa_column=Column(LargeBinary, nullable=False))              # 46 bytes, little-endian bits
+    pages: Optional[bytes] = Field(default=None, sa_column=Column(LargeBinary, nullable=True))   # 366 x uint32 LE
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class GoogleBooksCache(SQLModel, table=True):
+    """
+    Persistent tier of the Google Books response cache (see app/google_books_cache.py).
+    Holds the processed endpoint response, not Google's raw JSON.
+    """
+    __tablename__ = "google_books_cache"
+
+    key: str = Field(primary_key=True, max_length=255)     # "search:<normalized query>" | "volume:<google id>"
+    payload: dict = Field(sa_column=Column(JSON, nullable=False))
+    fetched_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+
+
 from typing import Optional
 from sqlmodel import SQLModel
 
@@ -195,6 +316,17 @@ class UserBookProgress(SQLModel):
     current_page : Optional[int] = 0
 
 
+class ProgressUpdate(SQLModel):
+    userbook_id: int
+    current_page: int
+    recorded_at: datetime       # when the client recorded the page (UTC)
+
+
+class ProgressBatch(SQLModel):
+    """Queued offline progress updates, replayed in one request."""
+    updates: List[ProgressUpdate]
+
+
 # ─── Groups ───────────────────────────────────────────────────────────────────
 
 import secrets
@@ -217,11 +349,17 @@ class ReadingGroup(SQLModel, table=True):
     # Current group book
     current_book_id: Optional[int] = Field(default=None, foreign_key="book.id")
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    # Set by DELETE /groups/{id}; the rows go later, in a background job (app/deletion.py)
+    deleted_at: Optional[datetime] = None
 
 
 class GroupMember(SQLModel, table=True):
     """Membership record — also used for pending invites."""
     __tablename__ = "group_member"
+    __table_args__ = (
+        # Members / pending lists: WHERE group_id = ? AND status = ? ORDER BY joined_at, id
+        Index("ix_group_member_list", "group_id", "status", "joined_at", "id"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     group_id: int = Field(foreign_key="reading_group.id", index=True)
@@ -232,9 +370,73 @@ class GroupMember(SQLModel, table=True):
     joined_at: datetime = Field(default_factory=datetime.utcnow)
 
 
+class GroupMemberStats(SQLModel, table=True):
+    """
+    Pre-aggregated leaderboard row per active member (see app/group_stats.py).
+    Updated incrementally on progress / status changes; monthly counters are
+    only meaningful while month_key is the current month ('YYYY-MM').
+    """
+    __tablename__ = "group_member_stats"
+    __table_args__ = (
+        UniqueConstraint("group_id", "user_id", name="uq_group_member_stats"),
+        Index("ix_group_member_stats_monthly", "group_id", "pages_month", "books_month"),
+        Index("ix_group_member_stats_alltime", "group_id", "pages_alltime", "books_alltime"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    group_id: int = Field(foreign_key="reading_group.id")
+    user_id: int = Field(foreign_key="user.id", index=True)
+    pages_alltime: int = Field(default=0)
+    books_alltime: int = Field(default=0)
+    pages_month: int = Field(default=0)
+    books_month: int = Field(default=0)
+    month_key: str = Field(default="")
+    current_book_title: Optional[str] = None
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class GroupGoalCounter(SQLModel, table=True):
+    """
+    Pages read by a group's active members in one goal period (see app/group_goals.py).
+    period_key is the period's start date ('2026-10-01') or 'all' for goals without one.
+    """
+    __tablename__ = "group_goal_counter"
+    __table_args__ = (
+        UniqueConstraint("group_id", "period_key", name="uq_group_goal_counter"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    group_id: int = Field(foreign_key="reading_group.id", index=True)
+    period_key: str
+    pages: int = Field(default=0)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class GroupDiscoveryRank(SQLModel, table=True):
+    """
+    Precomputed ranking for /groups/discover — one row per public group
+    (see app/group_discovery.py). Refreshed periodically by the scheduler.
+    """
+    __tablename__ = "group_discovery_rank"
+    __table_args__ = (
+        # Keyset pagination: ORDER BY score DESC, group_id DESC
+        Index("ix_group_discovery_rank_score", "score", "group_id"),
+    )
+
+    group_id: int = Field(foreign_key="reading_group.id", primary_key=True)
+    member_count: int = Field(default=0)
+    recent_activity_count: int = Field(default=0)   # GroupActivity rows in the last RECENT_DAYS
+    score: int = Field(default=0)
+    refreshed_at: datetime = Field(default_factory=datetime.utcnow)
+
+
 class GroupPost(SQLModel, table=True):
     """A post scoped to a reading group."""
     __tablename__ = "group_post"
+    __table_args__ = (
+        # Posts keyset pagination: WHERE group_id = ? ORDER BY created_at DESC, id DESC
+        Index("ix_group_post_feed", "group_id", "created_at", "id"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     group_id: int = Field(foreign_key="reading_group.id", index=True)
@@ -248,6 +450,11 @@ class GroupPost(SQLModel, table=True):
 class GroupActivity(SQLModel, table=True):
     """Activity feed events scoped to a reading group."""
     __tablename__ = "group_activity"
+    __table_args__ = (
+        # Feed keyset pagination: WHERE group_id = ? [AND event_type = ?] ORDER BY created_at DESC, id DESC
+        Index("ix_group_activity_feed", "group_id", "created_at", "id"),
+        Index("ix_group_activity_feed_type", "group_id", "event_type", "created_at", "id"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     group_id: int = Field(foreign_key="reading_group.id", index=True)
@@ -255,5 +462,23 @@ class GroupActivity(SQLModel, table=True):
     # event_type: member_joined | book_started | book_finished |
     #              milestone_reached | note_posted | group_book_changed
     event_type: str = Field(nullable=False)
-    payload: Optional[str] = Field(default=None)   # JSON string
+    payload: Optional[dict] = Field(
+        default=None, sa_column=Column(JSON().with_variant(JSONB, "postgresql"), nullable=True)
+    )
     created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+def foreign_keys_to(model) -> list:
+    """
+    Every column holding a foreign key to `model`'s table, read from the models
+    themselves. Code that repoints or deletes rows of a table (the book merge,
+    the deletion plans) walks this instead of its own list, so a new
+    referencing table cannot be missed.
+    """
+    target = model.__table__
+    return [
+        fk.parent
+        for table in SQLModel.metadata.sorted_tables
+        for fk in table.foreign_keys
+        if fk.column.table is target
+    ]
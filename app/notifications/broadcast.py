@@ -0,0 +1,243 @@
+# app/notifications/broadcast.py
+"""
+Admin push broadcast, run as a resumable background job.
+
+POST /admin/push/broadcast only records a BroadcastJob and hands it to the
+scheduler; run_broadcast() then:
+
+  1. Streams PushToken rows in id order (yield_per — never the whole table in memory)
+  2. Sends Expo tokens in chunks of 100 (Expo's per-request limit), several
+     chunks concurrently
+  3. Sends web subscriptions through the Web Push path (push_web.py)
+  4. After every wave, commits the counters and last_token_id, and queues the
+     Expo ticket ids for receipt checking (receipts.py)
+
+last_token_id is the resume cursor. If the process dies mid-broadcast the job
+stays 'running' with an old updated_at; resume_broadcasts() (every minute)
+claims it again and continues after the cursor. At most the one in-flight
+wave is sent twice.
+"""
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, or_, update
+from sqlmodel import Session, select, func
+
+from exponent_server_sdk import PushClient, PushMessage
+
+
+EXPO_CHUNK_SIZE = 100   # Expo hard limit per request
+BROADCAST_CONCURRENCY: int = int(os.getenv("BROADCAST_CONCURRENCY", "4"))
+BROADCAST_FETCH_SIZE: int = int(os.getenv("BROADCAST_FETCH_SIZE", "500"))
+
+# A 'running' job whose heartbeat is older than this is treated as orphaned
+STALE_AFTER = timedelta(minutes=5)
+
+
+def create_broadcast_job(db: Session, title: str, body: str, data: Optional[dict], created_by: Optional[int]):
+    """Record a queued broadcast. Returns the job, or None if there are no tokens at all."""
+    from ..models import BroadcastJob, PushToken  # deferred to avoid circular imports
+
+    total = db.exec(select(func.count(PushToken.id))).one()
+    if not total:
+        return None
+
+    job = BroadcastJob(title=title, body=body, data=data, created_by=created_by, total_tokens=total)
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def serialize_job(job) -> dict:
+    processed = job.sent_expo + job.sent_web + job.failed + job.stale_removed
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "title": job.title,
+        "total_tokens": job.total_tokens,
+        "processed": processed,
+        "sent_expo": job.sent_expo,
+        "sent_web": job.sent_web,
+        "failed": job.failed,
+        "stale_removed": job.stale_removed,
+        "error": job.error,
+        "created_at": job.created_at.isoformat() + "Z",
+        "started_at": job.started_at.isoformat() + "Z" if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() + "Z" if job.finished_at else None,
+    }
+
+
+# ── Job runner ────────────────────────────────────────────────────────────────
+
+def _claim(db: Session, job_id: int, now: datetime) -> bool:
+    """
+    Atomically move a queued or orphaned job to 'running'.
+    Keeps two workers (or a resume racing the original enqueue) from sending twice.
+    """
+    from ..models import BroadcastJob  # deferred to avoid circular imports
+
+    result = db.execute(
+        update(BroadcastJob)
+        .where(
+            BroadcastJob.id == job_id,
+            or_(
+                BroadcastJob.status == "queued",
+                (BroadcastJob.status == "running") & (BroadcastJob.updated_at < now - STALE_AFTER),
+            ),
+        )
+        .values(status="running", updated_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount == 1
+
+
+def _send_expo_chunk(messages: list) -> list:
+    """One Expo request. Returns per-message ('sent' | 'stale' | 'failed', ticket_id)."""
+    try:
+        tickets = PushClient().publish_multiple(messages)
+    except Exception as e:
+        print(f"[Broadcast] Expo chunk error: {e}")
+        return [("failed", None)] * len(messages)
+
+    outcomes = []
+    for ticket in tickets:
+        if ticket.is_success():
+            outcomes.append(("sent", ticket.id))
+        elif (ticket.details or {}).get("error") == "DeviceNotRegistered":
+            outcomes.append(("stale", None))
+        else:
+            outcomes.append(("failed", None))
+    return outcomes
+
+
+def _send_wave(pool: ThreadPoolExecutor, rows: list, job, web_payload: str) -> dict:
+    """Send one wave of (id, token, token_type) rows concurrently; returns counters + stale ids."""
+    from .push_web import VAPID_PRIVATE_KEY, send_to_subscription
+
+    expo_rows = [r for r in rows if r[2] == "expo" and r[1].startswith(("ExponentPushToken", "ExpoPushToken"))]
+    web_rows = [r for r in rows if r[2] == "web"]
+    counts = {"sent_expo": 0, "sent_web": 0, "failed": 0, "stale_ids": [], "tickets": []}
+    counts["failed"] += len(rows) - len(expo_rows) - len(web_rows)   # malformed tokens
+
+    futures = []
+    for i in range(0, len(expo_rows), EXPO_CHUNK_SIZE):
+        chunk = expo_rows[i:i + EXPO_CHUNK_SIZE]
+        messages = [
+            PushMessage(to=token, title=job.title, body=job.body, data=job.data or {}, sound="default")
+            for _, token, _ in chunk
+        ]
+        futures.append(("expo", chunk, pool.submit(_send_expo_chunk, messages)))
+
+    if web_rows and not VAPID_PRIVATE_KEY:
+        counts["failed"] += len(web_rows)   # web push not configured on this deployment
+        web_rows = []
+    for row in web_rows:
+        futures.append(("web", [row], pool.submit(send_to_subscription, row[1], web_payload)))
+
+    for kind, chunk, future in futures:
+        outcomes = future.result() if kind == "expo" else [
+            ({"sent": "sent", "expired": "stale"}.get(future.result(), "failed"), None)
+        ]
+        for (token_id, token, _), (outcome, ticket_id) in zip(chunk, outcomes):
+            if outcome == "sent":
+                counts["sent_expo" if kind == "expo" else "sent_web"] += 1
+                if ticket_id:
+                    counts["tickets"].append((ticket_id, token, None))
+            elif outcome == "stale":
+                counts["stale_ids"].append(token_id)
+            else:
+                counts["failed"] += 1
+    return counts
+
+
+def run_broadcast(job_id: int, now: Optional[datetime] = None) -> None:
+    """Scheduler entry point. Opens its own sessions; safe to call again after a crash."""
+    from ..database import engine
+    from ..models import BroadcastJob, PushToken  # deferred to avoid circular imports
+
+    now = now or datetime.utcnow()
+    with Session(engine) as db:
+        if not _claim(db, job_id, now):
+            return
+        job = db.get(BroadcastJob, job_id)
+        job.started_at = job.started_at or now
+        db.add(job)
+        db.commit()
+        print(f"[Broadcast] Job {job_id} running from token id > {job.last_token_id}")
+
+        web_payload = json.dumps({"title": job.title, "body": job.body, **(job.data or {})})
+        wave_size = EXPO_CHUNK_SIZE * BROADCAST_CONCURRENCY
+
+        try:
+            # Separate read session: progress commits on `db` must not end its cursor
+            with Session(engine) as reader, ThreadPoolExecutor(max_workers=BROADCAST_CONCURRENCY) as pool:
+                rows = reader.exec(
+                    select(PushToken.id, PushToken.token, PushToken.token_type)
+                    .where(PushToken.id > job.last_token_id)
+                    .order_by(PushToken.id)
+                    .execution_options(yield_per=BROADCAST_FETCH_SIZE, stream_results=True)
+                )
+                wave = []
+                for row in rows:
+                    wave.append(tuple(row))
+                    if len(wave) >= wave_size:
+                        _record_wave(db, job, _send_wave(pool, wave, job, web_payload), wave[-1][0])
+                        wave = []
+                if wave:
+                    _record_wave(db, job, _send_wave(pool, wave, job, web_payload), wave[-1][0])
+
+            job.status = "completed"
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)[:500]
+            print(f"[Broadcast] ✗ Job {job_id} failed: {e}")
+
+        job.finished_at = job.updated_at = datetime.utcnow()
+        db.add(job)
+        db.commit()
+        print(f"[Broadcast] Job {job_id} {job.status}: expo={job.sent_expo} web={job.sent_web} "
+              f"failed={job.failed} stale_removed={job.stale_removed}")
+
+
+def _record_wave(db: Session, job, counts: dict, last_token_id: int) -> None:
+    """Persist one wave's results and advance the resume cursor in a single commit."""
+    from ..models import PushToken  # deferred to avoid circular imports
+    from .receipts import record_tickets
+
+    record_tickets(db, counts["tickets"])
+    if counts["stale_ids"]:
+        db.exec(
+            delete(PushToken)
+            .where(PushToken.id.in_(counts["stale_ids"]))
+            .execution_options(synchronize_session=False)
+        )
+    job.sent_expo += counts["sent_expo"]
+    job.sent_web += counts["sent_web"]
+    job.failed += counts["failed"]
+    job.stale_removed += len(counts["stale_ids"])
+    job.last_token_id = last_token_id
+    job.updated_at = datetime.utcnow()
+    db.add(job)
+    db.commit()
+
+
+def resumable_job_ids(now: Optional[datetime] = None) -> list[int]:
+    """Queued jobs, plus running jobs whose worker stopped heartbeating."""
+    from ..database import engine
+    from ..models import BroadcastJob  # deferred to avoid circular imports
+
+    now = now or datetime.utcnow()
+    with Session(engine) as db:
+        return list(db.exec(
+            select(BroadcastJob.id).where(
+                or_(
+                    BroadcastJob.status == "queued",
+                    (BroadcastJob.status == "running") & (BroadcastJob.updated_at < now - STALE_AFTER),
+                )
+            )
+        ).all())
@@ -0,0 +1,163 @@
+# app/notifications/coalesce.py
+"""
+Coalescing stage for bursty notification events.
+
+A popular note can collect dozens of likes in a few minutes. For event types
+with a "coalesce" block in config.py, fire_event() folds every event that
+lands inside the window into the recipient's existing NotificationLog row
+instead of writing a new row and sending a new push:
+
+  1st like   → normal push + log row           "Alice liked your note"
+  2nd..Nth   → same log row rewritten in place "Bob and 12 others liked your note"
+  window end → ONE digest push with the final aggregated text
+
+The open row is found through the database (works across workers); only the
+pending digest push is kept in-process and is flushed by the scheduler.
+A restart between a merge and the flush drops that single digest push — the
+in-app history row is already up to date.
+"""
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlmodel import Session, select
+
+
+DEFAULT_WINDOW_SECONDS: int = int(os.getenv("NOTIFICATION_COALESCE_WINDOW_SECONDS", "600"))
+
+# Actor ids kept on the log row — enough to dedupe repeat actors without growing the JSON forever
+MAX_TRACKED_ACTORS = 50
+
+# log_id -> {"user_id", "title", "body", "data", "due_at"}
+_pending_digests: dict[int, dict] = {}
+_pending_lock = threading.Lock()
+
+
+def window_seconds(coalesce_cfg: dict) -> int:
+    return int(coalesce_cfg.get("window_seconds") or DEFAULT_WINDOW_SECONDS)
+
+
+def coalesce_key(coalesce_cfg: dict, extra: Optional[dict]) -> Optional[str]:
+    """Value that splits buckets within one event type, e.g. likes per note_id."""
+    field = coalesce_cfg.get("key")
+    if not field:
+        return None
+    value = (extra or {}).get(field)
+    return None if value is None else str(value)
+
+
+def others_phrase(count: int) -> str:
+    """'1 other' / '12 others' — count is the number of actors besides the named one."""
+    return f"{count} other" if count == 1 else f"{count} others"
+
+
+def find_open_log(
+    db: Session,
+    recipient_id: int,
+    event_type: str,
+    key: Optional[str],
+    window: int,
+    now: datetime,
+):
+    """
+    Return the NotificationLog row still accepting merges for this
+    recipient / event type / key, or None.
+
+    Windows are fixed, anchored at the first event of the group, so a steady
+    trickle of likes still produces a digest every `window` seconds.
+    """
+    from ..models import NotificationLog  # deferred to avoid circular imports
+
+    window_start = now - timedelta(seconds=window)
+    candidates = db.exec(
+        select(NotificationLog)
+        .where(
+            NotificationLog.user_id == recipient_id,
+            NotificationLog.event_type == event_type,
+            NotificationLog.sent_at >= window_start,
+        )
+        .order_by(NotificationLog.sent_at.desc())
+        .limit(20)
+    ).all()
+
+    for log in candidates:
+        data = log.data or {}
+        if data.get("coalesce_key") != key:
+            continue
+        started = data.get("coalesce_started_at")
+        if started and datetime.fromisoformat(started) >= window_start:
+            return log
+    return None
+
+
+def open_group_data(data: dict, actor_id: int, key: Optional[str], now: datetime) -> dict:
+    """Bookkeeping stored on the first log row of a coalescing group."""
+    return {
+        **data,
+        "count": 1,
+        "actor_ids": [actor_id],
+        "coalesce_key": key,
+        "coalesce_started_at": now.isoformat(),
+    }
+
+
+def merge_into_log(log, actor_id: int, title: str, body: str, data: dict, now: datetime) -> None:
+    """Fold one more actor into an open log row (caller commits)."""
+    old = log.data or {}
+    actor_ids = [a for a in old.get("actor_ids", []) if a != actor_id][-(MAX_TRACKED_ACTORS - 1):]
+    actor_ids.append(actor_id)
+
+    # JSON column has no mutation tracking — assign a fresh dict
+    log.data = {
+        **data,
+        "count": old.get("count", 1) + 1,
+        "actor_ids": actor_ids,
+        "coalesce_key": old.get("coalesce_key"),
+        "coalesce_started_at": old.get("coalesce_started_at"),
+    }
+    log.title = title
+    log.body = body
+    log.sent_at = now
+    log.is_read = False
+
+
+def schedule_digest(log, window: int) -> None:
+    """Queue (or replace) the digest push for this log row, due when its window closes."""
+    started = datetime.fromisoformat(log.data["coalesce_started_at"])
+    with _pending_lock:
+        _pending_digests[log.id] = {
+            "user_id": log.user_id,
+            "title": log.title,
+            "body": log.body,
+            "data": {k: v for k, v in log.data.items() if k not in ("actor_ids", "coalesce_key", "coalesce_started_at")},
+            "due_at": started + timedelta(seconds=window),
+        }
+
+
+def flush_coalesced_pushes(now: Optional[datetime] = None) -> int:
+    """
+    Send one digest push for every coalescing window that has closed.
+    Scheduler entry point — opens its own session. Returns digests sent.
+    """
+    from ..database import engine
+    from .push_mobile import send_expo_push
+    from .push_web import send_web_push
+
+    now = now or datetime.utcnow()
+    with _pending_lock:
+        due = [(log_id, d) for log_id, d in _pending_digests.items() if d["due_at"] <= now]
+        for log_id, _ in due:
+            del _pending_digests[log_id]
+
+    if not due:
+        return 0
+
+    with Session(engine) as db:
+        for _, digest in due:
+            send_expo_push(db, digest["user_id"], digest["title"], digest["body"], digest["data"])
+            send_web_push(db, digest["user_id"], digest["title"], digest["body"], digest["data"])
+        db.commit()     # tickets recorded / stale tokens removed by send_expo_push
+
+    print(f"[Notify:Coalesce] Sent {len(due)} digest push(es)")
+    return len(due)
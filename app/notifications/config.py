@@ -12,6 +12,13 @@ Template variables:
   {book_title}      — title of the relevant book (if any)
   {comment_preview} — first 60 chars of a comment (for comment events)
   Any extra key passed via `extra={}` in fire_event() becomes available here.
+
+Coalescing (optional "coalesce" block):
+  Bursty events (likes, follows) are folded into one log row + one digest push
+  per recipient while the window is open. See coalesce.py.
+    "window_seconds": window length (default NOTIFICATION_COALESCE_WINDOW_SECONDS)
+    "key":            extra={} field that splits groups, e.g. "note_id"
+    "title"/"body":   aggregated templates; also get {others} ("12 others") and {count}
 """
 
 NOTIFICATION_EVENTS: dict[str, dict] = {
@@ -22,6 +29,11 @@ NOTIFICATION_EVENTS: dict[str, dict] = {
         "body": "{actor} started following you",
         "is_active": True,
         "daily_cap": False,   # each new follower is a distinct event
+        "coalesce": {
+            "window_seconds": 900,
+            "title": "New followers 👥",
+            "body": "{actor} and {others} started following you",
+        },
     },
 
     "post_liked": {
@@ -29,6 +41,12 @@ NOTIFICATION_EVENTS: dict[str, dict] = {
         "body": "{actor} liked your note",
         "is_active": True,
         "daily_cap": False,
+        "coalesce": {
+            "window_seconds": 600,
+            "key": "note_id",     # one group per liked note
+            "title": "{actor} and {others} liked your post ❤️",
+            "body": "{actor} and {others} liked your note",
+        },
     },
 
     "post_commented": {
@@ -27,6 +27,16 @@ from sqlmodel import Session, select
 from .config import NOTIFICATION_EVENTS
 from .push_mobile import send_expo_push
 from .push_web import send_web_push
+from .coalesce import (
+    coalesce_key,
+    find_open_log,
+    merge_into_log,
+    open_group_data,
+    others_phrase,
+    schedule_digest,
+    window_seconds,
+)
+from .live import publish_logs
 
 
 # ── Helpers ───────────────────────────────────────────────────────────────────
@@ -127,7 +137,11 @@ def fire_event(
                        Use for testing on production before enabling.
 
     Returns:
-        Summary dict: {"sent": N, "skipped_cap": N, "skipped_self": N, "dry_run": bool}
+        Summary dict: {"sent": N, "coalesced": N, "skipped_cap": N, "skipped_self": N, "dry_run": bool}
+
+    Event types with a "coalesce" block in config.py are folded into the
+    recipient's open NotificationLog row while its window is open — no new
+    row, no new push; one digest push goes out when the window closes.
     """
     config = NOTIFICATION_EVENTS.get(event_type)
 
@@ -144,7 +158,14 @@ def fire_event(
     body  = _render_template(config["body"],  template_vars)
     data  = {"type": event_type, "actor_id": actor_id, **(extra or {})}
 
-    sent = skipped_cap = skipped_self = 0
+    coalesce_cfg = config.get("coalesce")
+    group_key = coalesce_key(coalesce_cfg, extra) if coalesce_cfg else None
+    window = window_seconds(coalesce_cfg) if coalesce_cfg else 0
+    now = datetime.utcnow()
+    new_logs = []
+    merged_logs = []
+
+    sent = coalesced = skipped_cap = skipped_self = 0
 
     for user_id in recipient_ids:
         # Never notify someone about their own action
@@ -163,6 +184,26 @@ def fire_event(
             skipped_cap += 1
             continue
 
+        # Coalesce into the recipient's open group for this event, if any
+        if coalesce_cfg:
+            open_log = find_open_log(db, user_id, event_type, group_key, window, now)
+            if open_log:
+                coalesced += 1
+                if actor_id in (open_log.data or {}).get("actor_ids", []):
+                    continue  # same actor again (e.g. unlike + like) — nothing new to say
+
+                count = (open_log.data or {}).get("count", 1) + 1
+                group_vars = {**template_vars, "others": others_phrase(count - 1), "count": count}
+                group_title = _render_template(coalesce_cfg["title"], group_vars)
+                group_body  = _render_template(coalesce_cfg["body"],  group_vars)
+                if dry_run:
+                    print(f"[Notify:DryRun] Would coalesce '{event_type}' into log {open_log.id}: {group_body!r}")
+                else:
+                    merge_into_log(open_log, actor_id, group_title, group_body, data, now)
+                    db.add(open_log)
+                    merged_logs.append(open_log)
+                continue
+
         if dry_run:
             print(f"[Notify:DryRun] Would send '{event_type}' to user {user_id}: {title!r} / {body!r}")
         else:
@@ -172,25 +213,33 @@ def fire_event(
 
             # Log every sent notification for history / unread count
             from ..models import NotificationLog
-            db.add(NotificationLog(
+            log = NotificationLog(
                 user_id=user_id,
                 actor_id=actor_id,
                 event_type=event_type,
                 title=title,
                 body=body,
-                data=data,
-            ))
+                data=open_group_data(data, actor_id, group_key, now) if coalesce_cfg else data,
+                sent_at=now,
+            )
+            db.add(log)
+            new_logs.append(log)
 
         sent += 1
 
-    if not dry_run and sent > 0:
+    if not dry_run and (sent > 0 or merged_logs):
         db.commit()
+        for log in merged_logs:
+            schedule_digest(log, window)
+        # Live streams (SSE) — after commit so clients never see an uncommitted row
+        publish_logs(db, new_logs + merged_logs)
 
     summary = {
         "sent": sent,
+        "coalesced": coalesced,
         "skipped_self": skipped_self,
         "skipped_cap": skipped_cap,
         "dry_run": dry_run,
     }
-    print(f"[Notify] {event_type}: sent={sent}, skipped_cap={skipped_cap}, dry_run={dry_run}")
+    print(f"[Notify] {event_type}: sent={sent}, coalesced={coalesced}, skipped_cap={skipped_cap}, dry_run={dry_run}")
     return summary
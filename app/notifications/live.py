@@ -0,0 +1,156 @@
+# app/notifications/live.py
+"""
+In-process pub/sub hub for live notification delivery (Server-Sent Events).
+
+GET /notifications/stream subscribes the caller here; fire_event(), the
+scheduler and mark-read publish to it after their commit. Clients get new
+NotificationLog entries and unread-count changes pushed instead of polling
+/notifications/unread-count and /notifications/history.
+
+Backpressure: each subscriber has a bounded queue. A client that falls
+QUEUE_SIZE events behind has its backlog dropped and receives a single
+"resync" event instead, telling it to refetch /history once.
+
+The hub is per-process: with several workers a client only hears events
+published by the worker it is connected to. Clients should keep a slow
+fallback poll for that case.
+"""
+import asyncio
+import os
+import threading
+from typing import Optional
+
+from sqlmodel import Session, select, func
+
+
+QUEUE_SIZE: int = int(os.getenv("NOTIFICATION_STREAM_QUEUE_SIZE", "100"))
+HEARTBEAT_SECONDS: int = int(os.getenv("NOTIFICATION_STREAM_HEARTBEAT_SECONDS", "15"))
+MAX_STREAMS_PER_USER: int = int(os.getenv("NOTIFICATION_STREAM_MAX_PER_USER", "5"))
+
+
+class Subscriber:
+    """One open stream. Owned by the event loop it was created on."""
+
+    def __init__(self, user_id: int, loop: asyncio.AbstractEventLoop, queue_size: int):
+        self.user_id = user_id
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.closed = False
+
+    def _put(self, event: str, data: dict) -> None:
+        """Runs on the subscriber's loop."""
+        if self.closed:
+            return
+        try:
+            self.queue.put_nowait((event, data))
+        except asyncio.QueueFull:
+            # Slow consumer — drop the backlog, tell the client to refetch once
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(("resync", {}))
+
+    def close(self) -> None:
+        """Ask the stream loop to end (runs on the subscriber's loop)."""
+        self.closed = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(("close", {}))
+
+
+class NotificationHub:
+    def __init__(self, queue_size: int = QUEUE_SIZE, max_per_user: int = MAX_STREAMS_PER_USER):
+        self.queue_size = queue_size
+        self.max_per_user = max_per_user
+        self._subs: dict[int, list[Subscriber]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id: int) -> Subscriber:
+        """Register a stream. Must be called from inside the running event loop."""
+        sub = Subscriber(user_id, asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            subs = self._subs.setdefault(user_id, [])
+            subs.append(sub)
+            # Cap streams per user — oldest tab loses
+            evicted = subs[:-self.max_per_user] if len(subs) > self.max_per_user else []
+            del subs[:len(evicted)]
+        for old in evicted:
+            old.loop.call_soon_threadsafe(old.close)
+        return sub
+
+    def unsubscribe(self, sub: Subscriber) -> None:
+        with self._lock:
+            subs = self._subs.get(sub.user_id, [])
+            if sub in subs:
+                subs.remove(sub)
+            if not subs:
+                self._subs.pop(sub.user_id, None)
+
+    def has_subscribers(self, user_id: int) -> bool:
+        return user_id in self._subs
+
+    def connection_count(self) -> int:
+        with self._lock:
+            return sum(len(s) for s in self._subs.values())
+
+    def publish(self, user_id: int, event: str, data: dict) -> None:
+        """Thread-safe: callable from sync routes running in the threadpool."""
+        with self._lock:
+            subs = list(self._subs.get(user_id, ()))
+        for sub in subs:
+            try:
+                sub.loop.call_soon_threadsafe(sub._put, event, data)
+            except RuntimeError:
+                # Loop already closed (shutdown) — the stream is gone anyway
+                self.unsubscribe(sub)
+
+
+hub = NotificationHub()
+
+
+# ── Publishing helpers ────────────────────────────────────────────────────────
+
+def serialize_log(log) -> dict:
+    """Same shape as one entry of GET /notifications/history."""
+    return {
+        "id": log.id,
+        "event_type": log.event_type,
+        "title": log.title,
+        "body": log.body,
+        "data": log.data,
+        "is_read": log.is_read,
+        "sent_at": log.sent_at.isoformat() + "Z",
+    }
+
+
+def count_unread(db: Session, user_id: int) -> int:
+    from ..models import NotificationLog  # deferred to avoid circular imports
+
+    return db.exec(
+        select(func.count(NotificationLog.id)).where(
+            NotificationLog.user_id == user_id,
+            NotificationLog.is_read == False,
+        )
+    ).one()
+
+
+def publish_logs(db: Session, logs: list) -> None:
+    """
+    Push committed NotificationLog rows to their recipients' open streams.
+    Costs nothing for recipients without a stream.
+    """
+    user_ids = set()
+    for log in logs:
+        if hub.has_subscribers(log.user_id):
+            hub.publish(log.user_id, "notification", serialize_log(log))
+            user_ids.add(log.user_id)
+    for user_id in user_ids:
+        publish_unread(db, user_id)
+
+
+def publish_unread(db: Session, user_id: int, unread: Optional[int] = None) -> None:
+    """Push the current unread count (the bell badge) to a user's open streams."""
+    if not hub.has_subscribers(user_id):
+        return
+    if unread is None:
+        unread = count_unread(db, user_id)
+    hub.publish(user_id, "unread", {"unread": unread})
@@ -4,13 +4,14 @@ Expo push notification sender for the mobile app.
 Uses exponent-server-sdk for proper error handling (stale token removal, etc.)
 """
 from typing import Optional
+from sqlalchemy import delete
 from sqlmodel import Session, select
 
 from exponent_server_sdk import (
-    DeviceNotRegisteredError,
     PushClient,
     PushMessage,
     PushServerError,
+    PushTicket,
 )
 
 
@@ -23,9 +24,14 @@ def send_expo_push(
 ) -> None:
     """
     Send a push notification to all Expo-registered devices for a user.
-    Automatically removes stale/expired tokens from the database.
+
+    All of the user's devices go in one Expo request. Accepted pushes have their
+    ticket ids stored so the receipt job (receipts.py) can find tokens Expo only
+    reports as dead later; tokens already rejected here are removed in one delete.
+    Both ride in the caller's transaction — caller commits.
     """
     from ..models import PushToken  # deferred to avoid circular imports
+    from .receipts import record_tickets
 
     tokens = db.exec(
         select(PushToken).where(
@@ -37,28 +43,37 @@ def send_expo_push(
     if not tokens:
         return  # no mobile devices registered for this user
 
-    for push_token in tokens:
-        try:
-            response = PushClient().publish(
-                PushMessage(
-                    to=push_token.token,
-                    title=title,
-                    body=body,
-                    data=data,
-                    sound="default",
-                )
-            )
-            response.validate_response()
-            print(f"[Push:Mobile] ✓ Sent '{title}' to user {user_id}")
-
-        except DeviceNotRegisteredError:
-            # Token is no longer valid — remove to avoid future failed sends
-            print(f"[Push:Mobile] ✗ Stale token removed for user {user_id}: {push_token.token[:30]}...")
-            db.delete(push_token)
-            db.commit()
+    messages = [
+        PushMessage(to=t.token, title=title, body=body, data=data, sound="default")
+        for t in tokens
+    ]
+    try:
+        tickets = PushClient().publish_multiple(messages)
+    except PushServerError as e:
+        print(f"[Push:Mobile] ✗ Expo server error for user {user_id}: {e}")
+        return
+    except Exception as e:
+        print(f"[Push:Mobile] ✗ Unexpected error for user {user_id}: {e}")
+        return
 
-        except PushServerError as e:
-            print(f"[Push:Mobile] ✗ Expo server error for user {user_id}: {e}")
+    accepted, stale = [], []
+    for push_token, ticket in zip(tokens, tickets):
+        if ticket.is_success():
+            if ticket.id:
+                accepted.append((ticket.id, push_token.token, user_id))
+        elif (ticket.details or {}).get("error") == PushTicket.ERROR_DEVICE_NOT_REGISTERED:
+            stale.append(push_token.token)
+        else:
+            print(f"[Push:Mobile] ✗ Expo rejected push for user {user_id}: {ticket.message}")
 
-        except Exception as e:
-            print(f"[Push:Mobile] ✗ Unexpected error for user {user_id}: {e}")
+    if stale:
+        # Token is no longer valid — remove to avoid future failed sends
+        print(f"[Push:Mobile] ✗ {len(stale)} stale token(s) removed for user {user_id}")
+        db.exec(
+            delete(PushToken)
+            .where(PushToken.token.in_(stale))
+            .execution_options(synchronize_session=False)
+        )
+    record_tickets(db, accepted)
+    if accepted:
+        print(f"[Push:Mobile] ✓ Sent '{title}' to user {user_id} ({len(accepted)} device(s))")
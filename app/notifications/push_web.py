@@ -58,7 +58,7 @@ def send_web_push(
     from ..models import PushToken  # deferred to avoid circular imports
 
     try:
-        from pywebpush import webpush, WebPushException
+        import pywebpush  # noqa: F401
     except ImportError:
         print("[Push:Web] pywebpush not installed — skipping web push")
         return
@@ -73,27 +73,38 @@ def send_web_push(
     if not tokens:
         return  # no PWA subscriptions for this user
 
-    vapid_claims = {"sub": f"mailto:{VAPID_CONTACT_EMAIL}"}
     payload = json.dumps({"title": title, "body": body, **data})
 
     for push_token in tokens:
-        try:
-            subscription = json.loads(push_token.token)
-
-            webpush(
-                subscription_info=subscription,
-                data=payload,
-                vapid_private_key=VAPID_PRIVATE_KEY,
-                vapid_claims=vapid_claims,
-            )
+        result = send_to_subscription(push_token.token, payload)
+        if result == "sent":
             print(f"[Push:Web] ✓ Sent '{title}' to user {user_id}")
+        elif result == "expired":
+            # Subscription expired — browser unsubscribed
+            print(f"[Push:Web] ✗ Expired web subscription removed for user {user_id}")
+            db.delete(push_token)
+            db.commit()
 
-        except Exception as e:
-            error_str = str(e)
-            if "410" in error_str or "404" in error_str:
-                # Subscription expired — browser unsubscribed
-                print(f"[Push:Web] ✗ Expired web subscription removed for user {user_id}")
-                db.delete(push_token)
-                db.commit()
-            else:
-                print(f"[Push:Web] ✗ Error for user {user_id}: {e}")
+
+def send_to_subscription(subscription: str, payload: str) -> str:
+    """
+    Deliver one already-serialized payload to one stored subscription.
+    Returns 'sent', 'expired' (410/404 — caller should delete the token) or 'failed'.
+    No DB access, so it is safe to call from worker threads (admin broadcast).
+    """
+    from pywebpush import webpush
+
+    try:
+        webpush(
+            subscription_info=json.loads(subscription),
+            data=payload,
+            vapid_private_key=VAPID_PRIVATE_KEY,
+            vapid_claims={"sub": f"mailto:{VAPID_CONTACT_EMAIL}"},
+        )
+        return "sent"
+    except Exception as e:
+        error_str = str(e)
+        if "410" in error_str or "404" in error_str:
+            return "expired"
+        print(f"[Push:Web] ✗ Error: {e}")
+        return "failed"
@@ -0,0 +1,113 @@
+# app/notifications/receipts.py
+"""
+Expo push receipt polling.
+
+A successful Expo ticket only means Expo accepted the push. Whether the device
+is still registered is reported later, in the push *receipt*. Without checking
+receipts a dead token keeps costing a send on every future notification.
+
+  send path  → record_tickets() stores each accepted ticket id
+  every 15 m → check_push_receipts() fetches receipts for tickets older than
+               RECEIPT_DELAY, 1000 ids per request (Expo's limit), removes all
+               DeviceNotRegistered tokens in one bulk delete and drops the
+               checked tickets
+
+Expo keeps receipts for 24 h; tickets older than that without a receipt are
+dropped too.
+"""
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, insert
+from sqlmodel import Session, select
+
+from exponent_server_sdk import PushClient, PushReceipt, PushTicket
+
+
+RECEIPT_BATCH_SIZE = 1000   # Expo getReceipts limit
+RECEIPT_DELAY = timedelta(minutes=int(os.getenv("EXPO_RECEIPT_DELAY_MINUTES", "15")))
+RECEIPT_MAX_AGE = timedelta(hours=24)
+# Upper bound per run so one slow run cannot overlap the next
+RECEIPT_MAX_BATCHES: int = int(os.getenv("EXPO_RECEIPT_MAX_BATCHES", "50"))
+
+
+def record_tickets(db: Session, tickets: list) -> None:
+    """
+    Queue accepted Expo tickets for receipt checking (caller commits).
+    tickets: [(ticket_id, token, user_id), ...]
+    """
+    from ..models import ExpoPushTicket  # deferred to avoid circular imports
+
+    if not tickets:
+        return
+    now = datetime.utcnow()
+    db.exec(insert(ExpoPushTicket).values([
+        {"ticket_id": ticket_id, "token": token, "user_id": user_id, "created_at": now}
+        for ticket_id, token, user_id in tickets
+    ]))
+
+
+def check_push_receipts(now: Optional[datetime] = None) -> dict:
+    """Scheduler entry point — opens its own session. Returns counters for logging/tests."""
+    from ..database import engine
+    from ..models import ExpoPushTicket, PushToken  # deferred to avoid circular imports
+
+    now = now or datetime.utcnow()
+    checked = 0
+    dead_tokens: set[str] = set()
+    last_id = 0
+
+    with Session(engine) as db:
+        client = PushClient()
+        for _ in range(RECEIPT_MAX_BATCHES):
+            batch = db.exec(
+                select(ExpoPushTicket.id, ExpoPushTicket.ticket_id, ExpoPushTicket.token, ExpoPushTicket.created_at)
+                .where(ExpoPushTicket.id > last_id, ExpoPushTicket.created_at <= now - RECEIPT_DELAY)
+                .order_by(ExpoPushTicket.id)
+                .limit(RECEIPT_BATCH_SIZE)
+            ).all()
+            if not batch:
+                break
+            last_id = batch[-1][0]
+
+            try:
+                receipts = client.check_receipts_multiple(
+                    [PushTicket(None, PushTicket.SUCCESS_STATUS, None, None, row[1]) for row in batch]
+                )
+            except Exception as e:
+                print(f"[Push:Receipts] ✗ getReceipts failed: {e}")
+                break
+
+            by_ticket = {r.id: r for r in receipts}
+            done = []
+            for row_id, ticket_id, token, created_at in batch:
+                receipt = by_ticket.get(ticket_id)
+                if receipt is None:
+                    # Not ready yet — retry next run, unless Expo has already forgotten it
+                    if created_at <= now - RECEIPT_MAX_AGE:
+                        done.append(row_id)
+                    continue
+                done.append(row_id)
+                if (receipt.details or {}).get("error") == PushReceipt.ERROR_DEVICE_NOT_REGISTERED:
+                    dead_tokens.add(token)
+
+            if done:
+                db.exec(
+                    delete(ExpoPushTicket)
+                    .where(ExpoPushTicket.id.in_(done))
+                    .execution_options(synchronize_session=False)
+                )
+                checked += len(done)
+
+        if dead_tokens:
+            db.exec(
+                delete(PushToken)
+                .where(PushToken.token.in_(dead_tokens))
+                .execution_options(synchronize_session=False)
+            )
+        db.commit()
+
+    if checked:
+        print(f"[Push:Receipts] Checked {checked} ticket(s), removed {len(dead_tokens)} dead token(s)")
+    return {"checked": checked, "tokens_removed": len(dead_tokens)}
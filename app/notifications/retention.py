@@ -0,0 +1,151 @@
+# app/notifications/retention.py
+"""
+NotificationLog retention job.
+
+NotificationLog gains one row per recipient per event and nothing ever reads
+rows older than the 30-day window used by /notifications/history. This job
+moves rows past NOTIFICATION_RETENTION_DAYS out of the table in small batches
+so cap checks and unread queries keep hitting a small table.
+
+Modes (NOTIFICATION_RETENTION_MODE):
+  archive — append each batch to a gzip JSONL file in NOTIFICATION_ARCHIVE_DIR,
+            then delete it from the table (default)
+  delete  — delete without keeping a copy
+
+Runs daily from the scheduler; admins can also trigger it from
+POST /notifications/admin/retention/run.
+"""
+import gzip
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete
+from sqlmodel import Session, select
+
+from ..database import BASE_DIR, engine
+
+
+RETENTION_DAYS: int = int(os.getenv("NOTIFICATION_RETENTION_DAYS", "90"))
+RETENTION_MODE: str = os.getenv("NOTIFICATION_RETENTION_MODE", "archive")   # 'archive' | 'delete'
+RETENTION_BATCH_SIZE: int = int(os.getenv("NOTIFICATION_RETENTION_BATCH_SIZE", "1000"))
+ARCHIVE_DIR: str = os.getenv(
+    "NOTIFICATION_ARCHIVE_DIR",
+    os.path.join(BASE_DIR, "archives", "notifications"),
+)
+
+# Last run + running totals, exposed via GET /notifications/admin/retention
+RETENTION_METRICS: dict = {
+    "runs": 0,
+    "total_archived": 0,
+    "total_deleted": 0,
+    "last_run": None,
+}
+
+
+def _row_to_json(log) -> str:
+    return json.dumps({
+        "id": log.id,
+        "user_id": log.user_id,
+        "actor_id": log.actor_id,
+        "event_type": log.event_type,
+        "title": log.title,
+        "body": log.body,
+        "data": log.data,
+        "is_read": log.is_read,
+        "sent_at": log.sent_at.isoformat() if log.sent_at else None,
+    }, ensure_ascii=False)
+
+
+def prune_notification_log(
+    db: Session,
+    max_age_days: int = RETENTION_DAYS,
+    mode: str = RETENTION_MODE,
+    batch_size: int = RETENTION_BATCH_SIZE,
+    archive_dir: str = ARCHIVE_DIR,
+    now: Optional[datetime] = None,
+) -> dict:
+    """
+    Remove NotificationLog rows older than `max_age_days`, one batch per commit.
+
+    Batches are picked in id order so each DELETE is a short primary-key range
+    and never holds a long lock on the table. In archive mode the batch is
+    written (and flushed) to the gzip file before it is deleted, so a crash
+    mid-run can at worst leave a row both archived and still in the table.
+
+    Returns the metrics for this run.
+    """
+    from ..models import NotificationLog  # deferred to avoid circular imports
+
+    if mode not in ("archive", "delete"):
+        raise ValueError(f"Unknown retention mode: {mode!r}")
+
+    started = time.monotonic()
+    cutoff = (now or datetime.utcnow()) - timedelta(days=max_age_days)
+    archived = deleted = batches = 0
+    archive_path = None
+    archive_file = None
+
+    try:
+        last_id = 0
+        while True:
+            batch = db.exec(
+                select(NotificationLog)
+                .where(NotificationLog.sent_at < cutoff, NotificationLog.id > last_id)
+                .order_by(NotificationLog.id)
+                .limit(batch_size)
+            ).all()
+            if not batch:
+                break
+
+            if mode == "archive":
+                if archive_file is None:
+                    os.makedirs(archive_dir, exist_ok=True)
+                    stamp = (now or datetime.utcnow()).strftime("%Y%m%d-%H%M%S")
+                    archive_path = os.path.join(archive_dir, f"notificationlog-{stamp}.jsonl.gz")
+                    archive_file = gzip.open(archive_path, "at", encoding="utf-8")
+                archive_file.write("".join(_row_to_json(log) + "\n" for log in batch))
+                archive_file.flush()
+                archived += len(batch)
+
+            ids = [log.id for log in batch]
+            last_id = ids[-1]
+            db.exec(
+                delete(NotificationLog)
+                .where(NotificationLog.id.in_(ids))
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+            # Deleted rows are still in the identity map — drop them so a long run stays flat in memory
+            db.expunge_all()
+            deleted += len(ids)
+            batches += 1
+    finally:
+        if archive_file is not None:
+            archive_file.close()
+
+    run = {
+        "cutoff": cutoff.isoformat(),
+        "mode": mode,
+        "rows_archived": archived,
+        "rows_deleted": deleted,
+        "batches": batches,
+        "archive_file": archive_path,
+        "duration_ms": round((time.monotonic() - started) * 1000),
+        "finished_at": datetime.utcnow().isoformat(),
+    }
+    RETENTION_METRICS["runs"] += 1
+    RETENTION_METRICS["total_archived"] += archived
+    RETENTION_METRICS["total_deleted"] += deleted
+    RETENTION_METRICS["last_run"] = run
+
+    print(f"[Retention] NotificationLog: deleted={deleted}, archived={archived}, batches={batches}, cutoff={cutoff:%Y-%m-%d}")
+    return run
+
+
+def run_notification_retention() -> None:
+    """Scheduler entry point — opens its own session."""
+    with Session(engine) as db:
+        prune_notification_log(db)
@@ -3,21 +3,30 @@
 Notification endpoints:
   - PWA web push subscription management
   - Notification history + unread count for in-app badge
-  - Admin: list/toggle event configs, test-fire any event
+  - Live stream (SSE) of new notifications + unread count
+  - Admin: list/toggle event configs, test-fire any event, NotificationLog retention
 """
+import asyncio
 import json
 import os
 from datetime import datetime
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from fastapi.security import HTTPAuthorizationCredentials
 from pydantic import BaseModel
 from sqlmodel import Session, select
+from starlette.concurrency import run_in_threadpool
 
-from ..deps import get_db, get_current_user, get_admin_user
-from .. import models
+from ..database import engine
+from ..deps import get_db, get_current_user, get_admin_user, bearer_scheme
+from .. import auth, crud, models
+from ..deletion import user_deletion_requested
 from .config import NOTIFICATION_EVENTS
 from .dispatcher import fire_event
+from .live import HEARTBEAT_SECONDS, count_unread, hub, publish_unread, serialize_log
+from .retention import RETENTION_METRICS, prune_notification_log
 
 router = APIRouter(prefix="/notifications", tags=["notifications"])
 
@@ -113,13 +122,7 @@ def unread_count(
     db: Session = Depends(get_db),
 ):
     """Returns number of unread notifications. Use for the bell badge in the app."""
-    count = db.exec(
-        select(models.NotificationLog).where(
-            models.NotificationLog.user_id == current_user.id,
-            models.NotificationLog.is_read == False,
-        )
-    ).all()
-    return {"unread": len(count)}
+    return {"unread": count_unread(db, current_user.id)}
 
 
 @router.get("/history")
@@ -141,18 +144,7 @@ def notification_history(
         .limit(limit)
     ).all()
 
-    return [
-        {
-            "id": log.id,
-            "event_type": log.event_type,
-            "title": log.title,
-            "body": log.body,
-            "data": log.data,
-            "is_read": log.is_read,
-            "sent_at": log.sent_at.isoformat() + "Z",
-        }
-        for log in logs
-    ]
+    return [serialize_log(log) for log in logs]
 
 
 @router.post("/mark-read", status_code=status.HTTP_200_OK)
@@ -173,9 +165,99 @@ def mark_all_read(
         db.add(log)
 
     db.commit()
+    publish_unread(db, current_user.id, unread=0)
     return {"message": f"Marked {len(unread)} notifications as read"}
 
 
+# ── Live stream (Server-Sent Events) ──────────────────────────────────────────
+
+def _stream_user_id(token: Optional[str]) -> Optional[int]:
+    """
+    Resolve the stream's user with a short-lived session.
+    Deliberately not Depends(get_db): a dependency session would stay open —
+    holding a pooled connection — for the whole life of the stream.
+    """
+    payload = auth.decode_token(token) if token else None
+    sub = payload.get("sub") if payload else None
+    if sub is None:
+        return None
+    with Session(engine) as db:
+        user = None
+        try:
+            user = crud.get_user_by_id(db, user_id=int(sub))
+        except (TypeError, ValueError):
+            pass
+        if user is None and isinstance(sub, str) and "@" in sub:
+            user = crud.get_user_by_email(db, email=sub)
+        if user is None or user_deletion_requested(db, user.id):
+            return None
+        return user.id
+
+
+def _initial_unread(user_id: int) -> int:
+    with Session(engine) as db:
+        return count_unread(db, user_id)
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@router.get("/stream")
+async def notification_stream(
+    request: Request,
+    token: Optional[str] = None,
+    creds: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
+):
+    """
+    Server-Sent Events stream of the current user's notifications.
+    Replaces polling /unread-count and /history while the app is open.
+
+    Auth: Bearer header, or ?token=<jwt> for browser EventSource (which
+    cannot set headers).
+
+    Events:
+        unread        {"unread": N}                 — on connect and whenever it changes
+        notification  <same shape as /history item> — new or updated (coalesced) entry
+        resync        {}                            — client fell behind; refetch /history
+    A ": ping" comment is sent every NOTIFICATION_STREAM_HEARTBEAT_SECONDS to keep
+    proxies from closing idle connections.
+    """
+    user_id = await run_in_threadpool(_stream_user_id, creds.credentials if creds else token)
+    if user_id is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+    unread = await run_in_threadpool(_initial_unread, user_id)
+
+    async def event_stream():
+        sub = hub.subscribe(user_id)
+        try:
+            yield "retry: 5000\n\n"
+            yield _sse("unread", {"unread": unread})
+            while True:
+                try:
+                    event, data = await asyncio.wait_for(sub.queue.get(), timeout=HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": ping\n\n"
+                    continue
+                if event == "close":
+                    break
+                yield _sse(event, data)
+        finally:
+            hub.unsubscribe(sub)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",   # stop nginx/Render proxies from buffering the stream
+        },
+    )
+
+
 # ── Per-user notification preferences ────────────────────────────────────────
 
 # The preference keys exposed to users (subset of all event types)
@@ -292,3 +374,41 @@ def test_fire_event(
         "message": f"{'[DRY RUN] ' if dry_run else ''}Test event '{event_type}' fired to user {user_id}",
         **result,
     }
+
+
+# ── Admin: NotificationLog retention ──────────────────────────────────────────
+
+@router.get("/admin/stream-stats")
+def stream_stats(admin_user: models.User = Depends(get_admin_user)):
+    """Open SSE connections on this worker."""
+    return {"connections": hub.connection_count()}
+
+
+@router.get("/admin/retention")
+def retention_metrics(admin_user: models.User = Depends(get_admin_user)):
+    """Rows moved by the NotificationLog retention job — last run + totals since startup."""
+    return RETENTION_METRICS
+
+
+@router.post("/admin/retention/run")
+def run_retention(
+    max_age_days: Optional[int] = None,
+    mode: Optional[str] = None,
+    admin_user: models.User = Depends(get_admin_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Run the retention job now instead of waiting for the 03:00 UTC schedule.
+    Defaults come from NOTIFICATION_RETENTION_DAYS / NOTIFICATION_RETENTION_MODE.
+    """
+    kwargs = {}
+    if max_age_days is not None:
+        if max_age_days < 30:
+            # /history shows 30 days — never prune what the inbox can still display
+            raise HTTPException(status_code=400, detail="max_age_days must be at least 30")
+        kwargs["max_age_days"] = max_age_days
+    if mode is not None:
+        if mode not in ("archive", "delete"):
+            raise HTTPException(status_code=400, detail="mode must be 'archive' or 'delete'")
+        kwargs["mode"] = mode
+    return prune_notification_log(db, **kwargs)
@@ -1,23 +1,71 @@
 # app/notifications/scheduler.py
 """
-Daily inactivity reminder scheduler.
+Background scheduler for notification jobs.
 
-Runs once per day at 14:30 UTC (8 PM IST).
-Finds users who have not been active today and sends a reading reminder push.
+  - Inactivity reminder: daily at 14:30 UTC (8 PM IST). Finds users who have
+    not been active today and sends a reading reminder push.
+  - NotificationLog retention: daily at 03:00 UTC. Archives / deletes log rows
+    older than NOTIFICATION_RETENTION_DAYS (see retention.py).
+  - Coalesced digests: every 30 s. Sends the one aggregated push for each
+    coalescing window that has closed (see coalesce.py).
+  - Admin broadcasts: one-off job per broadcast (enqueue_broadcast), plus a
+    check every minute that resumes queued / orphaned broadcasts (see broadcast.py).
+  - Expo receipts: every 15 min. Fetches push receipts and bulk-removes
+    DeviceNotRegistered tokens (see receipts.py).
+  - Group goal counters: daily at 03:30 UTC. Recomputes group_goal_counter from
+    ReadingActivity, fixes drift and drops past periods (see app/group_goals.py).
+  - Reading insights: daily at 03:45 UTC. Recomputes user_reading_stats from
+    ReadingActivity / UserBook and fixes drift (see app/reading_stats.py).
+  - Group / account deletions: one-off job per deletion (enqueue_deletion), plus
+    a check every minute that resumes queued / orphaned ones (see app/deletion.py).
+  - Group discovery ranking: every 15 min. Rebuilds group_discovery_rank
+    (see app/group_discovery.py).
+  - Google Books cache: daily at 04:00 UTC. Deletes google_books_cache rows
+    too old to be served even stale (see app/google_books_cache.py).
+
+Environment:
+    SCHEDULER_ENABLED=0             start_scheduler() does nothing (tests, one-off scripts)
+    SCHEDULER_RESUME_ON_STARTUP=0   the broadcast / deletion resume checks wait for
+                                    their first minute instead of running at startup
+The resume checks skip quietly until the broadcastjob / deletion_job migrations have run.
 """
 
+import os
 from datetime import date, datetime
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
+from sqlalchemy import inspect
 from sqlmodel import Session, select
 
 from ..database import engine
 from .. import models
 from .push_mobile import send_expo_push
 from .config import NOTIFICATION_EVENTS
+from .retention import run_notification_retention
+from .coalesce import flush_coalesced_pushes
+from .live import publish_logs
+from .broadcast import resumable_job_ids, run_broadcast
+from .receipts import check_push_receipts
+from ..group_goals import run_goal_verification
+from ..group_discovery import run_discovery_refresh
+from ..deletion import resumable_deletion_ids, run_deletion
+from ..reading_stats import run_reconcile as run_reading_stats_reconcile
+from ..google_books_cache import run_prune as run_google_books_cache_prune
+
+SCHEDULER_ENABLED: bool = os.getenv("SCHEDULER_ENABLED", "1") == "1"
+RESUME_ON_STARTUP: bool = os.getenv("SCHEDULER_RESUME_ON_STARTUP", "1") == "1"
 
 scheduler = AsyncIOScheduler(timezone="UTC")
+_tables_present: set[str] = set()
+
+
+def _table_ready(name: str) -> bool:
+    """Whether the migration creating `name` has run (cached once it has)."""
+    if name not in _tables_present and inspect(engine).has_table(name):
+        _tables_present.add(name)
+    return name in _tables_present
 
 
 def _send_inactivity_reminders() -> None:
@@ -31,6 +79,7 @@ def _send_inactivity_reminders() -> None:
     body: str = event_cfg["body"]
     today = date.today()
     sent = 0
+    logs = []
 
     with Session(engine) as db:
         # Only consider users who have at least one registered Expo push token
@@ -68,15 +117,64 @@ def _send_inactivity_reminders() -> None:
                 data={"type": "streak_reminder"},
             )
             db.add(log)
+            logs.append(log)
             sent += 1
 
         db.commit()
+        publish_logs(db, logs)
 
     print(f"[scheduler] Inactivity reminders sent: {sent} users notified.")
 
 
+def enqueue_broadcast(job_id: int) -> None:
+    """Run a BroadcastJob in the scheduler's thread pool, off the request path."""
+    scheduler.add_job(
+        run_broadcast,
+        args=[job_id],
+        id=f"broadcast_{job_id}",
+        replace_existing=True,
+        misfire_grace_time=None,   # always run, however late
+    )
+
+
+def _resume_broadcasts() -> None:
+    """Re-enqueue broadcasts left queued or orphaned by a restart. run_broadcast() claims atomically."""
+    if not _table_ready("broadcastjob"):
+        return
+    for job_id in resumable_job_ids():
+        if scheduler.get_job(f"broadcast_{job_id}") is None:
+            print(f"[scheduler] Resuming broadcast job {job_id}")
+            enqueue_broadcast(job_id)
+
+
+def enqueue_deletion(job_id: int) -> None:
+    """Run a DeletionJob in the scheduler's thread pool, off the request path."""
+    scheduler.add_job(
+        run_deletion,
+        args=[job_id],
+        id=f"deletion_{job_id}",
+        replace_existing=True,
+        misfire_grace_time=None,   # always run, however late
+    )
+
+
+def _resume_deletions() -> None:
+    """Re-enqueue deletions left queued or orphaned by a restart. run_deletion() claims atomically."""
+    if not _table_ready("deletion_job"):
+        return
+    for job_id in resumable_deletion_ids():
+        if scheduler.get_job(f"deletion_{job_id}") is None:
+            print(f"[scheduler] Resuming deletion job {job_id}")
+            enqueue_deletion(job_id)
+
+
 def start_scheduler() -> None:
     """Register jobs and start the background scheduler. Call once at app startup."""
+    if not SCHEDULER_ENABLED:
+        print("[scheduler] Disabled (SCHEDULER_ENABLED=0)")
+        return
+    # Pick up interrupted broadcasts / deletions right after a restart
+    resume_now = {"next_run_time": datetime.utcnow()} if RESUME_ON_STARTUP else {}
     scheduler.add_job(
         _send_inactivity_reminders,
         CronTrigger(hour=14, minute=30, timezone="UTC"),   # 14:30 UTC = 8:00 PM IST
@@ -84,9 +182,84 @@ def start_scheduler() -> None:
         replace_existing=True,
         misfire_grace_time=3600,   # if server was down, still run if missed within 1 hr
     )
+    scheduler.add_job(
+        run_notification_retention,
+        CronTrigger(hour=3, minute=0, timezone="UTC"),     # quiet hours for both IST and US users
+        id="notification_retention",
+        replace_existing=True,
+        misfire_grace_time=6 * 3600,
+        coalesce=True,
+    )
+    scheduler.add_job(
+        flush_coalesced_pushes,
+        IntervalTrigger(seconds=30),
+        id="coalesced_digests",
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True,
+    )
+    scheduler.add_job(
+        check_push_receipts,
+        IntervalTrigger(minutes=15),
+        id="expo_receipts",
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True,
+    )
+    scheduler.add_job(
+        run_goal_verification,
+        CronTrigger(hour=3, minute=30, timezone="UTC"),
+        id="group_goal_verification",
+        replace_existing=True,
+        misfire_grace_time=6 * 3600,
+        coalesce=True,
+    )
+    scheduler.add_job(
+        run_reading_stats_reconcile,
+        CronTrigger(hour=3, minute=45, timezone="UTC"),
+        id="reading_stats_reconcile",
+        replace_existing=True,
+        misfire_grace_time=6 * 3600,
+        coalesce=True,
+    )
+    scheduler.add_job(
+        run_google_books_cache_prune,
+        CronTrigger(hour=4, minute=0, timezone="UTC"),
+        id="google_books_cache_prune",
+        replace_existing=True,
+        misfire_grace_time=6 * 3600,
+        coalesce=True,
+    )
+    scheduler.add_job(
+        run_discovery_refresh,
+        IntervalTrigger(minutes=15),
+        id="group_discovery_rank",
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True,
+    )
+    scheduler.add_job(
+        _resume_broadcasts,
+        IntervalTrigger(minutes=1),
+        id="resume_broadcasts",
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True,
+        **resume_now,
+    )
+    scheduler.add_job(
+        _resume_deletions,
+        IntervalTrigger(minutes=1),
+        id="resume_deletions",
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True,
+        **resume_now,
+    )
     if not scheduler.running:
         scheduler.start()
-    print("[scheduler] Started — inactivity reminder fires daily at 14:30 UTC (8 PM IST).")
+    print("[scheduler] Started — inactivity reminder fires daily at 14:30 UTC (8 PM IST), "
+          "notification retention at 03:00 UTC.")
 
 
 def stop_scheduler() -> None:
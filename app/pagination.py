@@ -0,0 +1,77 @@
+# app/pagination.py
+"""
+Keyset (cursor) pagination helpers.
+
+List endpoints keep returning a plain JSON array — mobile depends on that shape —
+and hand out the cursor for the next page in the X-Next-Cursor response header.
+Clients pass it back as ?cursor=... ; no header means there are no more rows.
+
+Cursors are opaque to clients: url-safe base64 of the sort values of the
+last row on the page, e.g. (created_at, id).
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any
+
+from fastapi import HTTPException, Response
+from sqlalchemy import and_, or_
+
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(*values: Any) -> str:
+    raw = [{"dt": v.isoformat()} if isinstance(v, datetime) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(raw, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list:
+    """Decode a cursor made by encode_cursor(); 400 if it is malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        values = [datetime.fromisoformat(v["dt"]) if isinstance(v, dict) else v for v in raw]
+    except (ValueError, TypeError, KeyError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def before(columns: list, values: list):
+    """
+    WHERE clause for "rows after this cursor" in a DESC ordering over `columns`:
+    (c1, c2) < (v1, v2), spelled out so it works on SQLite and Postgres alike.
+    """
+    clauses = []
+    for i, (col, value) in enumerate(zip(columns, values)):
+        equal_prefix = [c == v for c, v in zip(columns[:i], values[:i])]
+        clauses.append(and_(*equal_prefix, col < value))
+    return or_(*clauses)
+
+
+def after(columns: list, values: list):
+    """Same as before(), for an ASC ordering: (c1, c2) > (v1, v2)."""
+    clauses = []
+    for i, (col, value) in enumerate(zip(columns, values)):
+        equal_prefix = [c == v for c, v in zip(columns[:i], values[:i])]
+        clauses.append(and_(*equal_prefix, col > value))
+    return or_(*clauses)
+
+
+def clamp_limit(limit: int, maximum: int) -> int:
+    """?limit= bounded to 1..maximum — a limit below 1 would reach SQL as LIMIT 0 / -1 (unlimited on SQLite)."""
+    return max(1, min(limit, maximum))
+
+
+def page(rows: list, limit: int, response: Response, cursor_of) -> list:
+    """
+    Trim a limit+1 fetch to `limit` rows and set X-Next-Cursor when another page exists.
+    cursor_of(row) returns the sort values of a row. Pass a limit from clamp_limit().
+    """
+    limit = max(1, limit)
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(*cursor_of(rows[-1]))
+    return rows
@@ -0,0 +1,79 @@
+# app/progress_hooks.py
+"""
+One entry point per kind of library write for the derived reading aggregates:
+
+    group_stats      leaderboard rows          (app/group_stats.py)
+    group_goals      goal-period counters      (app/group_goals.py)
+    reading_stats    insights row              (app/reading_stats.py)
+    reading_bitmap   reading-day bitmaps       (app/reading_bitmap.py)
+
+Every path that logs pages or changes a UserBook's status calls these instead
+of the modules one by one, so a new aggregate is wired in here once:
+
+    on_pages_read(db, user_id, pages)              after the ReadingActivity write
+    on_status_change(db, user_id, old, new)        UserBook added / updated / removed
+
+Caller commits — the writes ride in the caller's transaction.
+"""
+from datetime import date, datetime
+from typing import Optional, Union
+
+from sqlmodel import Session
+
+from . import group_goals, group_stats, reading_bitmap, reading_stats
+
+
+def on_pages_read(
+    db: Session,
+    user_id: int,
+    pages: Union[int, dict],
+    now: Optional[datetime] = None,
+) -> None:
+    """
+    pages: read today, or {day: pages} for a batch sync replaying past days.
+
+    Leaderboard and goal counters count pages when they reach the server, as
+    late single updates always have; bitmaps and insights place them on their day.
+    """
+    now = now or datetime.utcnow()
+    by_day: dict[date, int] = {}
+    for d, n in (pages if isinstance(pages, dict) else {now.date(): pages}).items():
+        d = d.date() if isinstance(d, datetime) else d
+        if n > 0:
+            by_day[d] = by_day.get(d, 0) + n
+    total = sum(by_day.values())
+    if not total:
+        return
+    group_stats.record_pages_read(db, user_id, total, now)
+    group_goals.record_pages_read(db, user_id, total, now)
+    reading_bitmap.record_days(db, user_id, by_day, now)
+    if any(d != now.date() for d in by_day):
+        reading_stats.refresh(db, user_id, now)
+    else:
+        reading_stats.record_pages_read(db, user_id, total, now)
+
+
+def on_status_change(
+    db: Session,
+    user_id: int,
+    old_status: Optional[str],
+    new_status: Optional[str],
+    now: Optional[datetime] = None,
+    recount: bool = False,
+) -> None:
+    """
+    old_status None = UserBook added, new_status None = removed. An unchanged
+    'reading' status still refreshes the current book (updated_at moved).
+    recount: recompute the insights row instead of adjusting it, for removals
+    whose finish may not fall in the counted year (merged duplicates).
+    """
+    if old_status == new_status:
+        if new_status == "reading":
+            group_stats.refresh_current_book(db, user_id)
+        return
+    now = now or datetime.utcnow()
+    group_stats.on_status_change(db, user_id, old_status, new_status, now)
+    if recount:
+        reading_stats.refresh(db, user_id, now)
+    else:
+        reading_stats.on_status_change(db, user_id, old_status, new_status, now)
@@ -0,0 +1,258 @@
+# app/reading_bitmap.py
+"""
+Per-user, per-year reading-day bitmaps (reading_day_bitmap table).
+
+Each row holds 366 bits — bit i set = the user read on day-of-year i + 1 —
+and an optional 366-slot uint32 pages array. Streaks and the year heatmap
+become bit operations on at most a few small rows instead of scans of
+ReadingActivity:
+
+    current streak   trailing run of ones ending today (across year rows)
+    longest streak   number of `x &= x >> 1` rounds until x is 0
+    heatmap          the pages array as-is
+
+Writers (caller commits — ride in the progress update's transaction; called
+through app/progress_hooks.py):
+    record_pages_read(db, user_id, pages)
+    record_days(db, user_id, {day: pages})      batch sync replays
+
+A missing (user, year) row is seeded from that year's ReadingActivity —
+by writers always, by reads only when the year has activity (a read of an
+empty year is answered in memory and leaves nothing behind). Seeds go in
+through a savepoint: the loser of two concurrent first writes for a year
+increments the winner's row instead of failing on uq_reading_day_bitmap_user_year.
+
+Repairs:
+    python -m app.reading_bitmap --rebuild [--user-id N]
+"""
+import argparse
+import sys
+from array import array
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select, func
+
+from .models import ReadingActivity, ReadingDayBitmap
+
+
+DAYS_IN_ROW = 366
+BITMAP_BYTES = (DAYS_IN_ROW + 7) // 8
+
+
+# ── Encoding ──────────────────────────────────────────────────────────────────
+
+def day_index(d: date) -> int:
+    return d.timetuple().tm_yday - 1
+
+
+def _bits(row: Optional[ReadingDayBitmap]) -> int:
+    return int.from_bytes(row.days, "little") if row else 0
+
+
+def _pages(row: Optional[ReadingDayBitmap]) -> array:
+    slots = array("I")
+    if row and row.pages:
+        slots.frombytes(row.pages)
+        if sys.byteorder == "big":
+            slots.byteswap()
+    if len(slots) < DAYS_IN_ROW:
+        slots.extend([0] * (DAYS_IN_ROW - len(slots)))
+    return slots
+
+
+def _store(row: ReadingDayBitmap, bits: int, slots: array) -> None:
+    row.days = bits.to_bytes(BITMAP_BYTES, "little")
+    out = array("I", slots)
+    if sys.byteorder == "big":
+        out.byteswap()
+    row.pages = out.tobytes()
+
+
+def _days_in_year(year: int) -> int:
+    return (date(year + 1, 1, 1) - date(year, 1, 1)).days
+
+
+# ── Rows ──────────────────────────────────────────────────────────────────────
+
+def compute(db: Session, user_id: int, year: int) -> ReadingDayBitmap:
+    """Build a (user, year) row from ReadingActivity (not added to the session)."""
+    day = func.date(ReadingActivity.date)
+    bits, slots = 0, array("I", [0] * DAYS_IN_ROW)
+    for d, pages in db.exec(
+        select(day, func.sum(ReadingActivity.pages_read))
+        .where(
+            ReadingActivity.user_id == user_id,
+            ReadingActivity.pages_read > 0,
+            ReadingActivity.date >= datetime(year, 1, 1),
+            ReadingActivity.date < datetime(year + 1, 1, 1),
+        )
+        .group_by(day)
+    ).all():
+        i = day_index(d if isinstance(d, date) else date.fromisoformat(str(d)))
+        bits |= 1 << i
+        slots[i] = min(int(pages or 0), 0xFFFFFFFF)
+    row = ReadingDayBitmap(user_id=user_id, year=year)
+    _store(row, bits, slots)
+    return row
+
+
+def _row(db: Session, user_id: int, year: int) -> Optional[ReadingDayBitmap]:
+    return db.exec(
+        select(ReadingDayBitmap).where(ReadingDayBitmap.user_id == user_id, ReadingDayBitmap.year == year)
+    ).first()
+
+
+def _insert(db: Session, row: ReadingDayBitmap) -> bool:
+    """Add a seeded row in a savepoint. False if a concurrent request stored the (user, year) first."""
+    try:
+        with db.begin_nested():
+            db.add(row)
+    except IntegrityError:
+        return False
+    return True
+
+
+def get_year(db: Session, user_id: int, year: int) -> ReadingDayBitmap:
+    """
+    The user's row for a year. A missing row is computed from ReadingActivity
+    and stored only if the year has activity (commits when storing).
+    """
+    row = _row(db, user_id, year)
+    if row is None:
+        row = compute(db, user_id, year)
+        if _bits(row):
+            if not _insert(db, row):
+                row = _row(db, user_id, year)
+            db.commit()
+    return row
+
+
+def record_pages_read(db: Session, user_id: int, pages: int, now: Optional[datetime] = None) -> None:
+    """Set today's bit and add to today's pages. Call in the ReadingActivity write's transaction."""
+    now = now or datetime.utcnow()
+    record_days(db, user_id, {now.date(): pages}, now)
+
+
+def record_days(db: Session, user_id: int, pages_by_day: dict, now: Optional[datetime] = None) -> None:
+    """
+    record_pages_read for several days at once (batch sync replays). A year
+    without a row is seeded once, from ReadingActivity that already includes them.
+    """
+    now = now or datetime.utcnow()
+    by_year: dict[int, dict[date, int]] = {}
+    for d, pages in pages_by_day.items():
+        d = d.date() if isinstance(d, datetime) else d
+        if pages > 0:
+            year_days = by_year.setdefault(d.year, {})
+            year_days[d] = year_days.get(d, 0) + pages
+    for year, days in by_year.items():
+        row = _row(db, user_id, year)
+        if row is None:
+            db.flush()      # the seed then already counts the caller's pending ReadingActivity
+            if _insert(db, compute(db, user_id, year)):
+                continue
+            # Seeded concurrently, from activity that did not include ours yet
+            row = _row(db, user_id, year)
+        bits, slots = _bits(row), _pages(row)
+        for d, pages in days.items():
+            i = day_index(d)
+            slots[i] = min(slots[i] + pages, 0xFFFFFFFF)
+            bits |= 1 << i
+        _store(row, bits, slots)
+        row.updated_at = now
+        db.add(row)
+
+
+# ── Queries ───────────────────────────────────────────────────────────────────
+
+def _timeline(rows: dict[int, ReadingDayBitmap], first_year: int, last_year: int) -> tuple[int, int]:
+    """
+    Rows of years first_year..last_year concatenated into one integer, oldest
+    day in bit 0 (a missing year counts as empty). Returns (bits, length in days).
+    """
+    bits, offset = 0, 0
+    for year in range(first_year, last_year + 1):
+        n = _days_in_year(year)
+        bits |= (_bits(rows.get(year)) & ((1 << n) - 1)) << offset
+        offset += n
+    return bits, offset
+
+
+def longest_run(bits: int) -> int:
+    """Longest run of consecutive set bits."""
+    rounds = 0
+    while bits:
+        bits &= bits >> 1
+        rounds += 1
+    return rounds
+
+
+def streaks(db: Session, user_id: int, today: Optional[date] = None) -> dict:
+    """Current streak (must include today) and longest streak over all stored years."""
+    today = today or datetime.utcnow().date()
+    rows = {
+        r.year: r for r in db.exec(
+            select(ReadingDayBitmap).where(ReadingDayBitmap.user_id == user_id, ReadingDayBitmap.year <= today.year)
+        ).all()
+        if _bits(r)     # empty rows stored before reads stopped seeding them
+    }
+    # A streak can run over new year: this and last year must be present
+    for year in (today.year - 1, today.year):
+        if year not in rows:
+            rows[year] = get_year(db, user_id, year)
+    first_year = min(rows)
+    bits, _ = _timeline(rows, first_year, today.year)
+
+    end = sum(_days_in_year(y) for y in range(first_year, today.year)) + day_index(today)
+    window = bits & ((1 << (end + 1)) - 1)
+    gaps = ~window & ((1 << (end + 1)) - 1)           # zero days up to and including today
+    current = end + 1 - gaps.bit_length() if gaps else end + 1
+    return {"current_streak": current, "longest_streak": longest_run(bits)}
+
+
+def heatmap(db: Session, user_id: int, year: int) -> dict:
+    row = get_year(db, user_id, year)
+    bits, slots = _bits(row), _pages(row)
+    n = _days_in_year(year)
+    start = date(year, 1, 1)
+    return {
+        "year": year,
+        "active_days": bin(bits & ((1 << n) - 1)).count("1"),
+        "total_pages": sum(slots[:n]),
+        "days": [
+            {"date": (start + timedelta(days=i)).isoformat(), "pages_read": slots[i]}
+            for i in range(n)
+        ],
+    }
+
+
+def rebuild(db: Session, user_id: Optional[int] = None) -> int:
+    """Recompute every (user, year) row from ReadingActivity. Commits. Returns rows written."""
+    year = func.extract("year", ReadingActivity.date)
+    query = select(ReadingActivity.user_id, year).where(ReadingActivity.pages_read > 0).distinct()
+    stmt = delete(ReadingDayBitmap)
+    if user_id is not None:
+        query = query.where(ReadingActivity.user_id == user_id)
+        stmt = stmt.where(ReadingDayBitmap.user_id == user_id)
+    pairs = db.exec(query).all()
+    db.execute(stmt.execution_options(synchronize_session=False))
+    for uid, y in pairs:
+        db.add(compute(db, uid, int(y)))
+    db.commit()
+    return len(pairs)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain reading_day_bitmap (streaks / heatmaps).")
+    parser.add_argument("--rebuild", action="store_true", help="recompute rows from ReadingActivity")
+    parser.add_argument("--user-id", type=int, default=None, help="limit the rebuild to one user")
+    args = parser.parse_args()
+    if not args.rebuild:
+        parser.error("nothing to do — pass --rebuild")
+
+    from .database import engine
+    with Session(engine) as session:
+        print(f"[reading_bitmap] Rebuilt {rebuild(session, args.user_id)} row(s)")
@@ -0,0 +1,252 @@
+# app/reading_stats.py
+"""
+Precomputed per-user reading insights (user_reading_stats table).
+
+GET /reading-activity/insights used to load every UserBook, Book and
+ReadingActivity row of the user and derive streaks and totals in Python on
+each call. The activity-derived numbers now live in one row per user:
+
+    monthly_pages   {"YYYY-MM": pages}     last MONTHS_KEPT months
+    daily_pages     {"YYYY-MM-DD": pages}  last DAYS_KEPT days (rolling 30-day average)
+    finished_year / finished_this_year     books finished in that calendar year
+
+Streaks are not kept here: every endpoint reads them from the reading-day
+bitmaps (app/reading_bitmap.py).
+
+Writers (caller commits — they ride in the caller's transaction; library
+write paths reach them through app/progress_hooks.py):
+    record_pages_read(db, user_id, pages)       progress update logged pages
+    on_status_change(db, user_id, old, new)     finished transitions
+    refresh(db, user_id)                        batch sync replayed past days
+
+A missing row is seeded from the source tables on first use. A writer that
+seeds it flushes first, so the seed already counts the caller's pending
+changes; the rest of that session's writes for the user recompute the row
+(refresh) instead of adding their increment on top. Concurrent
+writers for the same user can lose an increment; the nightly reconcile()
+recomputes every row from ReadingActivity / UserBook and fixes drift.
+
+Repairs:
+    python -m app.reading_stats --rebuild [--user-id N]
+"""
+import argparse
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from sqlmodel import Session, select, func
+
+from .models import ReadingActivity, UserBook, UserReadingStats
+
+
+MONTHS_KEPT = 13
+DAYS_KEPT = 31          # insights average over activity dated >= today - 30 days
+
+# Session.info key: users whose row a writer seeded in this session
+_SEEDED = "reading_stats_seeded"
+
+
+def _as_date(value) -> date:
+    # func.date() gives 'YYYY-MM-DD' strings on SQLite and dates on Postgres
+    return value if isinstance(value, date) else date.fromisoformat(str(value))
+
+
+def _trim(row: UserReadingStats, today: date) -> None:
+    """Drop daily / monthly buckets that fell out of their windows."""
+    first_day = (today - timedelta(days=DAYS_KEPT - 1)).isoformat()
+    row.daily_pages = {k: v for k, v in (row.daily_pages or {}).items() if k >= first_day}
+    first_month = _month_back(today, MONTHS_KEPT - 1)
+    row.monthly_pages = {k: v for k, v in (row.monthly_pages or {}).items() if k >= first_month}
+
+
+def _month_back(today: date, months: int) -> str:
+    index = today.year * 12 + today.month - 1 - months
+    return f"{index // 12}-{index % 12 + 1:02d}"
+
+
+def compute(db: Session, user_id: int, now: Optional[datetime] = None) -> UserReadingStats:
+    """Build a user's row from ReadingActivity / UserBook (not added to the session)."""
+    now = now or datetime.utcnow()
+    today = now.date()
+    day = func.date(ReadingActivity.date)
+    per_day = [
+        (_as_date(d), int(pages or 0)) for d, pages in db.exec(
+            select(day, func.sum(ReadingActivity.pages_read))
+            .where(ReadingActivity.user_id == user_id, ReadingActivity.pages_read > 0)
+            .group_by(day)
+            .order_by(day)
+        ).all()
+    ]
+
+    row = UserReadingStats(
+        user_id=user_id,
+        daily_pages={},
+        monthly_pages={},
+        finished_year=today.year,
+        finished_this_year=db.exec(
+            select(func.count(UserBook.id)).where(
+                UserBook.user_id == user_id,
+                UserBook.status == "finished",
+                UserBook.updated_at >= datetime(today.year, 1, 1),
+            )
+        ).one(),
+        updated_at=now,
+    )
+    daily, monthly = {}, {}
+    for d, pages in per_day:
+        daily[d.isoformat()] = daily.get(d.isoformat(), 0) + pages
+        month = d.strftime("%Y-%m")
+        monthly[month] = monthly.get(month, 0) + pages
+    row.daily_pages, row.monthly_pages = daily, monthly
+    _trim(row, today)
+    return row
+
+
+def get_stats(db: Session, user_id: int, now: Optional[datetime] = None) -> UserReadingStats:
+    """The user's row, seeded from the source tables if missing (commits when seeding)."""
+    row = db.get(UserReadingStats, user_id)
+    if row is None:
+        row = compute(db, user_id, now)
+        db.add(row)
+        db.commit()
+        db.refresh(row)
+    return row
+
+
+def _existing_or_seed(db: Session, user_id: int, now: datetime) -> Optional[UserReadingStats]:
+    """
+    Existing row to increment, or None once the row is recomputed instead —
+    it was missing, or seeded earlier in this session, and the recompute
+    already counts the caller's pending ReadingActivity / UserBook changes.
+    """
+    seeded = db.info.setdefault(_SEEDED, set())
+    row = db.get(UserReadingStats, user_id)
+    if row is None or user_id in seeded:
+        seeded.add(user_id)
+        refresh(db, user_id, now)
+        return None
+    return row
+
+
+# ── Incremental writers ───────────────────────────────────────────────────────
+
+def record_pages_read(db: Session, user_id: int, pages: int, now: Optional[datetime] = None) -> None:
+    """Add pages read today. Call in the same transaction as the ReadingActivity write."""
+    if pages <= 0:
+        return
+    now = now or datetime.utcnow()
+    row = _existing_or_seed(db, user_id, now)
+    if row is None:
+        return
+    today = now.date()
+    # Reassign: JSON columns do not track in-place changes
+    daily = dict(row.daily_pages or {})
+    daily[today.isoformat()] = daily.get(today.isoformat(), 0) + pages
+    monthly = dict(row.monthly_pages or {})
+    monthly[today.strftime("%Y-%m")] = monthly.get(today.strftime("%Y-%m"), 0) + pages
+    row.daily_pages, row.monthly_pages = daily, monthly
+    _trim(row, today)
+    row.updated_at = now
+    db.add(row)
+
+
+def on_status_change(
+    db: Session,
+    user_id: int,
+    old_status: Optional[str],
+    new_status: Optional[str],
+    now: Optional[datetime] = None,
+) -> None:
+    """Keep the finished-this-year count in step with a UserBook status change."""
+    if old_status == new_status or "finished" not in (old_status, new_status):
+        return
+    now = now or datetime.utcnow()
+    row = _existing_or_seed(db, user_id, now)
+    if row is None:
+        return
+    if row.finished_year != now.year:
+        row.finished_year, row.finished_this_year = now.year, 0
+    delta = 1 if new_status == "finished" else -1
+    row.finished_this_year = max(0, row.finished_this_year + delta)
+    row.updated_at = now
+    db.add(row)
+
+
+_COMPARED = ("daily_pages", "monthly_pages", "finished_year", "finished_this_year")
+
+
+def refresh(db: Session, user_id: int, now: Optional[datetime] = None) -> None:
+    """
+    Recompute the user's row inside the caller's transaction (caller commits).
+    For writes the incremental path cannot place, e.g. pages logged on past days.
+    """
+    now = now or datetime.utcnow()
+    db.flush()
+    fresh = compute(db, user_id, now)
+    row = db.get(UserReadingStats, user_id)
+    if row is None:
+        db.add(fresh)
+        return
+    for f in _COMPARED:
+        setattr(row, f, getattr(fresh, f))
+    row.updated_at = now
+    db.add(row)
+
+
+# ── Reconciler ────────────────────────────────────────────────────────────────
+
+def reconcile(db: Session, user_id: Optional[int] = None, now: Optional[datetime] = None) -> dict:
+    """
+    Recompute rows from the source tables and fix drift (one user, or every
+    existing row). Commits. Returns counters for logging.
+    """
+    now = now or datetime.utcnow()
+    query = select(UserReadingStats.user_id)
+    if user_id is not None:
+        query = query.where(UserReadingStats.user_id == user_id)
+    user_ids = list(db.exec(query).all())
+    if user_id is not None and not user_ids:
+        user_ids = [user_id]
+
+    checked = fixed = 0
+    for uid in user_ids:
+        fresh = compute(db, uid, now)
+        row = db.get(UserReadingStats, uid)
+        checked += 1
+        if row is None:
+            db.add(fresh)
+            fixed += 1
+        else:
+            # Trim the stored row the same way so a quiet day is not counted as drift
+            _trim(row, now.date())
+            if any(getattr(row, f) != getattr(fresh, f) for f in _COMPARED):
+                for f in _COMPARED:
+                    setattr(row, f, getattr(fresh, f))
+                fixed += 1
+            row.updated_at = now
+            db.add(row)
+        if checked % 500 == 0:
+            db.commit()
+    db.commit()
+    return {"checked": checked, "fixed": fixed}
+
+
+def run_reconcile() -> None:
+    """Scheduler entry point — opens its own session."""
+    from .database import engine
+
+    with Session(engine) as db:
+        result = reconcile(db)
+    print(f"[reading_stats] Reconciled {result['checked']} row(s): {result['fixed']} fixed")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain user_reading_stats (reading insights).")
+    parser.add_argument("--rebuild", action="store_true", help="recompute rows from ReadingActivity / UserBook")
+    parser.add_argument("--user-id", type=int, default=None, help="limit the rebuild to one user")
+    args = parser.parse_args()
+    if not args.rebuild:
+        parser.error("nothing to do — pass --rebuild")
+
+    from .database import engine
+    with Session(engine) as session:
+        print(f"[reading_stats] Rebuild: {reconcile(session, args.user_id)}")
@@ -11,8 +11,11 @@ from datetime import datetime, timedelta
 from ..database import get_session
 from ..deps import get_admin_user
 from .. import models
-from ..utils.push import send_push_to_many
 from ..notifications.dispatcher import fire_event
+from ..notifications.broadcast import create_broadcast_job, serialize_job
+from ..notifications.scheduler import enqueue_broadcast, enqueue_deletion
+from ..deletion import requeue, serialize_deletion_job
+from .. import google_books_cache
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
@@ -387,22 +390,97 @@ def broadcast_push_notification(
     admin_user=Depends(get_admin_user),
 ):
     """
-    Send a custom push notification to ALL registered devices.
+    Send a custom push notification to ALL registered devices (Expo + web).
     Admin only. Use for book launches, quizzes, announcements, etc.
+
+    Queues a background job and returns immediately — poll
+    GET /admin/push/broadcast/{job_id} for progress.
     """
-    tokens = db.exec(select(models.PushToken)).all()
-    if not tokens:
+    job = create_broadcast_job(
+        db, title=payload.title, body=payload.body, data=payload.data, created_by=admin_user.id,
+    )
+    if job is None:
         return {"message": "No registered push tokens found", "sent_to": 0}
 
-    token_list = [t.token for t in tokens]
-    send_push_to_many(token_list, title=payload.title, body=payload.body, data=payload.data)
+    enqueue_broadcast(job.id)
 
     return {
-        "message": f"Broadcast sent to {len(token_list)} device(s)",
-        "sent_to": len(token_list),
+        "message": f"Broadcast queued for {job.total_tokens} device(s)",
+        "sent_to": job.total_tokens,
+        "job_id": job.id,
+        "status": job.status,
     }
 
 
+@router.get("/push/broadcast/{job_id}")
+def get_broadcast_status(
+    job_id: int,
+    db: Session = Depends(get_session),
+    admin_user=Depends(get_admin_user),
+):
+    """Progress of a broadcast job. Admin only."""
+    job = db.get(models.BroadcastJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Broadcast job not found")
+    return serialize_job(job)
+
+
+# ─── Deletion jobs ───────────────────────────────────────────────────────────
+
+@router.get("/deletion-jobs")
+def list_deletion_jobs(
+    status: str | None = None,
+    limit: int = 50,
+    db: Session = Depends(get_session),
+    admin_user=Depends(get_admin_user),
+):
+    """Recent group / account deletion jobs, newest first. Admin only."""
+    query = select(models.DeletionJob)
+    if status:
+        query = query.where(models.DeletionJob.status == status)
+    jobs = db.exec(query.order_by(models.DeletionJob.id.desc()).limit(min(limit, 200))).all()
+    return [serialize_deletion_job(j) for j in jobs]
+
+
+@router.get("/deletion-jobs/{job_id}")
+def get_deletion_job(
+    job_id: int,
+    db: Session = Depends(get_session),
+    admin_user=Depends(get_admin_user),
+):
+    """Progress of a deletion job (rows removed per table). Admin only."""
+    job = db.get(models.DeletionJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Deletion job not found")
+    return serialize_deletion_job(job)
+
+
+@router.post("/deletion-jobs/{job_id}/retry")
+def retry_deletion_job(
+    job_id: int,
+    db: Session = Depends(get_session),
+    admin_user=Depends(get_admin_user),
+):
+    """
+    Queue a failed deletion job again with a fresh set of attempts — for jobs
+    that used up their automatic retries. Admin only.
+    """
+    job = db.get(models.DeletionJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Deletion job not found")
+    if job.status != "failed":
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}, only failed jobs can be retried")
+    requeue(db, job)
+    enqueue_deletion(job.id)
+    return serialize_deletion_job(job)
+
+
+@router.get("/googlebooks-cache")
+def get_googlebooks_cache_metrics(admin_user=Depends(get_admin_user)):
+    """Google Books proxy cache hits per tier, misses and refreshes since this worker started. Admin only."""
+    return google_books_cache.metrics()
+
+
 @router.post("/push/test/{user_id}")
 def test_push_notification(
     user_id: int,
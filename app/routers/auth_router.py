@@ -1,11 +1,16 @@
 # app/routers/auth_router.py
+from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import delete
 from sqlmodel import Session, select
 from google.oauth2 import id_token
 from google.auth.transport import requests
 from ..database import get_session
 from ..deps import get_db, get_current_user
 from .. import crud, auth, models
+from ..deletion import create_deletion_job, tombstone_group
+from ..group_activity import invalidate_user_groups
+from ..notifications.scheduler import enqueue_deletion
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/auth", tags=["auth"])
@@ -164,67 +169,32 @@ def delete_own_account(
     db: Session = Depends(get_db),
 ):
     """
-    Authenticated endpoint: immediately and permanently deletes the calling user's account
+    Authenticated endpoint: permanently deletes the calling user's account
     and all associated data (userbooks, notes, follows, likes, comments, push tokens,
-    notification logs, group memberships, group posts).
+    notification logs, group memberships, group posts, groups they created).
+
+    The rows are removed by a background job in chunked bulk deletes (app/deletion.py);
+    push tokens go immediately so the device stops receiving notifications. From
+    here on the account's tokens are rejected and the groups it created are gone.
     """
     uid = current_user.id
-
-    # Delete in dependency order to avoid FK violations
-    for model_cls, col in [
-        (models.NotificationLog, models.NotificationLog.user_id),
-        (models.GroupPost,        models.GroupPost.user_id),
-        (models.GroupMember,      models.GroupMember.user_id),
-    ]:
-        for row in db.exec(select(model_cls).where(col == uid)).all():
-            db.delete(row)
-
-    # Groups created by this user — delete members + posts first, then the group
-    created_groups = db.exec(
-        select(models.ReadingGroup).where(models.ReadingGroup.created_by == uid)
-    ).all()
-    for g in created_groups:
-        for m in db.exec(select(models.GroupMember).where(models.GroupMember.group_id == g.id)).all():
-            db.delete(m)
-        for p in db.exec(select(models.GroupPost).where(models.GroupPost.group_id == g.id)).all():
-            db.delete(p)
-        db.delete(g)
-
-    # Push tokens
-    for row in db.exec(select(models.PushToken).where(models.PushToken.user_id == uid)).all():
-        db.delete(row)
-
-    # Social graph
-    for row in db.exec(select(models.Follow).where(
-        (models.Follow.follower_id == uid) | (models.Follow.followed_id == uid)
-    )).all():
-        db.delete(row)
-
-    # Notes, likes, comments
-    note_ids = [n.id for n in db.exec(select(models.Note).where(models.Note.user_id == uid)).all()]
-    for nid in note_ids:
-        for row in db.exec(select(models.Like).where(models.Like.note_id == nid)).all():
-            db.delete(row)
-        for row in db.exec(select(models.Comment).where(models.Comment.note_id == nid)).all():
-            db.delete(row)
-    for row in db.exec(select(models.Note).where(models.Note.user_id == uid)).all():
-        db.delete(row)
-    # Likes/comments the user left on other notes
-    for row in db.exec(select(models.Like).where(models.Like.user_id == uid)).all():
-        db.delete(row)
-    for row in db.exec(select(models.Comment).where(models.Comment.user_id == uid)).all():
-        db.delete(row)
-
-    # Reading activity + userbooks
-    for row in db.exec(select(models.ReadingActivity).where(models.ReadingActivity.user_id == uid)).all():
-        db.delete(row)
-    for row in db.exec(select(models.UserBook).where(models.UserBook.user_id == uid)).all():
-        db.delete(row)
-
-    # Finally delete the user
-    user = db.get(models.User, uid)
-    if user:
-        db.delete(user)
+    job = create_deletion_job(db, "user", uid, uid)
+    member_ids = []
+    for group_id in db.exec(
+        select(models.ReadingGroup.id).where(
+            models.ReadingGroup.created_by == uid, models.ReadingGroup.deleted_at == None,  # noqa: E711
+        )
+    ).all():
+        member_ids += tombstone_group(db, group_id)
+    current_user.deletion_requested_at = current_user.deletion_requested_at or datetime.utcnow()
+    db.add(current_user)
+    db.exec(
+        delete(models.PushToken)
+        .where(models.PushToken.user_id == uid)
+        .execution_options(synchronize_session=False)
+    )
     db.commit()
+    invalidate_user_groups(uid, *member_ids)
+    enqueue_deletion(job.id)
 
-    return {"message": "Account deleted"}
+    return {"message": "Account deleted", "job_id": job.id, "status": job.status}
@@ -1,5 +1,6 @@
 # app/routers/books_router.py
 from fastapi import APIRouter, Depends, HTTPException
+from starlette.concurrency import run_in_threadpool
 from sqlmodel import select, Session
 from app.models import Book, UserBook, User
 from app.database import get_db
@@ -8,6 +9,8 @@ from datetime import datetime
 from pydantic import BaseModel
 from typing import Optional
 from ..notifications.dispatcher import fire_event, get_follower_ids
+from .. import book_resolver, book_search, progress_hooks
+from .googlebooks_router import search_google_books
 
 router = APIRouter(prefix="/books", tags=["Books"])
 
@@ -17,6 +20,7 @@ class AddBookFromGooglePayload(BaseModel):
     title: str
     author: Optional[str] = None
     isbn: Optional[str] = None
+    google_books_id: Optional[str] = None
     cover_url: Optional[str] = None
     description: Optional[str] = None
     total_pages: Optional[int] = None
@@ -39,32 +43,25 @@ def add_book_to_library(
 ):
     """
     Add a book from Google Books API to the user's library.
-    - Checks if book exists in Book table by ISBN (avoids duplicates)
+    - Reuses the catalog book with the same ISBN-13 or Google Books id (book_resolver)
     - Creates UserBook entry linking user to the book
     - Returns error if book already in user's library
     """
-    book = None
-    
-    # Step 1: Check if book already exists in Book table by ISBN
-    if payload.isbn:
-        book = db.exec(select(Book).where(Book.isbn == payload.isbn)).first()
-    
-    # Step 2: If book doesn't exist, create it
-    if not book:
-        book = Book(
-            title=payload.title,
-            author=payload.author or "Unknown Author",
-            isbn=payload.isbn,
-            cover_url=payload.cover_url,
-            description=payload.description,
-            total_pages=payload.total_pages,
-            publisher=payload.publisher,
-            published_date=payload.published_date,
-            created_at=datetime.utcnow(),
-        )
-        db.add(book)
-        db.commit()
-        db.refresh(book)
+    # Step 1-2: Find the book by ISBN-13 / Google Books id, or create it
+    book, _ = book_resolver.resolve(
+        db,
+        title=payload.title,
+        author=payload.author or "Unknown Author",
+        isbn=payload.isbn,
+        google_books_id=payload.google_books_id,
+        cover_url=payload.cover_url,
+        description=payload.description,
+        total_pages=payload.total_pages,
+        publisher=payload.publisher,
+        published_date=payload.published_date,
+    )
+    db.commit()
+    db.refresh(book)
     
     # Step 3: Check if user already has this book in their library
     existing_userbook = db.exec(
@@ -102,6 +99,7 @@ def add_book_to_library(
         updated_at=datetime.utcnow(),
     )
     db.add(userbook)
+    progress_hooks.on_status_change(db, current_user.id, None, userbook.status)
     db.commit()
     db.refresh(userbook)
 
@@ -146,7 +144,7 @@ def list_books(db: Session = Depends(get_db)):
 def add_book(book_data: dict, db: Session = Depends(get_db)):
     """
     Add a new book to the library.
-    If ISBN exists, returns existing book instead of creating duplicate.
+    If a book with the same ISBN-13 / Google Books id exists, returns it instead of creating a duplicate.
     """
     # Safely extract fields from incoming JSON
     title = book_data.get("title", "").strip()
@@ -157,32 +155,28 @@ def add_book(book_data: dict, db: Session = Depends(get_db)):
     total_pages = book_data.get("total_pages", None)
     publisher = book_data.get("publisher", None)
     published_date = book_data.get("published_date", None)
+    google_books_id = book_data.get("google_books_id", None)
 
     if not title:
         raise HTTPException(status_code=400, detail="Title is required")
 
-    # Prevent duplicates based on ISBN if available
-    if isbn:
-        existing = db.exec(select(Book).where(Book.isbn == isbn)).first()
-        if existing:
-            return {"message": "Book already exists", "book": existing}
-
-    # Create new Book object
-    new_book = Book(
+    # Prevent duplicates based on ISBN-13 / Google Books id if available
+    new_book, created = book_resolver.resolve(
+        db,
         title=title,
         author=author,
         isbn=isbn,
+        google_books_id=google_books_id,
         cover_url=cover_url,
         description=description,
         total_pages=total_pages,
         publisher=publisher,
         published_date=published_date,
-        created_at=datetime.utcnow(),
     )
-
-    db.add(new_book)
     db.commit()
     db.refresh(new_book)
+    if not created:
+        return {"message": "Book already exists", "book": new_book}
 
     return {"message": "Book added successfully", "book": new_book}
 
@@ -261,11 +255,7 @@ def get_recommendations(limit: int = 12, db: Session = Depends(get_db), current_
             my_authors.add(b.author.split(',')[0].strip())
 
     if my_authors:
-        author_books = db.exec(
-            select(Book).where(
-                or_(*[Book.author.ilike(f"%{a}%") for a in list(my_authors)[:5]])
-            ).limit(40)
-        ).all()
+        author_books = book_search.by_authors(db, list(my_authors)[:5], limit=40)
         for book in author_books:
             add_rec(book, "author_affinity", 2)
 
@@ -288,16 +278,8 @@ def get_recommendations(limit: int = 12, db: Session = Depends(get_db), current_
 
 @router.get("/search")
 def search_books(q: str, limit: int = 20, db: Session = Depends(get_db), _=Depends(get_current_user)):
-    """Search the local book catalog by title or author."""
-    from sqlalchemy import or_
-    results = db.exec(
-        select(Book).where(
-            or_(
-                Book.title.ilike(f"%{q}%"),
-                Book.author.ilike(f"%{q}%"),
-            )
-        ).order_by(Book.title).limit(limit)
-    ).all()
+    """Search the local book catalog by title, author or ISBN — indexed, best match first (app/book_search.py)."""
+    results = book_search.search(db, q, limit=max(1, min(limit, 100)))
     return [
         {
             "id": b.id,
@@ -313,6 +295,36 @@ def search_books(q: str, limit: int = 20, db: Session = Depends(get_db), _=Depen
     ]
 
 
+@router.get("/search/unified")
+async def search_unified(q: str, limit: int = 20, db: Session = Depends(get_db), _=Depends(get_current_user)):
+    """
+    Local-first search: the catalog index answers, and Google Books (through its
+    response cache) is asked only when the catalog has too few matches. Google
+    volumes already in the catalog are dropped — see book_search.merge().
+    If Google is unavailable the local results are still returned.
+    """
+    q = q.strip()
+    if len(q) < 2:
+        raise HTTPException(status_code=400, detail="Query must be at least 2 characters")
+    limit = max(1, min(limit, 40))
+
+    local = await run_in_threadpool(book_search.search, db, q, limit)
+    google, google_status = [], "skipped"
+    if book_search.needs_google(q, len(local), limit):
+        try:
+            google = (await search_google_books(query=q))["results"]
+            google_status = "ok"
+        except HTTPException as e:
+            print(f"[BookSearch] Google Books unavailable for q='{q}': {e.detail}")
+            google_status = "unavailable"
+
+    return {
+        "results": book_search.merge(local, google, limit),
+        "local_count": len(local),
+        "google": google_status,
+    }
+
+
 @router.get("/{book_id}")
 def get_book(book_id: int, db: Session = Depends(get_db)):
     book = db.get(Book, book_id)
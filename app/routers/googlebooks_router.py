@@ -9,6 +9,8 @@ import os
 import asyncio
 from pydantic import BaseModel
 
+from .. import google_books_cache, http_client
+
 router = APIRouter(prefix="/api/googlebooks", tags=["Google Books"])
 
 # Google Books API Key - read from environment variable
@@ -75,10 +77,19 @@ async def search_google_books(query: str, max_results: int = 10):
     
     Returns:
         List of book results with details
+
+    Served from the two-tier response cache (app/google_books_cache.py).
     """
     if not query or len(query.strip()) < 2:
         raise HTTPException(status_code=400, detail="Query must be at least 2 characters")
 
+    return await google_books_cache.get_or_fetch(
+        google_books_cache.search_key(query), lambda: _fetch_search(query),
+    )
+
+
+async def _fetch_search(query: str) -> dict:
+    """Call Google Books and build the filtered, sorted search response."""
     # Always fetch max from Google, filter + trim to 15 quality results
     params = {
         "q": query,
@@ -93,18 +104,18 @@ async def search_google_books(query: str, max_results: int = 10):
     url = "https://www.googleapis.com/books/v1/volumes"
 
     try:
-        async with httpx.AsyncClient() as client:
-            for attempt in range(3):
-                response = await client.get(url, params=params, timeout=15.0)
-                if response.status_code == 200:
-                    break
-                if response.status_code == 503 and attempt < 2:
-                    print(f"[GoogleBooks] 503 for query='{query}', retry {attempt + 1}/2 after 1s")
-                    await asyncio.sleep(1)
-                    continue
-                print(f"[GoogleBooks] Error {response.status_code} for query='{query}': {response.text[:300]}")
-                raise HTTPException(status_code=502, detail=f"Google Books API error {response.status_code}")
-            data = response.json()
+        client = http_client.get_client()
+        for attempt in range(3):
+            response = await client.get(url, params=params, timeout=http_client.timeout(15.0))
+            if response.status_code == 200:
+                break
+            if response.status_code == 503 and attempt < 2:
+                print(f"[GoogleBooks] 503 for query='{query}', retry {attempt + 1}/2 after 1s")
+                await asyncio.sleep(1)
+                continue
+            print(f"[GoogleBooks] Error {response.status_code} for query='{query}': {response.text[:300]}")
+            raise HTTPException(status_code=502, detail=f"Google Books API error {response.status_code}")
+        data = response.json()
 
         total_items = data.get("totalItems", 0)
         items = data.get("items", [])
@@ -183,7 +194,7 @@ async def search_google_books(query: str, max_results: int = 10):
         return GoogleBooksSearchResponse(
             results=results[:15],
             total_items=total_items
-        )
+        ).dict()
     
     except httpx.HTTPError as e:
         raise HTTPException(
@@ -207,15 +218,23 @@ async def get_book_details(google_book_id: str):
     
     Returns:
         Detailed book information
+
+    Served from the two-tier response cache (app/google_books_cache.py).
     """
+    return await google_books_cache.get_or_fetch(
+        google_books_cache.volume_key(google_book_id), lambda: _fetch_volume(google_book_id),
+    )
+
+
+async def _fetch_volume(google_book_id: str) -> dict:
+    """Call Google Books for one volume and build the endpoint response."""
     url = f"https://www.googleapis.com/books/v1/volumes/{google_book_id}"
     params = {"key": GOOGLE_BOOKS_API_KEY}
     
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, params=params, timeout=10.0)
-            response.raise_for_status()
-            item = response.json()
+        response = await http_client.get_client().get(url, params=params, timeout=http_client.timeout(10.0))
+        response.raise_for_status()
+        item = response.json()
         
         volume_info = item.get("volumeInfo", {})
         
@@ -255,7 +274,7 @@ async def get_book_details(google_book_id: str):
             isbn_13=isbn_13
         )
         
-        return book_result
+        return book_result.dict()
     
     except httpx.HTTPError as e:
         raise HTTPException(
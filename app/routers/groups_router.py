@@ -2,7 +2,9 @@
 Groups (Literary Circles) router.
 Handles: CRUD, membership, invites, posts, leaderboard, group book, goals.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlmodel import Session, select, func
 from typing import List, Optional
 from datetime import datetime, timedelta
@@ -10,8 +12,12 @@ from pydantic import BaseModel
 
 from ..deps import get_db, get_current_user
 from .. import models
-from ..group_activity import fire_group_activity
+from ..group_activity import fire_group_activity, invalidate_user_groups
+from .. import book_resolver, group_discovery, group_goals, group_stats
+from ..deletion import create_deletion_job, serialize_deletion_job, tombstone_group
 from ..notifications.dispatcher import fire_event
+from ..notifications.scheduler import enqueue_deletion
+from ..pagination import after, before, clamp_limit, decode_cursor, page
 
 router = APIRouter(prefix="/groups", tags=["groups"])
 
@@ -31,45 +37,75 @@ def _is_curator(db, group_id: int, user_id: int) -> bool:
     m = _is_member(db, group_id, user_id)
     return m is not None and m.role == "curator"
 
-def _member_count(db, group_id: int) -> int:
-    return db.exec(
-        select(func.count(models.GroupMember.id)).where(
-            models.GroupMember.group_id == group_id,
-            models.GroupMember.status == "active",
-        )
-    ).one()
-
 def _group_or_404(db, group_id: int) -> models.ReadingGroup:
     g = db.get(models.ReadingGroup, group_id)
-    if not g:
+    if not g or g.deleted_at is not None:
         raise HTTPException(status_code=404, detail="Group not found")
     return g
 
+def _serialize_groups(
+    db,
+    groups: List[models.ReadingGroup],
+    user_id: int,
+    memberships: Optional[dict] = None,
+) -> List[dict]:
+    """
+    Serialize many groups for one viewer in a constant number of queries
+    (books, creators, member counts, viewer memberships) — however many groups.
+    Pass `memberships` ({group_id: GroupMember}) when the caller already has them.
+    """
+    if not groups:
+        return []
+    group_ids = [g.id for g in groups]
+
+    book_ids = list({g.current_book_id for g in groups if g.current_book_id})
+    books_map = {b.id: b for b in db.exec(select(models.Book).where(models.Book.id.in_(book_ids))).all()} if book_ids else {}
+    creator_ids = list({g.created_by for g in groups})
+    creators_map = {u.id: u for u in db.exec(select(models.User).where(models.User.id.in_(creator_ids))).all()}
+    count_rows = db.exec(
+        select(models.GroupMember.group_id, func.count(models.GroupMember.id))
+        .where(models.GroupMember.group_id.in_(group_ids), models.GroupMember.status == "active")
+        .group_by(models.GroupMember.group_id)
+    ).all()
+    member_counts = {r[0]: r[1] for r in count_rows}
+    if memberships is None:
+        memberships = {m.group_id: m for m in db.exec(
+            select(models.GroupMember).where(
+                models.GroupMember.group_id.in_(group_ids),
+                models.GroupMember.user_id == user_id,
+            )
+        ).all()}
+
+    result = []
+    for g in groups:
+        book = books_map.get(g.current_book_id) if g.current_book_id else None
+        creator = creators_map.get(g.created_by)
+        membership = memberships.get(g.id)
+        result.append({
+            "id": g.id,
+            "name": g.name,
+            "description": g.description,
+            "is_private": g.is_private,
+            "invite_code": g.invite_code,
+            "cover_preset": g.cover_preset,
+            "created_by": g.created_by,
+            "creator_name": creator.name if creator else None,
+            "goal_pages": g.goal_pages,
+            "goal_period": g.goal_period,
+            "goal_start_date": g.goal_start_date.isoformat() if g.goal_start_date else None,
+            "current_book": {
+                "id": book.id, "title": book.title,
+                "author": book.author, "cover_url": book.cover_url,
+            } if book else None,
+            "member_count": member_counts.get(g.id, 0),
+            "membership_status": membership.status if membership else None,
+            "membership_role": membership.role if membership else None,
+            "created_at": g.created_at.isoformat(),
+        })
+    return result
+
 def _serialize_group(db, g: models.ReadingGroup, user_id: int) -> dict:
-    membership = _is_member(db, g.id, user_id, require_active=False)
-    book = db.get(models.Book, g.current_book_id) if g.current_book_id else None
-    creator = db.get(models.User, g.created_by)
-    return {
-        "id": g.id,
-        "name": g.name,
-        "description": g.description,
-        "is_private": g.is_private,
-        "invite_code": g.invite_code,
-        "cover_preset": g.cover_preset,
-        "created_by": g.created_by,
-        "creator_name": creator.name if creator else None,
-        "goal_pages": g.goal_pages,
-        "goal_period": g.goal_period,
-        "goal_start_date": g.goal_start_date.isoformat() if g.goal_start_date else None,
-        "current_book": {
-            "id": book.id, "title": book.title,
-            "author": book.author, "cover_url": book.cover_url,
-        } if book else None,
-        "member_count": _member_count(db, g.id),
-        "membership_status": membership.status if membership else None,
-        "membership_role": membership.role if membership else None,
-        "created_at": g.created_at.isoformat(),
-    }
+    return _serialize_groups(db, [g], user_id)[0]
 
 
 # ─── Schemas ──────────────────────────────────────────────────────────────────
@@ -126,62 +162,20 @@ def get_my_pending_invites(
     if not pending:
         return []
 
-    # Batch fetch groups
     group_ids = list({m.group_id for m in pending})
     groups_map = {g.id: g for g in db.exec(select(models.ReadingGroup).where(models.ReadingGroup.id.in_(group_ids))).all()}
+    groups = [groups_map[m.group_id] for m in pending if m.group_id in groups_map]
 
     # Batch fetch inviters
     inviter_ids = list({m.invited_by for m in pending if m.invited_by})
     inviters_map = {u.id: u for u in db.exec(select(models.User).where(models.User.id.in_(inviter_ids))).all()} if inviter_ids else {}
 
-    # Batch fetch current books + creators
-    book_ids = list({g.current_book_id for g in groups_map.values() if g.current_book_id})
-    books_map = {b.id: b for b in db.exec(select(models.Book).where(models.Book.id.in_(book_ids))).all()} if book_ids else {}
-    creator_ids = list({g.created_by for g in groups_map.values()})
-    creators_map = {u.id: u for u in db.exec(select(models.User).where(models.User.id.in_(creator_ids))).all()} if creator_ids else {}
-
-    # Batch member counts
-    count_rows = db.exec(
-        select(models.GroupMember.group_id, func.count(models.GroupMember.id))
-        .where(models.GroupMember.group_id.in_(group_ids), models.GroupMember.status == "active")
-        .group_by(models.GroupMember.group_id)
-    ).all()
-    member_counts = {r[0]: r[1] for r in count_rows}
-
-    # My memberships for these groups
     my_memberships = {m.group_id: m for m in pending}
-
-    result = []
-    for m in pending:
-        g = groups_map.get(m.group_id)
-        if not g:
-            continue
-        inviter = inviters_map.get(m.invited_by) if m.invited_by else None
-        book = books_map.get(g.current_book_id) if g.current_book_id else None
-        creator = creators_map.get(g.created_by)
-        membership = my_memberships.get(g.id)
-        result.append({
-            "id": g.id,
-            "name": g.name,
-            "description": g.description,
-            "is_private": g.is_private,
-            "invite_code": g.invite_code,
-            "cover_preset": g.cover_preset,
-            "created_by": g.created_by,
-            "creator_name": creator.name if creator else None,
-            "goal_pages": g.goal_pages,
-            "goal_period": g.goal_period,
-            "goal_start_date": g.goal_start_date.isoformat() if g.goal_start_date else None,
-            "current_book": {
-                "id": book.id, "title": book.title,
-                "author": book.author, "cover_url": book.cover_url,
-            } if book else None,
-            "member_count": member_counts.get(g.id, 0),
-            "membership_status": membership.status if membership else None,
-            "membership_role": membership.role if membership else None,
-            "created_at": g.created_at.isoformat(),
-            "invited_by_name": inviter.name if inviter else None,
-        })
+    result = _serialize_groups(db, groups, me.id, memberships=my_memberships)
+    for item in result:
+        invited_by = my_memberships[item["id"]].invited_by
+        inviter = inviters_map.get(invited_by) if invited_by else None
+        item["invited_by_name"] = inviter.name if inviter else None
     return result
 
 
@@ -204,133 +198,31 @@ def get_my_groups(
     group_ids = [m.group_id for m in memberships]
     membership_map = {m.group_id: m for m in memberships}
     all_groups = db.exec(select(models.ReadingGroup).where(models.ReadingGroup.id.in_(group_ids))).all()
-
-    # Batch fetch books + creators + member counts
-    book_ids = list({g.current_book_id for g in all_groups if g.current_book_id})
-    books_map = {b.id: b for b in db.exec(select(models.Book).where(models.Book.id.in_(book_ids))).all()} if book_ids else {}
-    creator_ids = list({g.created_by for g in all_groups})
-    creators_map = {u.id: u for u in db.exec(select(models.User).where(models.User.id.in_(creator_ids))).all()} if creator_ids else {}
-    count_rows = db.exec(
-        select(models.GroupMember.group_id, func.count(models.GroupMember.id))
-        .where(models.GroupMember.group_id.in_(group_ids), models.GroupMember.status == "active")
-        .group_by(models.GroupMember.group_id)
-    ).all()
-    member_counts = {r[0]: r[1] for r in count_rows}
-
-    result = []
-    for g in all_groups:
-        membership = membership_map.get(g.id)
-        book = books_map.get(g.current_book_id) if g.current_book_id else None
-        creator = creators_map.get(g.created_by)
-        result.append({
-            "id": g.id,
-            "name": g.name,
-            "description": g.description,
-            "is_private": g.is_private,
-            "invite_code": g.invite_code,
-            "cover_preset": g.cover_preset,
-            "created_by": g.created_by,
-            "creator_name": creator.name if creator else None,
-            "goal_pages": g.goal_pages,
-            "goal_period": g.goal_period,
-            "goal_start_date": g.goal_start_date.isoformat() if g.goal_start_date else None,
-            "current_book": {
-                "id": book.id, "title": book.title,
-                "author": book.author, "cover_url": book.cover_url,
-            } if book else None,
-            "member_count": member_counts.get(g.id, 0),
-            "membership_status": membership.status if membership else None,
-            "membership_role": membership.role if membership else None,
-            "created_at": g.created_at.isoformat(),
-        })
-    return result
+    return _serialize_groups(db, all_groups, me.id, memberships=membership_map)
 
 
 @router.get("/discover")
 def discover_groups(
+    response: Response,
     q: Optional[str] = None,
+    limit: int = 50,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     me: models.User = Depends(get_current_user),
 ):
-    """Public groups the user has not joined, optionally filtered by name."""
-    groups = db.exec(select(models.ReadingGroup).where(models.ReadingGroup.is_private == False)).all()
-    if not groups:
-        return []
-
-    group_ids = [g.id for g in groups]
-
-    # Batch fetch my active memberships so we can filter without per-group queries
-    my_active_group_ids = {
-        m.group_id for m in db.exec(
-            select(models.GroupMember).where(
-                models.GroupMember.group_id.in_(group_ids),
-                models.GroupMember.user_id == me.id,
-                models.GroupMember.status == "active",
-            )
-        ).all()
-    }
-
-    # Filter: name/description match + not already an active member
-    visible = []
-    for g in groups:
-        if g.id in my_active_group_ids:
-            continue
-        if q and q.lower() not in g.name.lower() and (not g.description or q.lower() not in g.description.lower()):
-            continue
-        visible.append(g)
-
-    if not visible:
+    """
+    Public groups the user has not joined, optionally filtered by name/description.
+    Best-ranked first (members + recent activity, see app/group_discovery.py).
+    Keyset-paginated: pass the X-Next-Cursor response header back as ?cursor=.
+    """
+    limit = clamp_limit(limit, 100)
+    position = decode_cursor(cursor, 2) if cursor else None
+    rows = group_discovery.discover(db, me.id, q=q, after=position, limit=limit)
+    rows = page(rows, limit, response, lambda r: (r[1], r[0].id))
+    if not rows:
         return []
 
-    visible_ids = [g.id for g in visible]
-
-    # Batch fetch books + creators + member counts
-    book_ids = list({g.current_book_id for g in visible if g.current_book_id})
-    books_map = {b.id: b for b in db.exec(select(models.Book).where(models.Book.id.in_(book_ids))).all()} if book_ids else {}
-    creator_ids = list({g.created_by for g in visible})
-    creators_map = {u.id: u for u in db.exec(select(models.User).where(models.User.id.in_(creator_ids))).all()} if creator_ids else {}
-    count_rows = db.exec(
-        select(models.GroupMember.group_id, func.count(models.GroupMember.id))
-        .where(models.GroupMember.group_id.in_(visible_ids), models.GroupMember.status == "active")
-        .group_by(models.GroupMember.group_id)
-    ).all()
-    member_counts = {r[0]: r[1] for r in count_rows}
-
-    # My non-active memberships (pending/invited) for these groups
-    my_memberships = {m.group_id: m for m in db.exec(
-        select(models.GroupMember).where(
-            models.GroupMember.group_id.in_(visible_ids),
-            models.GroupMember.user_id == me.id,
-        )
-    ).all()}
-
-    result = []
-    for g in visible:
-        book = books_map.get(g.current_book_id) if g.current_book_id else None
-        creator = creators_map.get(g.created_by)
-        membership = my_memberships.get(g.id)
-        result.append({
-            "id": g.id,
-            "name": g.name,
-            "description": g.description,
-            "is_private": g.is_private,
-            "invite_code": g.invite_code,
-            "cover_preset": g.cover_preset,
-            "created_by": g.created_by,
-            "creator_name": creator.name if creator else None,
-            "goal_pages": g.goal_pages,
-            "goal_period": g.goal_period,
-            "goal_start_date": g.goal_start_date.isoformat() if g.goal_start_date else None,
-            "current_book": {
-                "id": book.id, "title": book.title,
-                "author": book.author, "cover_url": book.cover_url,
-            } if book else None,
-            "member_count": member_counts.get(g.id, 0),
-            "membership_status": membership.status if membership else None,
-            "membership_role": membership.role if membership else None,
-            "created_at": g.created_at.isoformat(),
-        })
-    return result
+    return _serialize_groups(db, [g for g, _ in rows], me.id)
 
 
 # ─── Create ───────────────────────────────────────────────────────────────────
@@ -364,7 +256,11 @@ def create_group(
 
     # Make creator a curator
     db.add(models.GroupMember(group_id=g.id, user_id=me.id, role="curator", status="active"))
+    group_stats.add_member_stats(db, g.id, me.id)
+    db.flush()
+    group_discovery.track_group(db, g)
     db.commit()
+    invalidate_user_groups(me.id)
 
     # Send pending invites to specified users
     for uid in body.invite_user_ids:
@@ -412,12 +308,16 @@ def update_group(
     if body.description is not None:
         g.description = body.description
     if body.is_private is not None:
-        g.is_private = body.is_private
+        if body.is_private != g.is_private:
+            g.is_private = body.is_private
+            group_discovery.track_group(db, g)   # private groups leave discovery
     if body.cover_preset is not None:
         g.cover_preset = body.cover_preset
     if body.goal_pages is not None:
         g.goal_pages = body.goal_pages
     if body.goal_period is not None:
+        if body.goal_period != g.goal_period:
+            group_goals.invalidate(db, group_id)   # counters are per period
         g.goal_period = body.goal_period
         if not g.goal_start_date:
             g.goal_start_date = datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
@@ -429,20 +329,37 @@ def update_group(
 @router.delete("/{group_id}", status_code=204)
 def delete_group(
     group_id: int,
+    response: Response,
     db: Session = Depends(get_db),
     me: models.User = Depends(get_current_user),
 ):
+    """
+    Delete the group and everything in it. The group is gone for every other
+    endpoint at once; the rows are removed by a background job (app/deletion.py)
+    whose id is returned in the X-Deletion-Job header.
+    """
     g = _group_or_404(db, group_id)
     if g.created_by != me.id:
         raise HTTPException(status_code=403, detail="Only the group creator can delete it")
-    # Delete members, posts, then group
-    db.exec(select(models.GroupMember).where(models.GroupMember.group_id == group_id))
-    for m in db.exec(select(models.GroupMember).where(models.GroupMember.group_id == group_id)).all():
-        db.delete(m)
-    for p in db.exec(select(models.GroupPost).where(models.GroupPost.group_id == group_id)).all():
-        db.delete(p)
-    db.delete(g)
+    job = create_deletion_job(db, "group", group_id, me.id)
+    member_ids = tombstone_group(db, group_id)
     db.commit()
+    invalidate_user_groups(*member_ids)
+    enqueue_deletion(job.id)
+    response.headers["X-Deletion-Job"] = str(job.id)
+
+
+@router.get("/deletions/{job_id}")
+def get_group_deletion(
+    job_id: int,
+    db: Session = Depends(get_db),
+    me: models.User = Depends(get_current_user),
+):
+    """Progress of a group deletion the caller requested."""
+    job = db.get(models.DeletionJob, job_id)
+    if not job or job.kind != "group" or job.requested_by != me.id:
+        raise HTTPException(status_code=404, detail="Deletion job not found")
+    return serialize_deletion_job(job)
 
 
 # ─── Membership ───────────────────────────────────────────────────────────────
@@ -460,8 +377,12 @@ def join_group(
 
     member_status = "pending" if g.is_private else "active"
     db.add(models.GroupMember(group_id=group_id, user_id=me.id, role="member", status=member_status))
+    if member_status == "active":
+        group_stats.add_member_stats(db, group_id, me.id)
+        group_goals.invalidate(db, group_id)
     db.commit()
     if member_status == "active":
+        invalidate_user_groups(me.id)
         fire_group_activity(db, group_id, me.id, "member_joined")
     elif member_status == "pending":
         # Notify all curators that someone wants to join
@@ -507,22 +428,36 @@ def leave_group(
         if not other_curators:
             raise HTTPException(status_code=400, detail="Transfer curator role before leaving")
     db.delete(m)
+    group_stats.remove_member_stats(db, group_id, me.id)
+    group_goals.invalidate(db, group_id)
     db.commit()
+    invalidate_user_groups(me.id)
+
+
+def _member_page(
+    db, group_id: int, status: str, limit: int, cursor: Optional[str], response: Response, *where,
+) -> list:
+    """One page of GroupMember rows in join order, keyset on (joined_at, id)."""
+    GM = models.GroupMember
+    query = select(GM).where(GM.group_id == group_id, GM.status == status, *where)
+    if cursor:
+        query = query.where(after([GM.joined_at, GM.id], decode_cursor(cursor, 2)))
+    rows = db.exec(query.order_by(GM.joined_at, GM.id).limit(limit + 1)).all()
+    return page(rows, limit, response, lambda m: (m.joined_at, m.id))
 
 
 @router.get("/{group_id}/members")
 def get_members(
     group_id: int,
+    response: Response,
+    limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     me: models.User = Depends(get_current_user),
 ):
+    """Active members in join order. Keyset-paginated via the X-Next-Cursor header."""
     _group_or_404(db, group_id)
-    members = db.exec(
-        select(models.GroupMember).where(
-            models.GroupMember.group_id == group_id,
-            models.GroupMember.status == "active",
-        )
-    ).all()
+    members = _member_page(db, group_id, "active", clamp_limit(limit, 200), cursor, response)
     if not members:
         return []
     user_ids = [m.user_id for m in members]
@@ -542,18 +477,19 @@ def get_members(
 @router.get("/{group_id}/pending")
 def get_pending(
     group_id: int,
+    response: Response,
+    limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     me: models.User = Depends(get_current_user),
 ):
+    """Self-join requests, oldest first. Keyset-paginated via the X-Next-Cursor header."""
     if not _is_curator(db, group_id, me.id):
         raise HTTPException(status_code=403, detail="Curator only")
-    pending = db.exec(
-        select(models.GroupMember).where(
-            models.GroupMember.group_id == group_id,
-            models.GroupMember.status == "pending",
-            models.GroupMember.invited_by == None,  # self-join requests only; curator invites are accepted by the invitee
-        )
-    ).all()
+    pending = _member_page(
+        db, group_id, "pending", clamp_limit(limit, 200), cursor, response,
+        models.GroupMember.invited_by == None,  # self-join requests only; curator invites are accepted by the invitee
+    )
     if not pending:
         return []
     user_ids = [m.user_id for m in pending]
@@ -583,7 +519,10 @@ def approve_member(
         raise HTTPException(status_code=404, detail="No pending request")
     m.status = "active"
     db.add(m)
+    group_stats.add_member_stats(db, group_id, user_id)
+    group_goals.invalidate(db, group_id)
     db.commit()
+    invalidate_user_groups(user_id)
     return {"ok": True}
 
 
@@ -612,7 +551,10 @@ def remove_member(
     m = _is_member(db, group_id, user_id)
     if m:
         db.delete(m)
+        group_stats.remove_member_stats(db, group_id, user_id)
+        group_goals.invalidate(db, group_id)
         db.commit()
+        invalidate_user_groups(user_id)
 
 
 @router.post("/{group_id}/invite/{user_id}", status_code=201)
@@ -654,7 +596,9 @@ def join_by_invite_code(
     me: models.User = Depends(get_current_user),
 ):
     g = db.exec(
-        select(models.ReadingGroup).where(models.ReadingGroup.invite_code == invite_code)
+        select(models.ReadingGroup).where(
+            models.ReadingGroup.invite_code == invite_code, models.ReadingGroup.deleted_at == None,  # noqa: E711
+        )
     ).first()
     if not g:
         raise HTTPException(status_code=404, detail="Invalid invite code")
@@ -664,7 +608,12 @@ def join_by_invite_code(
     # Private: pending for curator approval; public: instant
     member_status = "pending" if g.is_private else "active"
     db.add(models.GroupMember(group_id=g.id, user_id=me.id, role="member", status=member_status))
+    if member_status == "active":
+        group_stats.add_member_stats(db, g.id, me.id)
+        group_goals.invalidate(db, g.id)
     db.commit()
+    if member_status == "active":
+        invalidate_user_groups(me.id)
     return {"group_id": g.id, "status": member_status}
 
 
@@ -682,7 +631,10 @@ def accept_invite(
         raise HTTPException(status_code=404, detail="No pending invite")
     m.status = "active"
     db.add(m)
+    group_stats.add_member_stats(db, group_id, me.id)
+    group_goals.invalidate(db, group_id)
     db.commit()
+    invalidate_user_groups(me.id)
     fire_group_activity(db, group_id, me.id, "member_joined")
     return {"ok": True}
 
@@ -705,34 +657,41 @@ def decline_invite(
 @router.get("/{group_id}/posts")
 def get_group_posts(
     group_id: int,
+    response: Response,
+    limit: int = 50,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     me: models.User = Depends(get_current_user),
 ):
+    """Newest posts first. Keyset-paginated via the X-Next-Cursor header."""
     g = _group_or_404(db, group_id)
     if g.is_private and not _is_member(db, group_id, me.id):
         raise HTTPException(status_code=403, detail="Members only")
-    posts = db.exec(
-        select(models.GroupPost)
-        .where(models.GroupPost.group_id == group_id)
-        .order_by(models.GroupPost.created_at.desc())
-        .limit(50)
-    ).all()
+    GP = models.GroupPost
+    query = select(GP).where(GP.group_id == group_id)
+    if cursor:
+        query = query.where(before([GP.created_at, GP.id], decode_cursor(cursor, 2)))
+    limit = clamp_limit(limit, 100)
+    posts = db.exec(query.order_by(GP.created_at.desc(), GP.id.desc()).limit(limit + 1)).all()
+    posts = page(posts, limit, response, lambda p: (p.created_at, p.id))
     if not posts:
         return []
+
+    # Hydrate only this page: authors, and userbook → book in one join
     user_ids = list({p.user_id for p in posts})
     users_map = {u.id: u for u in db.exec(select(models.User).where(models.User.id.in_(user_ids))).all()}
-    ub_ids = [p.userbook_id for p in posts if p.userbook_id]
-    ubs_map = {ub.id: ub for ub in db.exec(select(models.UserBook).where(models.UserBook.id.in_(ub_ids))).all()} if ub_ids else {}
-    bk_ids = list({ub.book_id for ub in ubs_map.values() if ub.book_id})
-    books_map = {b.id: b for b in db.exec(select(models.Book).where(models.Book.id.in_(bk_ids))).all()} if bk_ids else {}
+    ub_ids = list({p.userbook_id for p in posts if p.userbook_id})
+    books_by_ub = {
+        ub_id: book for ub_id, book in db.exec(
+            select(models.UserBook.id, models.Book)
+            .join(models.Book, models.Book.id == models.UserBook.book_id)
+            .where(models.UserBook.id.in_(ub_ids))
+        ).all()
+    } if ub_ids else {}
     result = []
     for p in posts:
         user = users_map.get(p.user_id)
-        book = None
-        if p.userbook_id:
-            ub = ubs_map.get(p.userbook_id)
-            if ub:
-                book = books_map.get(ub.book_id)
+        book = books_by_ub.get(p.userbook_id) if p.userbook_id else None
         result.append({
             "id": p.id,
             "text": p.text,
@@ -800,81 +759,27 @@ def get_leaderboard(
     if g.is_private and not _is_member(db, group_id, me.id):
         raise HTTPException(status_code=403, detail="Members only")
 
-    members = db.exec(
-        select(models.GroupMember).where(
-            models.GroupMember.group_id == group_id,
-            models.GroupMember.status == "active",
-        )
-    ).all()
+    # Pre-aggregated, incrementally maintained rows — see app/group_stats.py
+    return group_stats.leaderboard(db, group_id, period)
 
-    since = None
-    if period == "monthly":
-        now = datetime.utcnow()
-        since = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-
-    if not members:
-        return []
-    member_ids = [m.user_id for m in members]
 
-    # Batch: user details
-    users_map = {u.id: u for u in db.exec(select(models.User).where(models.User.id.in_(member_ids))).all()}
-
-    # Batch: books finished per user
-    ub_q = select(models.UserBook.user_id, func.count(models.UserBook.id)).where(
-        models.UserBook.user_id.in_(member_ids),
-        models.UserBook.status == "finished",
-    )
-    if since:
-        ub_q = ub_q.where(models.UserBook.updated_at >= since)
-    finished_map = {r[0]: r[1] for r in db.exec(ub_q.group_by(models.UserBook.user_id)).all()}
-
-    # Batch: pages read per user from activity
-    ra_q = select(models.ReadingActivity.user_id, func.sum(models.ReadingActivity.pages_read)).where(
-        models.ReadingActivity.user_id.in_(member_ids),
-    )
-    if since:
-        ra_q = ra_q.where(models.ReadingActivity.date >= since)
-    pages_map = {r[0]: r[1] or 0 for r in db.exec(ra_q.group_by(models.ReadingActivity.user_id)).all()}
-
-    # Batch: currently reading book per user (one per user)
-    reading_ubs = db.exec(
-        select(models.UserBook).where(
-            models.UserBook.user_id.in_(member_ids),
-            models.UserBook.status == "reading",
-        )
-    ).all()
-    # Keep only most-recently-updated per user
-    reading_map: dict = {}
-    for ub in reading_ubs:
-        if ub.user_id not in reading_map or (ub.updated_at or 0) > (reading_map[ub.user_id].updated_at or 0):
-            reading_map[ub.user_id] = ub
-    reading_book_ids = [ub.book_id for ub in reading_map.values() if ub.book_id]
-    reading_books = {b.id: b for b in db.exec(select(models.Book).where(models.Book.id.in_(reading_book_ids))).all()} if reading_book_ids else {}
-
-    rows = []
-    for m in members:
-        user = users_map.get(m.user_id)
-        if not user:
-            continue
-        cur_ub = reading_map.get(m.user_id)
-        cur_book = reading_books.get(cur_ub.book_id) if cur_ub and cur_ub.book_id else None
-        rows.append({
-            "user_id": user.id,
-            "name": user.name,
-            "username": user.username,
-            "profile_picture": getattr(user, "profile_picture", None),
-            "books_finished": finished_map.get(m.user_id, 0),
-            "pages_read": int(pages_map.get(m.user_id, 0)),
-            "current_book": cur_book.title if cur_book else None,
-        })
+# ─── Goal Progress ────────────────────────────────────────────────────────────
 
-    rows.sort(key=lambda r: (-r["pages_read"], -r["books_finished"]))
-    for i, r in enumerate(rows):
-        r["rank"] = i + 1
-    return rows
+@router.get("/{group_id}/pages-distribution")
+def get_pages_distribution(
+    group_id: int,
+    days: int = 30,
+    db: Session = Depends(get_db),
+    me: models.User = Depends(get_current_user),
+):
+    """Percentiles of member pages over the last N days and the caller's percentile (app/analytics.py)."""
+    from .. import analytics
 
+    g = _group_or_404(db, group_id)
+    if g.is_private and not _is_member(db, group_id, me.id):
+        raise HTTPException(status_code=403, detail="Members only")
+    return analytics.group_distribution(db, group_id, me.id, days=max(1, min(days, 365)))
 
-# ─── Goal Progress ────────────────────────────────────────────────────────────
 
 @router.get("/{group_id}/goal")
 def get_goal_progress(
@@ -886,25 +791,8 @@ def get_goal_progress(
     if not g.goal_pages:
         return {"goal_pages": None, "pages_read": 0, "pct": 0}
 
-    members = db.exec(
-        select(models.GroupMember).where(
-            models.GroupMember.group_id == group_id,
-            models.GroupMember.status == "active",
-        )
-    ).all()
-    user_ids = [m.user_id for m in members]
-
-    since = g.goal_start_date
-    if g.goal_period == "monthly" and since:
-        now = datetime.utcnow()
-        since = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-
-    ra_q = select(func.sum(models.ReadingActivity.pages_read)).where(
-        models.ReadingActivity.user_id.in_(user_ids)
-    )
-    if since:
-        ra_q = ra_q.where(models.ReadingActivity.date >= since)
-    total_pages = db.exec(ra_q).one() or 0
+    # Rolling per-period counter — see app/group_goals.py
+    total_pages = group_goals.goal_pages_read(db, g)
 
     pct = min(100, round((total_pages / g.goal_pages) * 100)) if g.goal_pages else 0
     return {
@@ -933,27 +821,17 @@ def set_group_book(
         if not book:
             raise HTTPException(status_code=404, detail="Book not found")
     elif body.title:
-        # Find or create from Google Books data
-        book = None
-        if body.isbn:
-            book = db.exec(select(models.Book).where(models.Book.isbn == body.isbn)).first()
-        if not book and body.google_books_id:
-            book = db.exec(select(models.Book).where(models.Book.google_books_id == body.google_books_id)).first()
-        if not book:
-            from datetime import datetime as _dt
-            book = models.Book(
-                title=body.title,
-                author=body.author or "Unknown",
-                isbn=body.isbn,
-                cover_url=body.cover_url,
-                description=body.description,
-                total_pages=body.total_pages,
-                google_books_id=body.google_books_id,
-                created_at=_dt.utcnow(),
-            )
-            db.add(book)
-            db.commit()
-            db.refresh(book)
+        # Find (ISBN-13 / Google Books id) or create from Google Books data
+        book, _ = book_resolver.resolve(
+            db,
+            title=body.title,
+            author=body.author or "Unknown",
+            isbn=body.isbn,
+            google_books_id=body.google_books_id,
+            cover_url=body.cover_url,
+            description=body.description,
+            total_pages=body.total_pages,
+        )
     else:
         raise HTTPException(status_code=400, detail="book_id or book title required")
 
@@ -983,23 +861,34 @@ def clear_group_book(
 @router.get("/{group_id}/activity")
 def get_group_activity(
     group_id: int,
+    response: Response,
     limit: int = 50,
+    cursor: Optional[str] = None,
+    event_type: Optional[str] = None,
     db: Session = Depends(get_db),
     me: models.User = Depends(get_current_user),
 ):
-    """Return the activity feed for a group (most recent first)."""
+    """
+    Return the activity feed for a group (most recent first).
+    Keyset-paginated: pass the X-Next-Cursor response header back as ?cursor=
+    for the next page. Optional ?event_type= filter (e.g. book_finished).
+    """
     g = _group_or_404(db, group_id)
     if g.is_private and not _is_member(db, group_id, me.id):
         raise HTTPException(status_code=403, detail="Members only")
 
+    limit = clamp_limit(limit, 200)
+    GA = models.GroupActivity
+    query = select(GA).where(GA.group_id == group_id)
+    if event_type:
+        query = query.where(GA.event_type == event_type)
+    if cursor:
+        query = query.where(before([GA.created_at, GA.id], decode_cursor(cursor, 2)))
     events = db.exec(
-        select(models.GroupActivity)
-        .where(models.GroupActivity.group_id == group_id)
-        .order_by(models.GroupActivity.created_at.desc())
-        .limit(limit)
+        query.order_by(GA.created_at.desc(), GA.id.desc()).limit(limit + 1)
     ).all()
+    events = page(events, limit, response, lambda ev: (ev.created_at, ev.id))
 
-    import json as _json
     if not events:
         return []
     ev_user_ids = list({ev.user_id for ev in events})
@@ -1007,11 +896,11 @@ def get_group_activity(
     result = []
     for ev in events:
         user = ev_users_map.get(ev.user_id)
-        payload = _json.loads(ev.payload) if ev.payload else {}
         result.append({
             "id": ev.id,
             "event_type": ev.event_type,
-            "payload": payload,
+            # Rows not yet converted by migrations/group_activity_jsonb.py still come back as text
+            "payload": json.loads(ev.payload) if isinstance(ev.payload, str) else (ev.payload or {}),
             "created_at": ev.created_at,
             "user": {
                 "id": user.id,
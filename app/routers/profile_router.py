@@ -7,7 +7,8 @@ import uuid
 import cloudinary
 import cloudinary.uploader
 
-from ..models import User, UserBook, Follow, Book
+from .. import analytics
+from ..models import User, Follow
 from ..deps import get_db, get_current_user
 
 cloudinary.config(
@@ -45,36 +46,22 @@ def get_profile(db: Session = Depends(get_db), current_user=Depends(get_current_
     # Following: who this user follows
     following = db.exec(select(Follow).where(Follow.follower_id == user.id)).all()
 
-    # Reading stats
-    total_books = db.exec(select(UserBook).where(UserBook.user_id == user.id)).all()
-    finished = [b for b in total_books if b.status == "finished"]
-    reading = [b for b in total_books if b.status == "reading"]
-    to_read = [b for b in total_books if b.status == "to-read"]
-
-    # Calculate total pages read — batch-fetch books instead of N individual lookups
-    _book_ids = [ub.book_id for ub in total_books if ub.book_id]
-    _books_map = {b.id: b for b in db.exec(select(Book).where(Book.id.in_(_book_ids))).all()} if _book_ids else {}
-    total_pages_read = 0
-    for ub in total_books:
-        if ub.status == "finished":
-            book = _books_map.get(ub.book_id)
-            total_pages_read += (book.total_pages if book and book.total_pages else 0) or (ub.current_page or 0)
-        elif ub.status == "reading":
-            total_pages_read += ub.current_page or 0
+    # Reading stats — counts over the whole library in one query (app/analytics.py)
+    library = analytics.library_stats(db, user.id)
 
     # NOTE: For cross-platform compatibility, we return both snake_case and camelCase keys in the stats object.
     # - The web frontend expects snake_case (e.g., total_books, to_read, total_pages_read)
     # - The mobile app expects camelCase (e.g., totalBooks, toRead, totalPagesRead)
     # This avoids the need to rebuild the mobile app after backend changes.
     stats = {
-        "total_books": len(total_books),
-        "totalBooks": len(total_books),
-        "finished": len(finished),
-        "reading": len(reading),
-        "to_read": len(to_read),
-        "toRead": len(to_read),
-        "total_pages_read": total_pages_read,
-        "totalPagesRead": total_pages_read,
+        "total_books": library["total_books"],
+        "totalBooks": library["total_books"],
+        "finished": library["finished"],
+        "reading": library["reading"],
+        "to_read": library["to_read"],
+        "toRead": library["to_read"],
+        "total_pages_read": library["pages_read"],
+        "totalPagesRead": library["pages_read"],
     }
 
     # Log the outgoing profile response for debugging mobile issues
@@ -137,18 +124,14 @@ def update_profile(payload: ProfileUpdate, db: Session = Depends(get_db), curren
     followers = db.exec(select(Follow).where(Follow.followed_id == user.id)).all()
     following = db.exec(select(Follow).where(Follow.follower_id == user.id)).all()
 
-    total_books = db.exec(select(UserBook).where(UserBook.user_id == user.id)).all()
-    finished = [b for b in total_books if b.status == "finished"]
-    reading = [b for b in total_books if b.status == "reading"]
-    to_read = [b for b in total_books if b.status == "to-read"]
-
+    library = analytics.library_stats(db, user.id)
     stats = {
-        "total_books": len(total_books),
-        "totalBooks": len(total_books),
-        "finished": len(finished),
-        "reading": len(reading),
-        "to_read": len(to_read),
-        "toRead": len(to_read),
+        "total_books": library["total_books"],
+        "totalBooks": library["total_books"],
+        "finished": library["finished"],
+        "reading": library["reading"],
+        "to_read": library["to_read"],
+        "toRead": library["to_read"],
     }
 
     return {
@@ -245,15 +228,7 @@ def get_public_profile(user_id: int, db: Session = Depends(get_db), current_user
         base["locked"] = True
         return base
 
-    total_books = db.exec(select(UserBook).where(UserBook.user_id == user.id)).all()
-    finished = [b for b in total_books if b.status == "finished"]
-    reading = [b for b in total_books if b.status == "reading"]
-
-    base["stats"] = {
-        "total_books": len(total_books),
-        "finished": len(finished),
-        "reading": len(reading),
-        "to_read": len([b for b in total_books if b.status == "to-read"]),
-    }
+    library = analytics.library_stats(db, user.id)
+    base["stats"] = {key: library[key] for key in ("total_books", "finished", "reading", "to_read")}
     base["locked"] = False
     return base
@@ -1,14 +1,45 @@
 # app/routers/reading_activity_router.py
+import numpy as np
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import case
 from sqlmodel import Session, select, func
 from ..deps import get_db, get_current_user
+from .. import analytics, reading_bitmap, reading_stats
 from ..models import ReadingActivity, UserBook, Book, User, Follow
-from datetime import datetime, timedelta, date as date_type
-from typing import List
+from datetime import datetime, timedelta
+from typing import List, Optional
 
 router = APIRouter(prefix="/reading-activity", tags=["reading-activity"])
 
 
+def _daily_pages(db: Session, user_id: int, days: int) -> dict:
+    """
+    Pages read per day for the last N days, as {"days": N, "data": [{date, pages_read}, ...]}
+    oldest first with missing days filled in as 0.
+
+    Grouped in SQL on (user_id, date) — served by idx_reading_activity_user_date —
+    so only one row per active day leaves the database.
+    """
+    end_date = datetime.utcnow().date()
+    start_date = end_date - timedelta(days=days)
+
+    day = func.date(ReadingActivity.date)
+    rows = db.exec(
+        select(day, func.sum(ReadingActivity.pages_read))
+        .where(ReadingActivity.user_id == user_id)
+        .where(ReadingActivity.date >= start_date)
+        .group_by(day)
+    ).all()
+    # SQLite returns 'YYYY-MM-DD' strings, Postgres returns dates
+    daily_stats = {str(d): int(pages or 0) for d, pages in rows}
+
+    result = []
+    for i in range(days - 1, -1, -1):
+        date_key = (end_date - timedelta(days=i)).isoformat()
+        result.append({"date": date_key, "pages_read": daily_stats.get(date_key, 0)})
+    return {"days": days, "data": result}
+
+
 @router.get("/daily")
 def get_daily_reading_stats(
     days: int = 30,
@@ -19,37 +50,7 @@ def get_daily_reading_stats(
     Get daily reading activity for the current user for the last N days.
     Returns pages read per day for charts.
     """
-    # Calculate date range
-    end_date = datetime.utcnow().date()
-    start_date = end_date - timedelta(days=days)
-    
-    # Query reading activity
-    activities = db.exec(
-        select(ReadingActivity)
-        .where(ReadingActivity.user_id == current_user.id)
-        .where(ReadingActivity.date >= start_date)
-        .order_by(ReadingActivity.date.desc())
-    ).all()
-    
-    # Group by date and sum pages_read
-    daily_stats = {}
-    for activity in activities:
-        date_key = activity.date.date() if isinstance(activity.date, datetime) else activity.date
-        if date_key not in daily_stats:
-            daily_stats[date_key] = 0
-        daily_stats[date_key] += (activity.pages_read or 0)
-    
-    # Fill in missing days with 0
-    result = []
-    current_date = end_date
-    for i in range(days):
-        date_key = current_date - timedelta(days=i)
-        result.append({
-            "date": date_key.isoformat(),
-            "pages_read": daily_stats.get(date_key, 0)
-        })
-    
-    return {"days": days, "data": list(reversed(result))}
+    return _daily_pages(db, current_user.id, days)
 
 
 @router.get("/insights")
@@ -60,77 +61,50 @@ def get_reading_insights(
     """
     Full reading insights for the current user:
     yearly stats, streaks, monthly breakdown, projected finish dates, avg rating.
+
+    Monthly / 30-day pages and the yearly finished count come from the
+    precomputed user_reading_stats row (app/reading_stats.py), streaks from the
+    reading-day bitmaps like /heatmap and /trends; library totals are one
+    aggregate query; only currently-reading books are loaded.
     """
     today = datetime.utcnow().date()
-    year_start = date_type(today.year, 1, 1)
-
-    # ── All userbooks ────────────────────────────────────────────────────────
-    all_ubs = db.exec(select(UserBook).where(UserBook.user_id == current_user.id)).all()
-    finished_ubs = [ub for ub in all_ubs if ub.status == "finished"]
-    reading_ubs  = [ub for ub in all_ubs if ub.status == "reading"]
-    finished_this_year = [
-        ub for ub in finished_ubs
-        if ub.updated_at and ub.updated_at.date() >= year_start
-    ]
+    stats = reading_stats.get_stats(db, current_user.id)
+
+    # ── Library totals — one aggregate over userbook ⟕ book ──────────────────
+    finished = UserBook.status == "finished"
+    reading = UserBook.status == "reading"
+    total_books, total_finished, total_reading, total_pages, avg_rating = db.exec(
+        select(
+            func.count(UserBook.id),
+            func.sum(case((finished, 1), else_=0)),
+            func.sum(case((reading, 1), else_=0)),
+            func.sum(case(
+                (finished, func.coalesce(func.nullif(Book.total_pages, 0), UserBook.current_page, 0)),
+                (reading, func.coalesce(UserBook.current_page, 0)),
+                else_=0,
+            )),
+            func.avg(case((finished & (UserBook.rating != None) & (UserBook.rating != 0), UserBook.rating))),  # noqa: E711
+        )
+        .select_from(UserBook)
+        .outerjoin(Book, Book.id == UserBook.book_id)
+        .where(UserBook.user_id == current_user.id)
+    ).one()
 
     # ── Yearly goal ──────────────────────────────────────────────────────────
+    finished_this_year = stats.finished_this_year if stats.finished_year == today.year else 0
     yearly_goal = getattr(current_user, "yearly_goal", None)
     goal_progress = None
     if yearly_goal:
         day_of_year = today.timetuple().tm_yday
         goal_progress = {
             "goal": yearly_goal,
-            "completed": len(finished_this_year),
-            "pct": round(min(100, len(finished_this_year) / yearly_goal * 100)),
-            "on_track": len(finished_this_year) >= round(yearly_goal * day_of_year / 365),
+            "completed": finished_this_year,
+            "pct": round(min(100, finished_this_year / yearly_goal * 100)),
+            "on_track": finished_this_year >= round(yearly_goal * day_of_year / 365),
         }
 
-    # ── Total pages read — batch fetch books ─────────────────────────────────
-    _ub_book_ids = [ub.book_id for ub in all_ubs if ub.book_id]
-    _books_map = {b.id: b for b in db.exec(select(Book).where(Book.id.in_(_ub_book_ids))).all()} if _ub_book_ids else {}
-    total_pages = 0
-    for ub in all_ubs:
-        book = _books_map.get(ub.book_id)
-        if ub.status == "finished":
-            total_pages += (book.total_pages if book and book.total_pages else ub.current_page or 0)
-        elif ub.status == "reading":
-            total_pages += ub.current_page or 0
-
-    # ── Reading streak ────────────────────────────────────────────────────────
-    activities = db.exec(
-        select(ReadingActivity)
-        .where(ReadingActivity.user_id == current_user.id)
-        .where(ReadingActivity.pages_read > 0)
-    ).all()
-    active_dates = set()
-    for a in activities:
-        d = a.date.date() if isinstance(a.date, datetime) else a.date
-        active_dates.add(d)
-
-    current_streak = 0
-    check = today
-    while check in active_dates:
-        current_streak += 1
-        check -= timedelta(days=1)
-
-    longest_streak = 0
-    if active_dates:
-        streak = 0
-        prev_d = None
-        for d in sorted(active_dates):
-            if prev_d is None or d == prev_d + timedelta(days=1):
-                streak += 1
-                longest_streak = max(longest_streak, streak)
-            else:
-                streak = 1
-            prev_d = d
-
     # ── Monthly breakdown (last 12 months) ──────────────────────────────────
-    monthly = {}
-    for a in activities:
-        d = a.date.date() if isinstance(a.date, datetime) else a.date
-        key = f"{d.year}-{d.month:02d}"
-        monthly[key] = monthly.get(key, 0) + (a.pages_read or 0)
+    monthly = stats.monthly_pages or {}
     monthly_list = []
     for i in range(11, -1, -1):
         ref = (today.replace(day=1) - timedelta(days=i * 30))
@@ -138,55 +112,89 @@ def get_reading_insights(
         monthly_list.append({"month": key, "pages_read": monthly.get(key, 0)})
 
     # ── Avg pages/day (last 30 days) ─────────────────────────────────────────
-    thirty_ago = today - timedelta(days=30)
-    recent_pages = sum(
-        a.pages_read or 0 for a in activities
-        if (a.date.date() if isinstance(a.date, datetime) else a.date) >= thirty_ago
-    )
+    thirty_ago = (today - timedelta(days=30)).isoformat()
+    recent_pages = sum(p for d, p in (stats.daily_pages or {}).items() if d >= thirty_ago)
     avg_pages_per_day = round(recent_pages / 30, 1)
 
-    # ── Projected finish dates ────────────────────────────────────────────────
+    # ── Projected finish dates (all books at once, app/analytics.py) ──────────
     projected = []
     if avg_pages_per_day > 0:
-        for ub in reading_ubs:
-            book = _books_map.get(ub.book_id)
-            if book and book.total_pages and ub.current_page:
-                pages_left = book.total_pages - ub.current_page
-                days_left = max(1, round(pages_left / avg_pages_per_day))
-                finish_date = today + timedelta(days=days_left)
-                projected.append({
-                    "userbook_id": ub.id,
-                    "title": book.title,
-                    "author": book.author,
-                    "cover_url": book.cover_url,
-                    "current_page": ub.current_page,
-                    "total_pages": book.total_pages,
-                    "pct": round(ub.current_page / book.total_pages * 100),
-                    "pages_left": pages_left,
-                    "days_left": days_left,
-                    "projected_finish": finish_date.isoformat(),
-                })
-
-    # ── Average rating ────────────────────────────────────────────────────────
-    rated = [ub.rating for ub in finished_ubs if ub.rating]
-    avg_rating = round(sum(rated) / len(rated), 1) if rated else None
+        in_progress = [
+            (ub, book) for ub, book in db.exec(
+                select(UserBook, Book)
+                .join(Book, Book.id == UserBook.book_id)
+                .where(UserBook.user_id == current_user.id, reading)
+            ).all()
+            if book.total_pages and ub.current_page
+        ]
+        days_left, finish = analytics.project_finishes(
+            np.array([ub.current_page for ub, _ in in_progress], dtype=np.int64),
+            np.array([book.total_pages for _, book in in_progress], dtype=np.int64),
+            avg_pages_per_day, today,
+        )
+        for (ub, book), days, finish_date in zip(in_progress, days_left.tolist(), finish.astype(str)):
+            projected.append({
+                "userbook_id": ub.id,
+                "title": book.title,
+                "author": book.author,
+                "cover_url": book.cover_url,
+                "current_page": ub.current_page,
+                "total_pages": book.total_pages,
+                "pct": round(ub.current_page / book.total_pages * 100),
+                "pages_left": book.total_pages - ub.current_page,
+                "days_left": days,
+                "projected_finish": str(finish_date),
+            })
 
     return {
-        "total_books": len(all_ubs),
-        "total_finished": len(finished_ubs),
-        "total_reading": len(reading_ubs),
-        "finished_this_year": len(finished_this_year),
-        "total_pages_read": total_pages,
+        "total_books": total_books,
+        "total_finished": total_finished or 0,
+        "total_reading": total_reading or 0,
+        "finished_this_year": finished_this_year,
+        "total_pages_read": int(total_pages or 0),
         "avg_pages_per_day": avg_pages_per_day,
-        "current_streak": current_streak,
-        "longest_streak": longest_streak,
-        "avg_rating": avg_rating,
+        **reading_bitmap.streaks(db, current_user.id, today),
+        "avg_rating": round(float(avg_rating), 1) if avg_rating is not None else None,
         "yearly_goal": goal_progress,
         "monthly_pages": monthly_list,
         "projected_finishes": projected,
     }
 
 
+@router.get("/trends")
+def get_reading_trends(
+    months: int = 12,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Rolling 7/30/90-day averages, monthly pages for the last N months, pages
+    percentiles on active days and streaks — computed with NumPy (app/analytics.py).
+    """
+    return analytics.user_trends(db, current_user.id, months=max(1, min(months, 60)))
+
+
+@router.get("/heatmap")
+def get_reading_heatmap(
+    year: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Year-in-reading heatmap for the current user: pages read on every day of
+    the year, plus active-day count and streaks. Served from the per-year
+    reading_day_bitmap rows (app/reading_bitmap.py), not ReadingActivity.
+    """
+    today = datetime.utcnow().date()
+    year = year or today.year
+    if not 1970 <= year <= today.year:
+        raise HTTPException(status_code=400, detail="Invalid year")
+    return {
+        **reading_bitmap.heatmap(db, current_user.id, year),
+        **reading_bitmap.streaks(db, current_user.id, today),
+    }
+
+
 @router.get("/user/{user_id}/daily")
 def get_user_daily_reading_stats(
     user_id: int,
@@ -208,34 +216,4 @@ def get_user_daily_reading_stats(
         if not is_following:
             raise HTTPException(status_code=403, detail="This profile is private")
     
-    # Calculate date range
-    end_date = datetime.utcnow().date()
-    start_date = end_date - timedelta(days=days)
-    
-    # Query reading activity
-    activities = db.exec(
-        select(ReadingActivity)
-        .where(ReadingActivity.user_id == user_id)
-        .where(ReadingActivity.date >= start_date)
-        .order_by(ReadingActivity.date.desc())
-    ).all()
-    
-    # Group by date and sum pages_read
-    daily_stats = {}
-    for activity in activities:
-        date_key = activity.date.date() if isinstance(activity.date, datetime) else activity.date
-        if date_key not in daily_stats:
-            daily_stats[date_key] = 0
-        daily_stats[date_key] += (activity.pages_read or 0)
-    
-    # Fill in missing days with 0
-    result = []
-    current_date = end_date
-    for i in range(days):
-        date_key = current_date - timedelta(days=i)
-        result.append({
-            "date": date_key.isoformat(),
-            "pages_read": daily_stats.get(date_key, 0)
-        })
-    
-    return {"days": days, "data": list(reversed(result))}
+    return _daily_pages(db, user_id, days)
@@ -6,13 +6,14 @@ from ..deps import get_db, get_current_user
 from .. import crud, models
 from typing import List
 from ..models import UserBook, Book, Follow   # adjust import path if different
-from datetime import datetime
+from datetime import datetime, timezone
 from pydantic import BaseModel
-from app.models import UserBookProgress
+from app.models import ProgressBatch, UserBookProgress
 from app.database import get_db
 from sqlalchemy.orm import Session
 from ..notifications.dispatcher import fire_event, get_follower_ids
 from ..group_activity import fire_group_activity_for_user
+from .. import progress_hooks
 from .googlebooks_router import normalize_google_cover_url
 
 
@@ -23,14 +24,47 @@ class UpdatePagePayload(BaseModel):
     current_page: int
 
 
+MILESTONES = [25, 50, 75]
+
+
+def _apply_status(userbook: UserBook, total_pages: Optional[int]) -> bool:
+    """
+    Derive status from userbook.current_page (clamped to total_pages).
+    Returns True if this is a transition to 'finished'.
+    """
+    if userbook.current_page <= 0:
+        userbook.status = "to-read"
+        return False
+    if total_pages and userbook.current_page >= total_pages:
+        userbook.current_page = total_pages
+        # Only fire event if this is a status transition to 'finished'
+        completed = userbook.status != "finished"
+        userbook.status = "finished"
+        return completed
+    # Below total_pages, or no total_pages but user started reading
+    userbook.status = "reading"
+    return False
+
+
+def _crossed_milestone(old_page: int, new_page: int, total_pages: int) -> Optional[int]:
+    """The first 25/50/75% milestone crossed between two pages, if any (one event per update)."""
+    old_pct = int((old_page / total_pages) * 100)
+    new_pct = int((new_page / total_pages) * 100)
+    for m in MILESTONES:
+        if old_pct < m <= new_pct:
+            return m
+    return None
+
+
 @router.put("/{userbook_id}/progress")
 def update_progress(userbook_id: int, data: UserBookProgress, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
     userbook = db.get(UserBook, userbook_id)
     if not userbook or userbook.user_id != current_user.id:
         raise HTTPException(status_code=404, detail="UserBook not found")
 
-    # Track previous page for activity logging
+    # Track previous page / status for activity logging
     old_page = userbook.current_page or 0
+    old_status = userbook.status
     new_page = data.current_page or 0
 
     # ✅ Update the current page
@@ -41,66 +75,46 @@ def update_progress(userbook_id: int, data: UserBookProgress, db: Session = Depe
     total_pages = book.total_pages if book and book.total_pages else None
 
     # ✅ Auto-update status based on current progress
-    _fire_completed = False
-    if userbook.current_page <= 0:
-        userbook.status = "to-read"
-
-    elif total_pages:
-        if userbook.current_page >= total_pages:
-            userbook.current_page = total_pages
-            # Only fire event if this is a status transition to 'finished'
-            if userbook.status != "finished":
-                _fire_completed = True
-            userbook.status = "finished"
-        else:
-            userbook.status = "reading"
-            _fire_completed = False
-
-    else:
-        # If we don't have total_pages but user started reading
-        userbook.status = "reading"
-        _fire_completed = False
+    _fire_completed = _apply_status(userbook, total_pages)
 
     # ✅ Always update timestamp
     userbook.updated_at = datetime.utcnow()
 
     # ✅ Log reading activity if pages increased
     if new_page > old_page:
-        from ..models import ReadingActivity
-        pages_read = new_page - old_page
-        today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-        
-        # Check if activity for today already exists
-        existing_activity = db.exec(
-            select(models.ReadingActivity)
-            .where(models.ReadingActivity.user_id == userbook.user_id)
-            .where(models.ReadingActivity.userbook_id == userbook_id)
-            .where(models.ReadingActivity.date >= today)
-        ).first()
-        
-        if existing_activity:
-            # Update existing activity
-            existing_activity.pages_read = (existing_activity.pages_read or 0) + pages_read
-            existing_activity.current_page = new_page
-            db.add(existing_activity)
-        else:
-            # Create new activity entry
-            activity = models.ReadingActivity(
-                user_id=userbook.user_id,
-                userbook_id=userbook_id,
-                date=today,
-                pages_read=pages_read,
-                current_page=new_page,
+        crud.log_pages_read(
+            db, user_id=userbook.user_id, userbook_id=userbook_id, day=datetime.utcnow().date(),
+            pages_read=new_page - old_page, current_page=new_page,
+        )
+
+    # Group feed events and leaderboard stats ride in the same transaction as the progress update
+    if new_page > old_page:
+        progress_hooks.on_pages_read(db, userbook.user_id, new_page - old_page)
+    progress_hooks.on_status_change(db, userbook.user_id, old_status, userbook.status)
+
+    book_title = book.title if book else "a book"
+    if _fire_completed:
+        fire_group_activity_for_user(
+            db, userbook.user_id, "book_finished",
+            {"book_title": book_title, "book_id": userbook.book_id},
+            commit=False,
+        )
+    elif total_pages and new_page > old_page:
+        m = _crossed_milestone(old_page, new_page, total_pages)
+        if m:
+            fire_group_activity_for_user(
+                db, userbook.user_id, "milestone_reached",
+                {"book_title": book_title, "book_id": userbook.book_id,
+                 "pct": m, "current_page": new_page, "total_pages": total_pages},
+                commit=False,
             )
-            db.add(activity)
 
     db.add(userbook)
     db.commit()
     db.refresh(userbook)
 
-    # Fire book_completed / milestone events
+    # Fire book_completed event
     if _fire_completed:
-        book_title = book.title if book else "a book"
         actor = db.get(models.User, userbook.user_id)
         if actor:
             follower_ids = get_follower_ids(db, userbook.user_id)
@@ -112,26 +126,139 @@ def update_progress(userbook_id: int, data: UserBookProgress, db: Session = Depe
                 recipient_ids=follower_ids,
                 extra={"book_title": book_title},
             )
-        fire_group_activity_for_user(
-            db, userbook.user_id, "book_finished",
-            {"book_title": book_title, "book_id": userbook.book_id},
-        )
-    elif total_pages and new_page > old_page:
-        # Check if user crossed a 25/50/75% milestone
+
+    return userbook
+
+MAX_BATCH_UPDATES = 500
+
+
+@router.post("/progress/batch")
+def update_progress_batch(data: ProgressBatch, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+    """
+    Replay progress updates queued by an offline client.
+
+    Updates are collapsed per userbook and day (the last page recorded that day
+    wins) and applied in one transaction: one ReadingActivity row per book and
+    day, dated the day the client recorded it. Each book gets at most one
+    book_finished / milestone_reached group event and one book_completed
+    notification, however many updates it had. Updates for userbooks that no
+    longer exist (or are not the caller's) are skipped, not rejected.
+
+    A replay only moves a book forward: updates recorded before the userbook's
+    last server-side change are ignored, the page never goes down and a
+    finished book stays finished. Userbooks left with nothing newer to apply
+    are listed in "skipped" as well.
+    """
+    if len(data.updates) > MAX_BATCH_UPDATES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_UPDATES} updates per batch")
+
+    now = datetime.utcnow()
+    ids = {u.userbook_id for u in data.updates}
+    userbooks = {
+        ub.id: ub for ub in db.exec(
+            select(UserBook).where(UserBook.id.in_(ids), UserBook.user_id == current_user.id)
+        ).all()
+    } if ids else {}
+    skipped = sorted(ids - userbooks.keys())
+
+    # Last page per (userbook, day); a clock ahead of the server counts as now
+    last: dict[tuple[int, datetime], tuple[datetime, int]] = {}
+    for u in data.updates:
+        ub = userbooks.get(u.userbook_id)
+        if ub is None:
+            continue
+        at = u.recorded_at
+        if at.tzinfo:
+            at = at.astimezone(timezone.utc).replace(tzinfo=None)
+        at = min(at, now)
+        if ub.updated_at and at <= ub.updated_at:
+            continue    # the server already has newer progress for this book
+        key = (u.userbook_id, at.replace(hour=0, minute=0, second=0, microsecond=0))
+        if key not in last or at >= last[key][0]:
+            last[key] = (at, max(u.current_page or 0, 0))
+    if not last:
+        return {"applied": [], "skipped": sorted(ids)}
+
+    book_ids = {ub.book_id for ub in userbooks.values() if ub.book_id}
+    books = {b.id: b for b in db.exec(select(Book).where(Book.id.in_(book_ids))).all()} if book_ids else {}
+
+    pages_by_day: dict[datetime, int] = {}
+    completed, applied = [], []
+    for ub_id, ub in userbooks.items():
+        days = sorted(day for (uid, day) in last if uid == ub_id)
+        if not days:
+            skipped.append(ub_id)
+            continue
+        old_page = ub.current_page or 0
+        old_status = ub.status
+        book = books.get(ub.book_id)
+        total_pages = book.total_pages if book and book.total_pages else None
+
+        page = old_page
+        for day in days:
+            new_page = last[(ub_id, day)][1]
+            if new_page > page:
+                pages_read = new_page - page
+                pages_by_day[day] = pages_by_day.get(day, 0) + pages_read
+                crud.log_pages_read(
+                    db, user_id=ub.user_id, userbook_id=ub_id, day=day.date(),
+                    pages_read=pages_read, current_page=new_page,
+                )
+                page = new_page
+        if page == old_page:
+            skipped.append(ub_id)
+            continue
+
+        ub.current_page = page
+        if old_status == "finished":
+            # Replays never un-finish a book
+            ub.current_page = min(page, total_pages) if total_pages else page
+            fire_completed = False
+        else:
+            fire_completed = _apply_status(ub, total_pages)
+        ub.updated_at = now
+        db.add(ub)
+        applied.append(ub)
+
+        progress_hooks.on_status_change(db, ub.user_id, old_status, ub.status, now)
+
         book_title = book.title if book else "a book"
-        MILESTONES = [25, 50, 75]
-        old_pct = int((old_page / total_pages) * 100)
-        new_pct = int((new_page / total_pages) * 100)
-        for m in MILESTONES:
-            if old_pct < m <= new_pct:
+        if fire_completed:
+            completed.append(book_title)
+            fire_group_activity_for_user(
+                db, ub.user_id, "book_finished",
+                {"book_title": book_title, "book_id": ub.book_id},
+                commit=False,
+            )
+        elif total_pages and page > old_page:
+            m = _crossed_milestone(old_page, page, total_pages)
+            if m:
                 fire_group_activity_for_user(
-                    db, userbook.user_id, "milestone_reached",
-                    {"book_title": book_title, "book_id": userbook.book_id,
-                     "pct": m, "current_page": new_page, "total_pages": total_pages},
+                    db, ub.user_id, "milestone_reached",
+                    {"book_title": book_title, "book_id": ub.book_id,
+                     "pct": m, "current_page": page, "total_pages": total_pages},
+                    commit=False,
                 )
-                break  # only fire the highest crossed milestone
 
-    return userbook
+    progress_hooks.on_pages_read(db, current_user.id, pages_by_day, now)
+
+    db.commit()
+    for ub in applied:
+        db.refresh(ub)
+
+    if completed:
+        follower_ids = get_follower_ids(db, current_user.id)
+        for book_title in completed:
+            fire_event(
+                db=db,
+                event_type="book_completed",
+                actor_id=current_user.id,
+                actor_name=current_user.name or current_user.username or "Someone",
+                recipient_ids=follower_ids,
+                extra={"book_title": book_title},
+            )
+
+    return {"applied": applied, "skipped": sorted(skipped)}
 
 @router.post("/{userbook_id}/finish", status_code=200)
 def mark_userbook_finished(userbook_id: int, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
@@ -153,16 +280,23 @@ def mark_userbook_finished(userbook_id: int, db: Session = Depends(get_db), curr
         ub.current_page = total_pages
     # otherwise leave current_page as-is (or optionally set to 0 or keep current)
 
+    old_status = ub.status
     ub.status = "finished"
     ub.updated_at = datetime.utcnow()
 
+    progress_hooks.on_status_change(db, ub.user_id, old_status, ub.status)
+    book_title = book.title if book else "a book"
+    fire_group_activity_for_user(
+        db, ub.user_id, "book_finished",
+        {"book_title": book_title, "book_id": ub.book_id},
+        commit=False,
+    )
+
     db.add(ub)
     db.commit()
     db.refresh(ub)
 
     # Notify followers that this user finished a book
-    book = db.get(Book, ub.book_id) if ub.book_id else None
-    book_title = book.title if book else "a book"
     actor = db.get(models.User, ub.user_id)
     if actor:
         follower_ids = get_follower_ids(db, ub.user_id)
@@ -174,10 +308,6 @@ def mark_userbook_finished(userbook_id: int, db: Session = Depends(get_db), curr
             recipient_ids=follower_ids,
             extra={"book_title": book_title},
         )
-    fire_group_activity_for_user(
-        db, ub.user_id, "book_finished",
-        {"book_title": book_title, "book_id": ub.book_id},
-    )
 
     return {"ok": True, "userbook": ub}
 
@@ -238,6 +368,8 @@ def add_userbook(payload: dict, db: Session = Depends(get_db), current_user: mod
         borrowed_from=borrowed_from,
         loaned_to=loaned_to
     )
+    progress_hooks.on_status_change(db, current_user.id, None, ub.status)
+    db.commit()
 
     # Notify followers that this user added a book
     follower_ids = get_follower_ids(db, current_user.id)
@@ -316,6 +448,9 @@ def patch_userbook(userbook_id: int, payload: dict, db: Session = Depends(get_db
 
     old_status = ub.status
     ub = crud.update_userbook(db, ub, **update_fields)
+    if ub.status != old_status:
+        progress_hooks.on_status_change(db, current_user.id, old_status, ub.status)
+        db.commit()
 
     new_status = update_fields.get("status")
     book = db.get(Book, ub.book_id) if ub.book_id else None
@@ -357,7 +492,9 @@ def delete_userbook(userbook_id: int, db: Session = Depends(get_db), current_use
         raise HTTPException(status_code=404, detail="UserBook not found")
     
     # Delete the userbook (cascading deletes should handle notes if configured)
+    old_status = ub.status
     db.delete(ub)
+    progress_hooks.on_status_change(db, current_user.id, old_status, None)
     db.commit()
     
     return {"status": "ok", "message": "Book removed from library successfully"}
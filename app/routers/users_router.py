@@ -4,10 +4,9 @@ from sqlmodel import select, func, or_, and_
 from sqlmodel import Session
 from typing import List, Optional
 from pydantic import BaseModel
-from datetime import datetime, timedelta
 from ..database import get_session
 from ..deps import get_current_user
-from .. import models
+from .. import analytics, models
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -196,49 +195,15 @@ def get_user_stats(
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    # Get all user's books
-    all_books = db.exec(
-        select(models.UserBook)
-        .where(models.UserBook.user_id == user_id)
-    ).all()
-    
-    # Count by status
-    total_books = len(all_books)
-    finished = len([b for b in all_books if b.status == "finished"])
-    reading = len([b for b in all_books if b.status == "reading"])
-    to_read = len([b for b in all_books if b.status == "to-read"])
-    
-    # Calculate date ranges
-    now = datetime.utcnow()
-    one_month_ago = now - timedelta(days=30)
-    year_start = datetime(now.year, 1, 1)
-    
-    # Count books finished last month
-    last_month = len([
-        b for b in all_books 
-        if b.status == "finished" and b.updated_at and b.updated_at >= one_month_ago
-    ])
-    
-    # Count books finished this year
-    this_year = len([
-        b for b in all_books 
-        if b.status == "finished" and b.updated_at and b.updated_at >= year_start
-    ])
-    
-    # Calculate total pages read (finished books + current progress)
-    total_pages = 0
-    for userbook in all_books:
-        if userbook.status == "finished" and userbook.book:
-            total_pages += userbook.book.total_pages or 0
-        elif userbook.status == "reading" and userbook.current_page:
-            total_pages += userbook.current_page or 0
-    
+    # Counts over the whole library in one query (app/analytics.py)
+    stats = analytics.library_stats(db, user_id)
+
     return UserStats(
-        total_books=total_books,
-        finished=finished,
-        reading=reading,
-        to_read=to_read,
-        last_month=last_month,
-        this_year=this_year,
-        total_pages=total_pages
+        total_books=stats["total_books"],
+        finished=stats["finished"],
+        reading=stats["reading"],
+        to_read=stats["to_read"],
+        last_month=stats["finished_last_30_days"],
+        this_year=stats["finished_this_year"],
+        total_pages=stats["pages_read_paged"],
     )
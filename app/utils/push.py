@@ -96,7 +96,7 @@ def send_push_notification(
 def send_push_to_many(tokens: list[str], title: str, body: str, data: Optional[dict] = None) -> None:
     """
     Send same notification to multiple tokens in one batched request (up to 100 per Expo spec).
-    Used for admin broadcasts.
+    Admin broadcasts no longer use this — see app/notifications/broadcast.py.
     """
     valid_tokens = [t for t in tokens if t and t.startswith(("ExponentPushToken", "ExpoPushToken"))]
     if not valid_tokens:
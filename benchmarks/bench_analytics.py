@@ -0,0 +1,122 @@
+"""
+Benchmark: vectorized analytics (app/analytics.py) vs the per-row Python loops
+=============================================================================
+Builds a synthetic 5-year reading history (several ReadingActivity rows on
+most days) and times, on the same rows:
+
+  loops      the per-row code the insights / leaderboard endpoints used:
+             dict monthly buckets, 30-day sum, per-book projection loop,
+             sorted-list percentiles (streaks now come from the
+             reading-day bitmaps, app/reading_bitmap.py)
+  numpy      the same numbers from app.analytics
+
+The NumPy side is timed twice: on an already loaded ActivitySeries, and
+including ActivitySeries.from_pairs over the per-day rows the loader's
+GROUP BY returns. Results are checked to be identical before timing.
+
+Run from project root:
+    python benchmarks/bench_analytics.py [--years 5] [--repeat 20]
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+from datetime import date, datetime, timedelta
+
+# Ensure we can import from project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from app import analytics
+
+
+TODAY = date(2026, 6, 15)
+
+
+def synthetic_history(years: int, seed: int = 7) -> list[tuple[datetime, int]]:
+    """(date, pages_read) rows: ~75% of days active, 1-3 books per active day."""
+    rng = random.Random(seed)
+    rows = []
+    day = TODAY - timedelta(days=365 * years)
+    while day <= TODAY:
+        if rng.random() < 0.75:
+            for _ in range(rng.randint(1, 3)):
+                rows.append((datetime(day.year, day.month, day.day, rng.randint(6, 23)), rng.randint(1, 60)))
+        day += timedelta(days=1)
+    return rows
+
+
+def synthetic_books(n: int, seed: int = 11) -> list[tuple[int, int]]:
+    rng = random.Random(seed)
+    return [(rng.randint(1, 300), rng.randint(301, 900)) for _ in range(n)]
+
+
+# ── The per-row loops ─────────────────────────────────────────────────────────
+
+def loops(rows, books, today=TODAY):
+    monthly = {}
+    for d, p in rows:
+        key = f"{d.year}-{d.month:02d}"
+        monthly[key] = monthly.get(key, 0) + p
+    first = TODAY.year * 12 + TODAY.month - 12
+    months = {f"{i // 12}-{i % 12 + 1:02d}": monthly.get(f"{i // 12}-{i % 12 + 1:02d}", 0)
+              for i in range(first, first + 12)}
+
+    thirty_ago = today - timedelta(days=30)
+    avg = round(sum(p for d, p in rows if d.date() >= thirty_ago) / 30, 1)
+
+    days_left = [max(1, round((total - cur) / avg)) for cur, total in books] if avg > 0 else []
+
+    per_day = {}
+    for d, p in rows:
+        per_day[d.date()] = per_day.get(d.date(), 0) + p
+    values = sorted(per_day.values())
+    median = (values[len(values) // 2] + values[(len(values) - 1) // 2]) / 2
+
+    return months, avg, days_left, median
+
+
+# ── The vectorized path ───────────────────────────────────────────────────────
+
+def vectorized(series, books, today=TODAY):
+    months = analytics.monthly_totals(series, today, 12)
+    avg = analytics.avg_pages_per_day(series, today, 30)
+    arr = np.array(books, dtype=np.int64)
+    days_left, _ = analytics.project_finishes(arr[:, 0], arr[:, 1], avg, today)
+    median = float(np.median(series.pages))
+    return months, avg, days_left.tolist(), median
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rows = synthetic_history(args.years)
+    books = synthetic_books(50)
+    per_day = {}
+    for d, p in rows:
+        per_day[d.date()] = per_day.get(d.date(), 0) + p
+    day_rows = sorted(per_day.items())          # what load_user_activity's GROUP BY returns
+    series = analytics.ActivitySeries.from_pairs(day_rows)
+    print(f"Synthetic history: {len(rows)} activity rows / {len(day_rows)} days "
+          f"over {args.years} years, {len(books)} books\n")
+
+    # np.rint rounds half to even like round(); same numbers either way
+    assert loops(rows, books) == vectorized(series, books), "results differ"
+
+    cases = (
+        ("loops", lambda: loops(rows, books)),
+        ("numpy", lambda: vectorized(series, books)),
+        ("numpy + load", lambda: vectorized(analytics.ActivitySeries.from_pairs(day_rows), books)),
+    )
+    for name, fn in cases:
+        best = min(timeit.repeat(fn, number=1, repeat=args.repeat))
+        print(f"  {name:<13} {best * 1000:8.2f} ms  (best of {args.repeat})")
+
+
+if __name__ == "__main__":
+    main()
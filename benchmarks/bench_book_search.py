@@ -0,0 +1,124 @@
+"""
+Benchmark: indexed catalog search (app/book_search.py) vs the old ILIKE scan
+============================================================================
+Builds a synthetic catalog in a temporary SQLite file (titles and authors
+drawn from word lists, ISBN-13s), creates the FTS5 index, then times the same
+queries both ways:
+
+  ilike     title ILIKE '%q%' OR author ILIKE '%q%' ORDER BY title (the old /books/search)
+  indexed   book_search.search() — FTS5 prefix match ranked by bm25
+  authors   old author-affinity ILIKE vs book_search.by_authors()
+
+Prints mean / p50 / p95 per query. Building 1M books takes a minute or two;
+use --books for a quicker run. Postgres is not covered here — run EXPLAIN
+ANALYZE there against ix_book_search_vector / ix_book_title_trgm.
+
+Run from project root:
+    python benchmarks/bench_book_search.py [--books 1000000] [--repeat 20]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+# Ensure we can import from project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import or_
+from sqlmodel import Session, create_engine, select
+
+from app import book_search
+from app.models import Book
+
+
+WORDS = (
+    "shadow night river empire silent garden winter storm crown glass iron city "
+    "forgotten last secret house ocean fire star dream wolf memory bridge stone "
+    "hidden lost golden broken song light dark war peace journey kingdom"
+).split()
+FIRST = "anna james maria john elena david sofia peter lucia mark nora paul ines omar".split()
+LAST = "smith garcia tanaka novak rossi kowalski murphy silva chen larsen okafor haddad".split()
+
+QUERIES = ["dune", "shadow riv", "forgotten kingdom", "zzz", "anna tanaka", "9781234567897"]
+AUTHORS = ["Anna Tanaka", "Omar Haddad", "Frank Herbert"]
+
+
+def build(path: str, n: int):
+    engine = create_engine(f"sqlite:///{path}")
+    Book.__table__.create(engine)
+    rng = random.Random(42)
+    start = time.perf_counter()
+    with engine.begin() as conn:
+        batch = []
+        for i in range(n):
+            batch.append({
+                "title": " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 5))).title(),
+                "author": f"{rng.choice(FIRST).title()} {rng.choice(LAST).title()}",
+                "isbn": f"978{i:010d}",
+            })
+            if len(batch) == 10_000:
+                conn.execute(Book.__table__.insert(), batch)
+                batch = []
+        conn.execute(Book.__table__.insert(), batch + [
+            {"title": "Dune", "author": "Frank Herbert", "isbn": "9781234567897"},
+        ])
+    print(f"  inserted {n:,} books in {time.perf_counter() - start:.1f} s")
+    start = time.perf_counter()
+    book_search.create_index(engine)
+    print(f"  built FTS5 index in {time.perf_counter() - start:.1f} s\n")
+    return engine
+
+
+def ilike(db: Session, q: str, limit: int = 20):
+    return db.exec(
+        select(Book).where(or_(Book.title.ilike(f"%{q}%"), Book.author.ilike(f"%{q}%")))
+        .order_by(Book.title).limit(limit)
+    ).all()
+
+
+def ilike_authors(db: Session, authors: list[str], limit: int = 40):
+    return db.exec(
+        select(Book).where(or_(*[Book.author.ilike(f"%{a}%") for a in authors])).limit(limit)
+    ).all()
+
+
+def timed(fn, repeat: int) -> list[float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def summary(samples: list[float]) -> str:
+    p95 = statistics.quantiles(samples, n=20)[-1] if len(samples) > 1 else samples[0]
+    return f"mean {statistics.mean(samples):8.2f}  p50 {statistics.median(samples):8.2f}  p95 {p95:8.2f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--books", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"Catalog: {args.books:,} synthetic books\n")
+        engine = build(os.path.join(tmp, "catalog.db"), args.books)
+        with Session(engine) as db:
+            for q in QUERIES:
+                hits = len(book_search.search(db, q))
+                print(f"  {q!r}  ({hits} results)")
+                print(f"    ilike    {summary(timed(lambda: ilike(db, q), args.repeat))}")
+                print(f"    indexed  {summary(timed(lambda: book_search.search(db, q), args.repeat))}")
+            print(f"  authors {AUTHORS}")
+            print(f"    ilike    {summary(timed(lambda: ilike_authors(db, AUTHORS), args.repeat))}")
+            print(f"    indexed  {summary(timed(lambda: book_search.by_authors(db, AUTHORS), args.repeat))}")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
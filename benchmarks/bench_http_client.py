@@ -0,0 +1,115 @@
+"""
+Benchmark: shared pooled AsyncClient (app/http_client.py) vs a client per request
+================================================================================
+Starts a local HTTP/1.1 keep-alive stub server that answers like the Google
+Books volumes endpoint, then times the same GETs two ways:
+
+  per-request   `async with httpx.AsyncClient()` around every call (the old proxy)
+  shared        http_client.get_client(), connections reused from the pool
+
+Each mode runs the requests sequentially and then in concurrent waves, and
+prints mean / p50 / p95 latency per request. The stub is plain HTTP on
+localhost, so the gap shown is connection setup alone — against Google the
+saved TLS handshake and round trips make it larger.
+
+Run from project root:
+    python benchmarks/bench_http_client.py [--requests 300] [--concurrency 20]
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Ensure we can import from project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+from app import http_client
+
+
+BODY = json.dumps({"totalItems": 1, "items": [{"id": "stub", "volumeInfo": {"title": "Dune"}}]}).encode()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"       # keep-alive
+    disable_nagle_algorithm = True      # headers and body go out as separate writes
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_stub() -> tuple[ThreadingHTTPServer, str]:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/books/v1/volumes"
+
+
+async def per_request(url: str) -> None:
+    async with httpx.AsyncClient() as client:
+        (await client.get(url, params={"q": "dune"}, timeout=10.0)).raise_for_status()
+
+
+async def shared(url: str) -> None:
+    (await http_client.get_client().get(url, params={"q": "dune"}, timeout=http_client.timeout(10.0))).raise_for_status()
+
+
+async def timed(call, url: str) -> float:
+    start = time.perf_counter()
+    await call(url)
+    return (time.perf_counter() - start) * 1000
+
+
+async def run_mode(call, url: str, n: int, concurrency: int) -> dict[str, list[float]]:
+    await call(url)     # warm-up (imports, first connection)
+    sequential = [await timed(call, url) for _ in range(n)]
+    concurrent = []
+    for _ in range(max(1, n // concurrency)):
+        concurrent += await asyncio.gather(*(timed(call, url) for _ in range(concurrency)))
+    return {"sequential": sequential, "concurrent": concurrent}
+
+
+def summary(samples: list[float]) -> str:
+    p95 = statistics.quantiles(samples, n=20)[-1]
+    return f"mean {statistics.mean(samples):6.2f}  p50 {statistics.median(samples):6.2f}  p95 {p95:6.2f} ms"
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    server, url = start_stub()
+    print(f"Stub server: {url}  ({args.requests} requests, waves of {args.concurrency}, http2={http_client.HTTP2})\n")
+    try:
+        await http_client.start()
+        results = {
+            "per-request": await run_mode(per_request, url, args.requests, args.concurrency),
+            "shared": await run_mode(shared, url, args.requests, args.concurrency),
+        }
+    finally:
+        await http_client.close()
+        server.shutdown()
+
+    for phase in ("sequential", "concurrent"):
+        print(f"  {phase}")
+        for mode, samples in results.items():
+            print(f"    {mode:<12} {summary(samples[phase])}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -22,6 +22,7 @@ Environment variables required:
 import os
 import sys
 import requests
+from requests.adapters import HTTPAdapter
 import random
 import google.generativeai as genai
 from sqlalchemy import create_engine, text
@@ -47,12 +48,18 @@ NYT_LISTS = [
     "combined-print-and-e-book-fiction",
 ]
 
+# One pooled session for the run: the NYT, Open Library and Google Books calls
+# reuse keep-alive connections instead of a new TCP + TLS handshake each.
+http = requests.Session()
+http.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
+http.headers["User-Agent"] = "TrackMyRead-EditorialBot/1.0"
+
 # ── Helpers ───────────────────────────────────────────────────────────────────
 
 def get_nyt_books(list_name: str) -> list:
     """Fetch current bestsellers from a NYT list."""
     url = f"https://api.nytimes.com/svc/books/v3/lists/current/{list_name}.json"
-    resp = requests.get(url, params={"api-key": NYT_API_KEY}, timeout=10)
+    resp = http.get(url, params={"api-key": NYT_API_KEY}, timeout=10)
     resp.raise_for_status()
     data = resp.json()
     return data.get("results", {}).get("books", [])
@@ -72,7 +79,7 @@ def get_book_cover(book: dict) -> str | None:
     if isbn:
         cover_url = f"https://covers.openlibrary.org/b/isbn/{isbn}-L.jpg"
         try:
-            resp = requests.head(cover_url, timeout=5, allow_redirects=True)
+            resp = http.head(cover_url, timeout=5, allow_redirects=True)
             # Open Library returns 200 if cover exists.
             # If it redirects to a URL containing '-1-' or 'default', it's a placeholder.
             final_url = str(resp.url)
@@ -85,7 +92,7 @@ def get_book_cover(book: dict) -> str | None:
     # Priority 2: Google Books (larger zoom level)
     if isbn:
         try:
-            resp = requests.get(
+            resp = http.get(
                 "https://www.googleapis.com/books/v1/volumes",
                 params={"q": f"isbn:{isbn}", "maxResults": 1},
                 timeout=5
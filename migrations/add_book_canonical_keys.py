@@ -0,0 +1,56 @@
+"""
+Migration: canonical book keys (ISBN-13 / Google Books id) and catalog dedupe
+============================================================================
+Changes:
+  1. book.isbn13 VARCHAR(13) — book.isbn normalized to ISBN-13, backfilled
+  2. book.google_books_id — '' replaced by NULL
+  3. Duplicate books (same ISBN-13 or Google id) merged into the lowest id:
+     UserBook rows and every other reference to the book repointed, a user's
+     second copy of a book folded into the first, its notes / journal / posts /
+     activity moved along (see app/book_resolver.py)
+  4. uq_book_isbn13, uq_book_google_books_id — unique indexes resolve() relies on
+
+Run from project root:
+    python migrations/add_book_canonical_keys.py
+
+Safe to run multiple times. Step 3 alone: python -m app.book_resolver --merge [--dry-run]
+"""
+import os
+import sys
+
+# Ensure we can import from project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import inspect, text
+from sqlmodel import Session
+from app.database import engine
+from app import book_resolver
+
+
+def run():
+    columns = {c["name"] for c in inspect(engine).get_columns("book")}
+    if "isbn13" in columns:
+        print("  [SKIP] book.isbn13 already exists")
+    else:
+        with engine.begin() as conn:
+            conn.execute(text("ALTER TABLE book ADD COLUMN isbn13 VARCHAR(13)"))
+        print("  [OK] book.isbn13 added")
+
+    with Session(engine) as db:
+        print(f"  [OK] keys backfilled on {book_resolver.backfill_keys(db)} row(s)")
+
+        print("  Merging duplicate books ...")
+        print(f"  [OK] {book_resolver.merge_duplicates(db)}")
+
+    print("  Creating unique indexes ...")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE UNIQUE INDEX IF NOT EXISTS uq_book_isbn13 ON book(isbn13)"))
+        conn.execute(text("CREATE UNIQUE INDEX IF NOT EXISTS uq_book_google_books_id ON book(google_books_id)"))
+    print("  [OK] uq_book_isbn13, uq_book_google_books_id")
+
+    print("\n[DONE] Migration complete.")
+
+
+if __name__ == "__main__":
+    print("Running migration: add_book_canonical_keys\n")
+    run()
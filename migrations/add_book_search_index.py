@@ -0,0 +1,47 @@
+"""
+Migration: Book catalog search index
+====================================
+Changes:
+  SQLite:
+    1. book_fts — external-content FTS5 table over book(title, author, isbn)
+    2. book_fts_ai / _ad / _au triggers keeping it in step with book
+    3. ix_book_isbn
+    4. Rebuild of book_fts from the existing rows
+  Postgres:
+    1. pg_trgm extension
+    2. ix_book_search_vector — GIN on the 'simple' tsvector of title + author
+    3. ix_book_title_trgm / ix_book_author_trgm — trigram GIN indexes
+    4. ix_book_isbn
+
+Until this runs /books/search falls back to the old ILIKE scan on SQLite
+(Postgres works, unindexed). See app/book_search.py.
+
+Run from project root:
+    python migrations/add_book_search_index.py
+
+Safe to run multiple times (IF NOT EXISTS everywhere; the FTS rebuild is idempotent).
+"""
+import os
+import sys
+
+# Ensure we can import from project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import engine
+from app import book_search
+
+
+def run():
+    print(f"  Creating search index ({engine.dialect.name}) ...")
+    statements = book_search.create_index(engine)
+    if not statements:
+        print(f"  [SKIP] No search index for dialect {engine.dialect.name}; ILIKE scan stays in use")
+    for stmt in statements:
+        print(f"  [OK] {' '.join(stmt.split())[:90]}")
+
+    print("\n[DONE] Migration complete.")
+
+
+if __name__ == "__main__":
+    print("Running migration: add_book_search_index\n")
+    run()
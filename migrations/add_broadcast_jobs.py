@@ -0,0 +1,37 @@
+"""
+Migration: Background admin broadcasts
+======================================
+Changes:
+  1. broadcastjob — new table tracking each admin push broadcast
+     (status, counters, last_token_id resume cursor)
+
+Run from project root:
+    python migrations/add_broadcast_jobs.py
+
+Safe to run multiple times (create is skipped when the table exists).
+"""
+import os
+import sys
+
+# Ensure we can import from project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import inspect
+from app.database import engine
+from app.models import BroadcastJob
+
+
+def run():
+    if inspect(engine).has_table("broadcastjob"):
+        print("  [SKIP] broadcastjob already exists")
+    else:
+        print("  Creating broadcastjob table ...")
+        BroadcastJob.__table__.create(engine)
+        print("  [OK] broadcastjob table created")
+
+    print("\n[DONE] Migration complete.")
+
+
+if __name__ == "__main__":
+    print("Running migration: add_broadcast_jobs\n")
+    run()
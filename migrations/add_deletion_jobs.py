@@ -0,0 +1,55 @@
+"""
+Migration: Background group / account deletion
+==============================================
+Changes:
+  1. deletion_job — new table tracking each cascading delete
+     (kind, target, status, rows removed per table)
+  2. reading_group.deleted_at — tombstone set when the deletion is requested
+  3. deletion_job.attempts — failed runs, for retry with backoff
+
+Run from project root:
+    python migrations/add_deletion_jobs.py
+
+Safe to run multiple times (create / add column are skipped when present).
+"""
+import os
+import sys
+
+# Ensure we can import from project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import inspect, text
+from app.database import engine
+from app.models import DeletionJob
+
+
+def run():
+    if inspect(engine).has_table("deletion_job"):
+        print("  [SKIP] deletion_job already exists")
+    else:
+        print("  Creating deletion_job table ...")
+        DeletionJob.__table__.create(engine)
+        print("  [OK] deletion_job table created")
+
+    columns = {c["name"] for c in inspect(engine).get_columns("reading_group")}
+    if "deleted_at" in columns:
+        print("  [SKIP] reading_group.deleted_at already exists")
+    else:
+        with engine.begin() as conn:
+            conn.execute(text("ALTER TABLE reading_group ADD COLUMN deleted_at TIMESTAMP"))
+        print("  [OK] reading_group.deleted_at added")
+
+    columns = {c["name"] for c in inspect(engine).get_columns("deletion_job")}
+    if "attempts" in columns:
+        print("  [SKIP] deletion_job.attempts already exists")
+    else:
+        with engine.begin() as conn:
+            conn.execute(text("ALTER TABLE deletion_job ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0"))
+        print("  [OK] deletion_job.attempts added")
+
+    print("\n[DONE] Migration complete.")
+
+
+if __name__ == "__main__":
+    print("Running migration: add_deletion_jobs\n")
+    run()
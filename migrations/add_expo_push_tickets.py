@@ -0,0 +1,37 @@
+"""
+Migration: Expo push receipt polling
+====================================
+Changes:
+  1. expopushticket — new table of accepted Expo ticket ids waiting for
+     their receipt (see app/notifications/receipts.py)
+
+Run from project root:
+    python migrations/add_expo_push_tickets.py
+
+Safe to run multiple times (create is skipped when the table exists).
+"""
+import os
+import sys
+
+# Ensure we can import from project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import inspect
+from app.database import engine
+from app.models import ExpoPushTicket
+
+
+def run():
+    if inspect(engine).has_table("expopushticket"):
+        print("  [SKIP] expopushticket already exists")
+    else:
+        print("  Creating expopushticket table ...")
+        ExpoPushTicket.__table__.create(engine)   # includes its indexes
+        print("  [OK] expopushticket table created")
+
+    print("\n[DONE] Migration complete.")
+
+
+if __name__ == "__main__":
+    print("Running migration: add_expo_push_tickets\n")
+    run()
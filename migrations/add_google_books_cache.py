@@ -0,0 +1,39 @@
+"""
+Migration: Google Books response cache
+======================================
+Changes:
+  1. google_books_cache — new table, the persistent tier of the Google Books
+     proxy cache (see app/google_books_cache.py)
+
+Until this runs the proxy still works, caching in-process only.
+
+Run from project root:
+    python migrations/add_google_books_cache.py
+
+Safe to run multiple times (create is skipped when the table exists).
+"""
+import os
+import sys
+
+# Ensure we can import from project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import inspect
+from app.database import engine
+from app.models import GoogleBooksCache
+
+
+def run():
+    if inspect(engine).has_table("google_books_cache"):
+        print("  [SKIP] google_books_cache already exists")
+    else:
+        print("  Creating google_books_cache table ...")
+        GoogleBooksCache.__table__.create(engine)
+        print("  [OK] google_books_cache table created")
+
+    print("\n[DONE] Migration complete.")
+
+
+if __name__ == "__main__":
+    print("Running migration: add_google_books_cache\n")
+    run()
@@ -0,0 +1,69 @@
+"""
+Migration: Indexed, ranked group discovery
+==========================================
+Changes:
+  1. group_discovery_rank — new table, one row per public group
+     (member count, recent activity count, score), index on (score, group_id)
+  2. Postgres only: pg_trgm extension + GIN trigram indexes on
+     reading_group.name / description so ILIKE '%q%' is index-served
+       ix_reading_group_name_trgm
+       ix_reading_group_description_trgm
+  3. Initial ranking (same as the scheduler's 15-min refresh)
+
+Run from project root:
+    python migrations/add_group_discovery.py
+
+Safe to run multiple times (create steps check first; the ranking is a full rebuild).
+"""
+import os
+import sys
+
+# Ensure we can import from project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import inspect, text
+from sqlmodel import Session
+from app.database import engine
+from app.models import GroupDiscoveryRank
+from app.group_discovery import refresh_discovery_rank
+
+
+def create_trigram_indexes():
+    if engine.dialect.name != "postgresql":
+        print("  [SKIP] trigram indexes — Postgres only (SQLite dev scans)")
+        return
+    with engine.begin() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        print("  [OK] pg_trgm extension")
+        for name, col in (
+            ("ix_reading_group_name_trgm", "name"),
+            ("ix_reading_group_description_trgm", "description"),
+        ):
+            print(f"  Creating {name} ...")
+            conn.execute(text(
+                f"CREATE INDEX IF NOT EXISTS {name} ON reading_group USING gin ({col} gin_trgm_ops)"
+            ))
+            print(f"  [OK] {name}")
+
+
+def run():
+    if inspect(engine).has_table("group_discovery_rank"):
+        print("  [SKIP] group_discovery_rank already exists")
+    else:
+        print("  Creating group_discovery_rank table ...")
+        GroupDiscoveryRank.__table__.create(engine)
+        print("  [OK] group_discovery_rank table created")
+
+    create_trigram_indexes()
+
+    print("  Ranking public groups ...")
+    with Session(engine) as db:
+        written = refresh_discovery_rank(db)
+    print(f"  [OK] {written} group(s) ranked")
+
+    print("\n[DONE] Migration complete.")
+
+
+if __name__ == "__main__":
+    print("Running migration: add_group_discovery\n")
+    run()
@@ -0,0 +1,46 @@
+"""
+Migration: Rolling counters for group reading goals
+===================================================
+Changes:
+  1. group_goal_counter — new table, one row per (group, goal period)
+  2. Seed the current period's counter for every group with a goal
+     (same as `python -m app.group_goals --backfill`)
+
+Run from project root:
+    python migrations/add_group_goal_counters.py
+
+Safe to run multiple times (create is skipped when the table exists; only
+missing counters are seeded).
+"""
+import os
+import sys
+
+# Ensure we can import from project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import inspect
+from sqlmodel import Session
+from app.database import engine
+from app.models import GroupGoalCounter
+from app.group_goals import backfill
+
+
+def run():
+    if inspect(engine).has_table("group_goal_counter"):
+        print("  [SKIP] group_goal_counter already exists")
+    else:
+        print("  Creating group_goal_counter table ...")
+        GroupGoalCounter.__table__.create(engine)
+        print("  [OK] group_goal_counter table created")
+
+    print("  Seeding current-period counters ...")
+    with Session(engine) as db:
+        created = backfill(db)
+    print(f"  [OK] {created} counter(s) seeded")
+
+    print("\n[DONE] Migration complete.")
+
+
+if __name__ == "__main__":
+    print("Running migration: add_group_goal_counters\n")
+    run()
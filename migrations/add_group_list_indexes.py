@@ -0,0 +1,38 @@
+"""
+Migration: Keyset indexes for group posts / members lists
+=========================================================
+Changes:
+  1. group_post   — ix_group_post_feed   (group_id, created_at, id)
+  2. group_member — ix_group_member_list (group_id, status, joined_at, id)
+
+Run from project root:
+    python migrations/add_group_list_indexes.py
+
+Safe to run multiple times (CREATE INDEX IF NOT EXISTS).
+"""
+import os
+import sys
+
+# Ensure we can import from project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.database import engine
+
+
+def run():
+    with engine.begin() as conn:
+        for name, table, cols in (
+            ("ix_group_post_feed", "group_post", "group_id, created_at, id"),
+            ("ix_group_member_list", "group_member", "group_id, status, joined_at, id"),
+        ):
+            print(f"  Creating {name} ...")
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table}({cols})"))
+            print(f"  [OK] {name}")
+
+    print("\n[DONE] Migration complete.")
+
+
+if __name__ == "__main__":
+    print("Running migration: add_group_list_indexes\n")
+    run()
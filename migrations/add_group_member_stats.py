@@ -0,0 +1,46 @@
+"""
+Migration: Incrementally maintained group leaderboard
+=====================================================
+Changes:
+  1. group_member_stats — new table, one row per active (group, member)
+  2. Backfill it from UserBook / ReadingActivity (same as
+     `python -m app.group_stats --rebuild`)
+
+Run from project root:
+    python migrations/add_group_member_stats.py
+
+Safe to run multiple times (create is skipped when the table exists; the
+backfill replaces rows rather than adding to them).
+"""
+import os
+import sys
+
+# Ensure we can import from project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import inspect
+from sqlmodel import Session
+from app.database import engine
+from app.models import GroupMemberStats
+from app.group_stats import rebuild
+
+
+def run():
+    if inspect(engine).has_table("group_member_stats"):
+        print("  [SKIP] group_member_stats already exists")
+    else:
+        print("  Creating group_member_stats table ...")
+        GroupMemberStats.__table__.create(engine)   # includes its indexes
+        print("  [OK] group_member_stats table created")
+
+    print("  Backfilling group_member_stats ...")
+    with Session(engine) as db:
+        written = rebuild(db)
+    print(f"  [OK] {written} row(s) written")
+
+    print("\n[DONE] Migration complete.")
+
+
+if __name__ == "__main__":
+    print("Running migration: add_group_member_stats\n")
+    run()
@@ -0,0 +1,36 @@
+"""
+Migration: NotificationLog retention support
+=============================================
+Changes:
+  1. notificationlog — index on sent_at so the retention job's age scan
+     (and the 30-day /notifications/history window) does not walk the table
+
+Run from project root:
+    python migrations/add_notification_retention.py
+
+Safe to run multiple times (CREATE INDEX IF NOT EXISTS works on SQLite + Postgres).
+"""
+import os
+import sys
+
+# Ensure we can import from project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.database import engine
+
+
+def run():
+    with engine.begin() as conn:
+        print("  Creating ix_notificationlog_sent_at ...")
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_notificationlog_sent_at ON notificationlog(sent_at)"
+        ))
+        print("  [OK] ix_notificationlog_sent_at")
+
+    print("\n[DONE] Migration complete.")
+
+
+if __name__ == "__main__":
+    print("Running migration: add_notification_retention\n")
+    run()
@@ -0,0 +1,77 @@
+"""
+Migration: unique (userbook_id, day) key on reading_activity
+============================================================
+Changes:
+  1. reading_activity.day (DATE) — calendar day of `date`, backfilled
+  2. Duplicate (userbook_id, day) rows — left by concurrent progress updates
+     racing the old SELECT-then-INSERT — merged into the lowest id:
+     pages_read summed, highest current_page kept, the others deleted.
+     Page totals are unchanged, so derived tables need no rebuild.
+  3. uq_reading_activity_userbook_day — unique index the progress upsert
+     (crud.log_pages_read, INSERT ... ON CONFLICT DO UPDATE) relies on
+
+Run from project root:
+    python migrations/add_reading_activity_day_key.py
+
+Safe to run multiple times.
+"""
+import os
+import sys
+
+# Ensure we can import from project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import inspect, text
+from app.database import engine
+
+
+def run():
+    columns = {c["name"] for c in inspect(engine).get_columns("reading_activity")}
+    if "day" in columns:
+        print("  [SKIP] reading_activity.day already exists")
+    else:
+        with engine.begin() as conn:
+            conn.execute(text("ALTER TABLE reading_activity ADD COLUMN day DATE"))
+        print("  [OK] reading_activity.day added")
+
+    with engine.begin() as conn:
+        filled = conn.execute(text(
+            "UPDATE reading_activity SET day = DATE(date) WHERE day IS NULL"
+        )).rowcount
+    print(f"  [OK] day backfilled on {filled} row(s)")
+
+    print("  Merging duplicate (userbook_id, day) rows ...")
+    with engine.begin() as conn:
+        keep = (
+            "SELECT MIN(id) FROM reading_activity WHERE day IS NOT NULL "
+            "GROUP BY userbook_id, day HAVING COUNT(*) > 1"
+        )
+        merged = conn.execute(text(f"""
+            UPDATE reading_activity SET
+                pages_read = (SELECT SUM(COALESCE(d.pages_read, 0)) FROM reading_activity d
+                              WHERE d.userbook_id = reading_activity.userbook_id AND d.day = reading_activity.day),
+                current_page = (SELECT MAX(d.current_page) FROM reading_activity d
+                                WHERE d.userbook_id = reading_activity.userbook_id AND d.day = reading_activity.day)
+            WHERE id IN ({keep})
+        """)).rowcount
+        deleted = conn.execute(text("""
+            DELETE FROM reading_activity
+            WHERE day IS NOT NULL
+              AND id NOT IN (SELECT MIN(id) FROM reading_activity WHERE day IS NOT NULL GROUP BY userbook_id, day)
+        """)).rowcount
+    print(f"  [OK] {merged} day(s) merged, {deleted} duplicate row(s) deleted")
+
+    print("  Creating uq_reading_activity_userbook_day ...")
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_reading_activity_userbook_day "
+            "ON reading_activity(userbook_id, day)"
+        ))
+    print("  [OK] uq_reading_activity_userbook_day")
+
+    print("\n[DONE] Migration complete.")
+
+
+if __name__ == "__main__":
+    print("Running migration: add_reading_activity_day_key\n")
+    run()
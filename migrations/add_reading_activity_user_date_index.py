@@ -0,0 +1,41 @@
+"""
+Migration: (user_id, date) index on reading_activity
+====================================================
+Changes:
+  1. reading_activity — idx_reading_activity_user_date (user_id, date),
+     used by the SQL-grouped /reading-activity daily endpoints. Databases set
+     up through add_reading_activity.py already have it; this creates it for
+     the rest under the same name.
+  2. Drops ix_reading_activity_user_date, an identical index an earlier
+     version of this migration created next to it
+
+Run from project root:
+    python migrations/add_reading_activity_user_date_index.py
+
+Safe to run multiple times (CREATE / DROP INDEX IF [NOT] EXISTS).
+"""
+import os
+import sys
+
+# Ensure we can import from project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.database import engine
+
+
+def run():
+    print("  Creating idx_reading_activity_user_date ...")
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS idx_reading_activity_user_date ON reading_activity(user_id, date)"
+        ))
+        conn.execute(text("DROP INDEX IF EXISTS ix_reading_activity_user_date"))
+    print("  [OK] idx_reading_activity_user_date (duplicate ix_reading_activity_user_date dropped)")
+
+    print("\n[DONE] Migration complete.")
+
+
+if __name__ == "__main__":
+    print("Running migration: add_reading_activity_user_date_index\n")
+    run()
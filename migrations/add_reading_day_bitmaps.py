@@ -0,0 +1,47 @@
+"""
+Migration: Reading-day bitmaps
+==============================
+Changes:
+  1. reading_day_bitmap — new table, one row per (user, year): 366-bit
+     reading-day bitmap + per-day pages
+  2. Build rows for every (user, year) with reading activity
+     (same as `python -m app.reading_bitmap --rebuild`)
+
+Run from project root:
+    python migrations/add_reading_day_bitmaps.py
+
+Safe to run multiple times (create is skipped when the table exists; the
+build step recomputes every row).
+"""
+import os
+import sys
+
+# Ensure we can import from project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import inspect
+from sqlmodel import Session
+from app.database import engine
+from app.models import ReadingDayBitmap
+from app.reading_bitmap import rebuild
+
+
+def run():
+    if inspect(engine).has_table("reading_day_bitmap"):
+        print("  [SKIP] reading_day_bitmap already exists")
+    else:
+        print("  Creating reading_day_bitmap table ...")
+        ReadingDayBitmap.__table__.create(engine)
+        print("  [OK] reading_day_bitmap table created")
+
+    print("  Building bitmaps from reading_activity ...")
+    with Session(engine) as db:
+        written = rebuild(db)
+    print(f"  [OK] {written} row(s) built")
+
+    print("\n[DONE] Migration complete.")
+
+
+if __name__ == "__main__":
+    print("Running migration: add_reading_day_bitmaps\n")
+    run()
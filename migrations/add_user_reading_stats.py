@@ -0,0 +1,52 @@
+"""
+Migration: Precomputed reading insights
+=======================================
+Changes:
+  1. user_reading_stats — new table, one row per user (monthly / daily
+     pages, books finished this year)
+  2. drop current_streak / longest_streak / last_active_day from tables
+     created before streaks moved to the reading-day bitmaps
+
+Rows are seeded lazily on a user's first insights view or progress update;
+to fill them all up front run `python -m app.reading_stats --rebuild`.
+
+Run from project root:
+    python migrations/add_user_reading_stats.py
+
+Safe to run multiple times (create is skipped when the table exists,
+drops when the columns are gone).
+"""
+import os
+import sys
+
+# Ensure we can import from project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import inspect, text
+from app.database import engine
+from app.models import UserReadingStats
+
+
+def run():
+    if inspect(engine).has_table("user_reading_stats"):
+        print("  [SKIP] user_reading_stats already exists")
+    else:
+        print("  Creating user_reading_stats table ...")
+        UserReadingStats.__table__.create(engine)
+        print("  [OK] user_reading_stats table created")
+
+    columns = {c["name"] for c in inspect(engine).get_columns("user_reading_stats")}
+    for column in ("current_streak", "longest_streak", "last_active_day"):
+        if column not in columns:
+            print(f"  [SKIP] user_reading_stats.{column} already dropped")
+            continue
+        with engine.begin() as conn:
+            conn.execute(text(f"ALTER TABLE user_reading_stats DROP COLUMN {column}"))
+        print(f"  [OK] user_reading_stats.{column} dropped")
+
+    print("\n[DONE] Migration complete.")
+
+
+if __name__ == "__main__":
+    print("Running migration: add_user_reading_stats\n")
+    run()
@@ -0,0 +1,99 @@
+"""
+Migration: group_activity feed — JSON payload + keyset indexes
+==============================================================
+Changes:
+  1. group_activity — composite indexes for the paginated feed:
+       ix_group_activity_feed       (group_id, created_at, id)
+       ix_group_activity_feed_type  (group_id, event_type, created_at, id)
+  2. group_activity.payload TEXT → JSONB (Postgres only), converted in
+     batches so the table is never locked for one long rewrite:
+       a. add payload_jsonb JSONB
+       b. UPDATE ... SET payload_jsonb = payload::jsonb, BATCH_SIZE ids at a time
+       c. swap columns in one short transaction
+     SQLite needs no data change: its JSON type is stored as text, and the
+     existing rows already hold json.dumps() output.
+
+Run from project root:
+    python migrations/group_activity_jsonb.py
+
+Safe to run multiple times (each step checks before acting; an interrupted
+batch conversion resumes where it stopped).
+"""
+import os
+import sys
+
+# Ensure we can import from project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import inspect, text
+from app.database import engine
+
+BATCH_SIZE = 5000
+
+
+def column_type(table: str, column: str):
+    for col in inspect(engine).get_columns(table):
+        if col["name"] == column:
+            return str(col["type"]).upper()
+    return None
+
+
+def create_indexes():
+    with engine.begin() as conn:
+        for name, cols in (
+            ("ix_group_activity_feed", "group_id, created_at, id"),
+            ("ix_group_activity_feed_type", "group_id, event_type, created_at, id"),
+        ):
+            print(f"  Creating {name} ...")
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON group_activity({cols})"))
+            print(f"  [OK] {name}")
+
+
+def convert_payload_to_jsonb():
+    if engine.dialect.name != "postgresql":
+        print("  [SKIP] payload conversion — only needed on Postgres")
+        return
+    if column_type("group_activity", "payload") == "JSONB":
+        print("  [SKIP] group_activity.payload is already JSONB")
+        return
+
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE group_activity ADD COLUMN IF NOT EXISTS payload_jsonb JSONB"))
+
+    converted = 0
+    while True:
+        with engine.begin() as conn:
+            result = conn.execute(text("""
+                UPDATE group_activity SET payload_jsonb = COALESCE(NULLIF(payload, '')::jsonb, '{}'::jsonb)
+                WHERE id IN (
+                    SELECT id FROM group_activity
+                    WHERE payload_jsonb IS NULL
+                    ORDER BY id
+                    LIMIT :batch
+                )
+            """), {"batch": BATCH_SIZE})
+        if result.rowcount == 0:
+            break
+        converted += result.rowcount
+        print(f"  ... converted {converted} row(s)")
+
+    # Rows written by the old code while batches ran are picked up by the final pass
+    with engine.begin() as conn:
+        conn.execute(text("""
+            UPDATE group_activity SET payload_jsonb = COALESCE(NULLIF(payload, '')::jsonb, '{}'::jsonb)
+            WHERE payload_jsonb IS NULL
+        """))
+        conn.execute(text("ALTER TABLE group_activity DROP COLUMN payload"))
+        conn.execute(text("ALTER TABLE group_activity RENAME COLUMN payload_jsonb TO payload"))
+    print(f"  [OK] group_activity.payload is now JSONB ({converted} row(s) converted)")
+
+
+def run():
+    create_indexes()
+    convert_payload_to_jsonb()
+    print("\n[DONE] Migration complete.")
+
+
+if __name__ == "__main__":
+    print("Running migration: group_activity_jsonb\n")
+    run()
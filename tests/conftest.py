@@ -0,0 +1,8 @@
+"""
+Shared test setup: set before any test module imports the app.
+"""
+import os
+
+# TestClient(app) runs the startup hook; keep the background scheduler (and its
+# jobs against the real database) out of the test run.
+os.environ.setdefault("SCHEDULER_ENABLED", "0")
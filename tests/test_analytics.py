@@ -0,0 +1,110 @@
+"""
+Tests for the vectorized reading analytics (app/analytics.py).
+Run: pytest tests/test_analytics.py -v
+"""
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pytest
+from sqlmodel import SQLModel, create_engine, Session
+from sqlmodel.pool import StaticPool
+
+from app import analytics, models
+
+
+@pytest.fixture(name="session")
+def session_fixture():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+
+
+def test_array_functions_match_the_loop_definitions():
+    today = date(2024, 3, 10)
+    series = analytics.ActivitySeries.from_pairs([
+        ("2024-03-10", 10), (date(2024, 3, 9), 5), (datetime(2024, 3, 10, 7), 2),
+        (date(2024, 3, 8), 4), (date(2024, 3, 1), 8), (date(2024, 1, 31), 30),
+        (date(2024, 1, 30), 1), (date(2024, 1, 29), 1), (date(2024, 1, 28), 1),
+    ])
+
+    assert series.pages.tolist() == [1, 1, 1, 30, 8, 4, 5, 12]     # same day summed, sorted
+    assert analytics.monthly_totals(series, today, 3) == {"2024-01": 33, "2024-02": 0, "2024-03": 29}
+    assert analytics.avg_pages_per_day(series, today, 30) == round(29 / 30, 1)
+
+    daily = series.dense(np.datetime64("2024-03-07"), np.datetime64(today))
+    assert daily.tolist() == [0, 4, 5, 12]
+    assert analytics.rolling_average(daily, 2).tolist() == [0.0, 2.0, 4.5, 8.5]
+
+    days_left, finish = analytics.project_finishes(np.array([100, 390]), np.array([400, 400]), 20.0, today)
+    assert days_left.tolist() == [15, 1]
+    assert finish.astype(str).tolist() == ["2024-03-25", "2024-03-11"]
+
+
+def test_group_distribution_ranks_the_caller(session):
+    users = [models.User(email=f"u{i}@example.com", name=f"U{i}", password_hash="x") for i in range(4)]
+    session.add_all(users)
+    session.commit()
+    group = models.ReadingGroup(name="Club", created_by=users[0].id)
+    session.add(group)
+    session.commit()
+    book = models.Book(title="Dune", total_pages=400)
+    session.add(book)
+    session.commit()
+
+    now = datetime.utcnow()
+    for user, pages in zip(users, [0, 10, 20, 40]):
+        session.add(models.GroupMember(group_id=group.id, user_id=user.id, status="active"))
+        ub = models.UserBook(user_id=user.id, book_id=book.id, status="reading")
+        session.add(ub)
+        session.commit()
+        if pages:
+            session.add(models.ReadingActivity(user_id=user.id, userbook_id=ub.id, date=now, pages_read=pages))
+            # Outside the window
+            session.add(models.ReadingActivity(user_id=user.id, userbook_id=ub.id,
+                                               date=now - timedelta(days=90), pages_read=500))
+    session.commit()
+
+    result = analytics.group_distribution(session, group.id, users[2].id, days=30)
+
+    assert result["members"] == 4
+    assert result["my_pages"] == 20
+    assert result["my_percentile"] == 50
+    assert result["pages"]["p50"] == 15.0
+
+    trends = analytics.user_trends(session, users[3].id, months=2)
+    assert trends["current_streak"] == 1
+    assert trends["avg_pages_per_day_7"] == round(40 / 7, 1)
+    assert sum(m["pages_read"] for m in trends["monthly_pages"]) == 40
+
+
+def test_library_stats_back_user_and_profile_stats(session):
+    from app.routers.profile_router import get_profile
+    from app.routers.users_router import get_user_stats
+
+    reader = models.User(email="r@example.com", name="R", password_hash="x")
+    session.add(reader)
+    session.commit()
+    paged, unpaged = models.Book(title="Dune", total_pages=400), models.Book(title="Zine")
+    session.add_all([paged, unpaged])
+    session.commit()
+    now = datetime.utcnow()
+    session.add_all([
+        models.UserBook(user_id=reader.id, book_id=paged.id, status="finished", updated_at=now),
+        models.UserBook(user_id=reader.id, book_id=unpaged.id, status="finished", current_page=30,
+                        updated_at=now - timedelta(days=400)),
+        models.UserBook(user_id=reader.id, book_id=paged.id, status="reading", current_page=120),
+        models.UserBook(user_id=reader.id, book_id=paged.id, status="to-read"),
+    ])
+    session.commit()
+
+    stats = get_user_stats(reader.id, db=session, current_user=reader)
+    assert (stats.total_books, stats.finished, stats.reading, stats.to_read) == (4, 2, 1, 1)
+    assert (stats.last_month, stats.this_year) == (1, 1)
+    assert stats.total_pages == 400 + 120                   # the unpaged finished book counts nothing here
+
+    profile = get_profile(db=session, current_user=reader)["stats"]
+    assert profile["totalBooks"] == 4 and profile["toRead"] == 1
+    assert profile["total_pages_read"] == 400 + 30 + 120    # ... and its progress here
@@ -0,0 +1,141 @@
+"""
+Tests for canonical book identity and the catalog merge tool (app/book_resolver.py).
+Run: pytest tests/test_book_resolver.py -v
+"""
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import MetaData, UniqueConstraint, text
+from sqlmodel import SQLModel, create_engine, Session, select
+from sqlmodel.pool import StaticPool
+
+from app import book_resolver, models
+from app.models import Book, UserBook
+
+
+def memory_engine():
+    return create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+
+
+@pytest.fixture(name="db")
+def db_fixture():
+    engine = memory_engine()
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as db:
+        yield db
+
+
+@pytest.fixture(name="legacy_db")
+def legacy_db_fixture():
+    """The catalog as it was before the unique keys: duplicates allowed."""
+    engine = memory_engine()
+    SQLModel.metadata.create_all(engine, tables=[t for t in SQLModel.metadata.sorted_tables if t.name != "book"])
+    book = Book.__table__.to_metadata(MetaData())
+    book.constraints = {c for c in book.constraints if not isinstance(c, UniqueConstraint)}
+    book.create(engine)
+    with Session(engine) as db:
+        yield db
+
+
+def test_isbn13_normalizes_both_forms():
+    assert book_resolver.isbn13("0-441-17271-7") == "9780441172719"
+    assert book_resolver.isbn13("978 0441172719") == "9780441172719"
+    assert book_resolver.isbn13("080442957X") == "9780804429573"
+    assert book_resolver.isbn13("dune") is None
+
+
+def test_resolve_reuses_the_book_across_isbn_forms_and_google_id(db):
+    dune, created = book_resolver.resolve(db, title="Dune", author="Frank Herbert", isbn="0441172717")
+    db.commit()
+    assert created and dune.isbn13 == "9780441172719"
+
+    again, created = book_resolver.resolve(db, title="Dune (ebook)", isbn="978-0-441-17271-9", google_books_id="g1")
+    db.commit()
+    assert not created and again.id == dune.id
+    assert dune.google_books_id == "g1"          # missing key claimed
+
+    by_volume, created = book_resolver.resolve(db, title="Dune", google_books_id="g1")
+    assert not created and by_volume.id == dune.id
+
+    other, created = book_resolver.resolve(db, title="Dune Messiah", google_books_id="  ")
+    db.commit()
+    assert created and other.google_books_id is None
+    assert len(db.exec(select(Book)).all()) == 2
+
+
+def test_resolve_returns_the_winner_when_an_insert_races(db, monkeypatch):
+    db.add(Book(title="Dune", isbn13="9780441172719"))
+    db.commit()
+    real_find = book_resolver.find
+    calls = []
+
+    def find_missing_once(db, **keys):
+        calls.append(keys)      # the first lookup ran before the other request's insert
+        return None if len(calls) == 1 else real_find(db, **keys)
+
+    monkeypatch.setattr(book_resolver, "find", find_missing_once)
+    book, created = book_resolver.resolve(db, title="Dune", isbn="0441172717")
+    db.commit()
+
+    assert not created and book.title == "Dune"
+    assert len(db.exec(select(Book)).all()) == 1
+
+
+def test_merge_duplicates_repoints_and_folds_rows(legacy_db):
+    db = legacy_db
+    db.connection().exec_driver_sql("PRAGMA foreign_keys=ON")    # as on Postgres: no dangling references
+    now = datetime.utcnow()
+    u1 = models.User(email="a@x.com", password_hash="x", username="a")
+    u2 = models.User(email="b@x.com", password_hash="x", username="b")
+    a = Book(title="Dune", isbn="0441172717")
+    b = Book(title="Dune", isbn="9780441172719", cover_url="b.jpg", google_books_id="g1")
+    c = Book(title="Dune", google_books_id="g1", total_pages=600)
+    d = Book(title="Emma", isbn="9780141439587", google_books_id="")
+    db.add_all([u1, u2, a, b, c, d])
+    db.commit()
+
+    assert book_resolver.backfill_keys(db) == 3
+    assert book_resolver.duplicate_clusters(db) == [[a.id, b.id, c.id]]
+
+    reading = UserBook(user_id=u1.id, book_id=b.id, status="reading", current_page=50)
+    finished = UserBook(user_id=u2.id, book_id=a.id, status="finished", current_page=600, updated_at=now)
+    to_read = UserBook(user_id=u2.id, book_id=c.id, status="to-read", current_page=10)
+    group = models.ReadingGroup(name="Club", created_by=u1.id, current_book_id=c.id)
+    db.add_all([reading, finished, to_read, group])
+    db.commit()
+    today, yesterday = date.today(), date.today() - timedelta(days=1)
+    db.add_all([
+        models.ReadingActivity(user_id=u2.id, userbook_id=finished.id, day=today, pages_read=20, current_page=600),
+        models.ReadingActivity(user_id=u2.id, userbook_id=to_read.id, day=today, pages_read=5, current_page=10),
+        models.ReadingActivity(user_id=u2.id, userbook_id=to_read.id, day=yesterday, pages_read=5, current_page=5),
+        models.Note(user_id=u2.id, userbook_id=to_read.id, text="Spice!"),
+        models.Journal(user_id=u2.id, entry_id=to_read.id, text="Day one"),
+        models.GroupPost(group_id=group.id, user_id=u2.id, userbook_id=to_read.id, text="Who's in?"),
+    ])
+    db.commit()
+
+    assert book_resolver.merge_duplicates(db, dry_run=True)["books_deleted"] == 2
+    totals = book_resolver.merge_duplicates(db)
+
+    assert totals == {"clusters": 1, "books_deleted": 2, "userbooks_moved": 1,
+                      "userbooks_merged": 1, "reading_group_repointed": 1}
+    db.expire_all()
+    kept = db.get(Book, a.id)
+    assert (kept.isbn13, kept.google_books_id, kept.cover_url, kept.total_pages) == ("9780441172719", "g1", "b.jpg", 600)
+    assert [bk.id for bk in db.exec(select(Book).order_by(Book.id)).all()] == [a.id, d.id]
+    assert db.get(UserBook, reading.id).book_id == a.id
+    assert db.get(UserBook, to_read.id) is None
+    assert db.get(UserBook, finished.id).book_id == a.id
+    assert db.get(models.ReadingGroup, group.id).current_book_id == a.id
+    activity = {r.day: r.pages_read for r in db.exec(
+        select(models.ReadingActivity).where(models.ReadingActivity.userbook_id == finished.id)
+    ).all()}
+    assert activity == {today: 25, yesterday: 5}
+    assert db.exec(select(models.Note)).one().userbook_id == finished.id
+    assert db.exec(select(models.Journal)).one().entry_id == finished.id
+    assert db.exec(select(models.GroupPost)).one().userbook_id == finished.id
+
+    # What the migration does next
+    db.execute(text("CREATE UNIQUE INDEX uq_book_isbn13 ON book(isbn13)"))
+    db.execute(text("CREATE UNIQUE INDEX uq_book_google_books_id ON book(google_books_id)"))
+    assert book_resolver.merge_duplicates(db) == {"clusters": 0}
@@ -0,0 +1,167 @@
+"""
+Tests for the indexed catalog search (app/book_search.py).
+Run: pytest tests/test_book_search.py -v
+"""
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from sqlmodel import SQLModel, create_engine, Session, select
+from sqlmodel.pool import StaticPool
+
+from app import book_search
+from app.models import Book
+
+
+BOOKS = [
+    ("Dune", "Frank Herbert", "9780441172719"),
+    ("Dune Messiah", "Frank Herbert", None),
+    ("Herbert's Guide to Dunes", "Ann Sandy", None),
+    ("The Hobbit", "J. R. R. Tolkien", "9780547928227"),
+    ("Les Misérables", "Victor Hugo", None),
+]
+
+
+def make_engine(indexed: bool):
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    SQLModel.metadata.create_all(engine)
+    if indexed:
+        book_search.create_index(engine)
+    with Session(engine) as db:
+        for title, author, isbn in BOOKS:
+            db.add(Book(title=title, author=author, isbn=isbn))
+        db.commit()
+    return engine
+
+
+@pytest.fixture(name="db")
+def db_fixture():
+    with Session(make_engine(indexed=True)) as db:
+        yield db
+
+
+def titles(books):
+    return [b.title for b in books]
+
+
+def test_prefix_match_ranks_title_over_author(db):
+    assert titles(book_search.search(db, "dun"))[:2] == ["Dune", "Dune Messiah"]
+    assert titles(book_search.search(db, "dune herb")) == ["Dune", "Dune Messiah", "Herbert's Guide to Dunes"]
+    assert titles(book_search.search(db, "miserables")) == ["Les Misérables"]
+    assert book_search.search(db, "  ") == []
+
+
+def test_isbn_with_hyphens_matches_exactly(db):
+    assert titles(book_search.search(db, "978-0-547-92822-7")) == ["The Hobbit"]
+
+
+def test_index_follows_inserts_updates_and_deletes(db):
+    hobbit = db.exec(select(Book).where(Book.title == "The Hobbit")).one()
+    hobbit.title = "There and Back Again"
+    db.add(Book(title="Children of Dune", author="Frank Herbert"))
+    db.commit()
+
+    assert titles(book_search.search(db, "there back")) == ["There and Back Again"]
+    assert book_search.search(db, "hobbit") == []
+    assert "Children of Dune" in titles(book_search.search(db, "dune"))
+
+    db.delete(hobbit)
+    db.commit()
+    assert book_search.search(db, "there") == []
+
+
+def test_by_authors_matches_names_as_phrases(db):
+    assert titles(book_search.by_authors(db, ["J. R. R. Tolkien"])) == ["The Hobbit"]
+    assert sorted(titles(book_search.by_authors(db, ["Frank Herbert", "Victor Hugo"]))) == [
+        "Dune", "Dune Messiah", "Les Misérables",
+    ]
+    assert book_search.by_authors(db, ["Herbert Frank"]) == []
+
+
+def test_falls_back_to_ilike_without_index():
+    with Session(make_engine(indexed=False)) as db:
+        assert titles(book_search.search(db, "dune")) == ["Dune", "Dune Messiah", "Herbert's Guide to Dunes"]
+        assert titles(book_search.by_authors(db, ["Tolkien"])) == ["The Hobbit"]
+
+
+def test_index_created_while_running_is_picked_up(monkeypatch):
+    engine = make_engine(indexed=False)
+    with Session(engine) as db:
+        assert book_search._mode(db) == "scan"
+        # The migration runs from another process: nothing clears this process's cache
+        with engine.begin() as conn:
+            for stmt in book_search._SQLITE_DDL:
+                conn.exec_driver_sql(stmt)
+        assert book_search._mode(db) == "scan"      # within the re-probe interval
+        monkeypatch.setattr(book_search, "INDEX_REPROBE_SECONDS", 0)
+        assert book_search._mode(db) == "fts"
+        monkeypatch.setattr(book_search, "INDEX_REPROBE_SECONDS", 3600)
+        assert book_search._mode(db) == "fts"       # found is remembered
+
+
+def test_postgres_without_migration_falls_back_to_ilike(monkeypatch):
+    engine = make_engine(indexed=False)
+    monkeypatch.setattr(engine.dialect, "name", "postgresql")
+    # Stand-in for the pg_extension / pg_indexes probe finding nothing
+    monkeypatch.setitem(book_search._PROBES, "postgresql", "SELECT 1 WHERE 0")
+    with Session(engine) as db:
+        assert book_search._mode(db) == "scan"
+        assert titles(book_search.search(db, "hobbit")) == ["The Hobbit"]
+
+
+# ── Hybrid search ─────────────────────────────────────────────────────────────
+
+def google_item(google_id, title, isbn_10=None, isbn_13=None):
+    return {"google_id": google_id, "title": title, "authors": ["Frank Herbert"],
+            "isbn_10": isbn_10, "isbn_13": isbn_13}
+
+
+def test_unified_search_stays_local_when_catalog_has_enough(db, monkeypatch):
+    from app.routers import books_router
+
+    async def no_google(query):
+        raise AssertionError("Google should not be called")
+
+    monkeypatch.setattr(books_router, "search_google_books", no_google)
+    monkeypatch.setattr(book_search, "HYBRID_MIN_LOCAL", 2)
+    body = asyncio.run(books_router.search_unified(q="dune", limit=20, db=db, _=None))
+
+    assert body["google"] == "skipped" and body["local_count"] == 3
+    assert {r["source"] for r in body["results"]} == {"local"}
+
+
+def test_unified_search_merges_google_without_duplicates(db, monkeypatch):
+    from app.routers import books_router
+    calls = []
+
+    async def google(query):
+        calls.append(query)
+        return {"total_items": 3, "results": [
+            google_item("g1", "Dune", isbn_10="0441172717"),        # catalog has its ISBN-13
+            google_item("g2", "Dune (Deluxe)", isbn_13="9780593099322"),
+            google_item("g2", "Dune (Deluxe)"),                      # repeated volume
+        ]}
+
+    monkeypatch.setattr(books_router, "search_google_books", google)
+    body = asyncio.run(books_router.search_unified(q="dune", limit=20, db=db, _=None))
+
+    assert calls == ["dune"] and body["google"] == "ok"
+    assert [(r["source"], r["title"]) for r in body["results"]] == [
+        ("local", "Dune"), ("local", "Dune Messiah"), ("local", "Herbert's Guide to Dunes"),
+        ("google", "Dune (Deluxe)"),
+    ]
+
+
+def test_unified_search_returns_local_results_when_google_fails(db, monkeypatch):
+    from app.routers import books_router
+
+    async def down(query):
+        raise HTTPException(status_code=502, detail="Google Books API error 503")
+
+    monkeypatch.setattr(books_router, "search_google_books", down)
+    body = asyncio.run(books_router.search_unified(q="hobbit", limit=20, db=db, _=None))
+
+    assert body["google"] == "unavailable"
+    assert [r["title"] for r in body["results"]] == ["The Hobbit"]
@@ -0,0 +1,102 @@
+"""
+Tests for the background admin broadcast job.
+Run: pytest tests/test_broadcast_job.py -v
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from exponent_server_sdk import PushTicket
+from sqlmodel import SQLModel, create_engine, Session, select
+from sqlmodel.pool import StaticPool
+
+from app import models
+from app.notifications import broadcast
+
+
+@pytest.fixture(name="engine")
+def engine_fixture(monkeypatch):
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    SQLModel.metadata.create_all(engine)
+    monkeypatch.setattr("app.database.engine", engine)
+    return engine
+
+
+@pytest.fixture(name="expo")
+def expo_fixture(monkeypatch):
+    """Fake Expo client: records chunk sizes, marks tokens ending in 'dead' as unregistered."""
+    chunks = []
+
+    class FakeClient:
+        def publish_multiple(self, messages):
+            chunks.append(len(messages))
+            return [
+                PushTicket(m, "error", "gone", {"error": "DeviceNotRegistered"}, None)
+                if m.to.endswith("dead]") else PushTicket(m, "ok", None, None, f"ticket-{m.to}")
+                for m in messages
+            ]
+
+    monkeypatch.setattr(broadcast, "PushClient", FakeClient)
+    return chunks
+
+
+def seed_tokens(session: Session, n: int, dead_every: int = 0) -> None:
+    user = models.User(email="u@example.com", name="U", password_hash="x")
+    session.add(user)
+    session.commit()
+    for i in range(n):
+        dead = dead_every and i % dead_every == 0
+        session.add(models.PushToken(user_id=user.id, token=f"ExponentPushToken[{i}{'dead' if dead else ''}]"))
+    session.commit()
+
+
+def test_broadcast_sends_in_chunks_and_removes_stale_tokens(engine, expo):
+    with Session(engine) as session:
+        seed_tokens(session, 250, dead_every=50)
+        job = broadcast.create_broadcast_job(session, "Hi", "Body", None, created_by=None)
+
+    broadcast.run_broadcast(job.id)
+
+    with Session(engine) as session:
+        job = session.get(models.BroadcastJob, job.id)
+        assert job.status == "completed"
+        assert job.sent_expo == 245
+        assert job.stale_removed == 5
+        assert len(session.exec(select(models.PushToken)).all()) == 245
+    assert sorted(expo) == [50, 100, 100]
+
+
+def test_orphaned_job_resumes_after_cursor(engine, expo):
+    with Session(engine) as session:
+        seed_tokens(session, 150)
+        job = broadcast.create_broadcast_job(session, "Hi", "Body", None, created_by=None)
+        # Simulate a crash after the first 100 tokens
+        job.status, job.last_token_id, job.sent_expo = "running", 100, 100
+        job.updated_at = datetime.utcnow() - timedelta(minutes=10)
+        session.add(job)
+        session.commit()
+        job_id = job.id
+
+    assert broadcast.resumable_job_ids() == [job_id]
+    broadcast.run_broadcast(job_id)
+
+    with Session(engine) as session:
+        job = session.get(models.BroadcastJob, job_id)
+        assert job.status == "completed"
+        assert job.sent_expo == 150
+    assert expo == [50]
+
+
+def test_running_job_is_not_claimed_twice(engine, expo):
+    with Session(engine) as session:
+        seed_tokens(session, 10)
+        job = broadcast.create_broadcast_job(session, "Hi", "Body", None, created_by=None)
+        job.status, job.updated_at = "running", datetime.utcnow()
+        session.add(job)
+        session.commit()
+        job_id = job.id
+
+    broadcast.run_broadcast(job_id)
+
+    assert expo == []
@@ -0,0 +1,280 @@
+"""
+Tests for set-based, chunked group / account deletion jobs.
+Run: pytest tests/test_deletion.py -v
+"""
+import pytest
+from sqlmodel import SQLModel, create_engine, Session, select, func
+from sqlmodel.pool import StaticPool
+
+from app import models
+from app import deletion
+
+
+@pytest.fixture(name="engine")
+def engine_fixture(monkeypatch):
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    SQLModel.metadata.create_all(engine)
+    monkeypatch.setattr("app.database.engine", engine)
+    monkeypatch.setattr(deletion, "DELETE_CHUNK_SIZE", 2)
+    return engine
+
+
+def count(session: Session, model, *where) -> int:
+    return session.exec(select(func.count()).select_from(model).where(*where)).one()
+
+
+def seed(session: Session):
+    owner = models.User(email="o@example.com", name="O", password_hash="x")
+    reader = models.User(email="r@example.com", name="R", password_hash="x")
+    session.add_all([owner, reader])
+    session.commit()
+    group = models.ReadingGroup(name="Circle", created_by=owner.id)
+    book = models.Book(title="Dune", total_pages=400)
+    session.add_all([group, book])
+    session.commit()
+    session.add_all([
+        models.GroupMember(group_id=group.id, user_id=owner.id, role="curator", status="active"),
+        models.GroupMember(group_id=group.id, user_id=reader.id, status="active", invited_by=owner.id),
+        models.GroupGoalCounter(group_id=group.id, period_key="all", pages=10),
+        models.GroupDiscoveryRank(group_id=group.id, member_count=2),
+    ])
+    for user in (owner, reader):
+        session.add(models.GroupMemberStats(group_id=group.id, user_id=user.id, month_key="2026-05"))
+    for i in range(5):
+        session.add(models.GroupPost(group_id=group.id, user_id=reader.id, text=f"post {i}"))
+        session.add(models.GroupActivity(group_id=group.id, user_id=reader.id, event_type="note_posted", payload={}))
+    session.commit()
+    return owner, reader, group, book
+
+
+def test_group_deletion_removes_everything_in_chunks(engine):
+    with Session(engine) as session:
+        owner, reader, group, _ = seed(session)
+        group_id = group.id
+        job = deletion.create_deletion_job(session, "group", group_id, owner.id)
+        job_id = job.id
+        # A second request for the same group reuses the active job
+        assert deletion.create_deletion_job(session, "group", group_id, owner.id).id == job_id
+
+    deletion.run_deletion(job_id)
+
+    with Session(engine) as session:
+        job = session.get(models.DeletionJob, job_id)
+        assert job.status == "completed"
+        assert job.progress["group_post"] == 5
+        assert job.progress["group_activity"] == 5
+        assert job.rows_deleted == 5 + 5 + 2 + 1 + 1 + 2 + 1
+        for model in (models.GroupPost, models.GroupActivity, models.GroupMember, models.GroupMemberStats,
+                      models.GroupGoalCounter, models.GroupDiscoveryRank, models.ReadingGroup):
+            assert count(session, model) == 0
+        assert count(session, models.User) == 2
+
+
+def test_account_deletion_cascades_and_leaves_other_users_alone(engine):
+    with Session(engine) as session:
+        owner, reader, group, book = seed(session)
+        ub = models.UserBook(user_id=reader.id, book_id=book.id, status="reading")
+        session.add(ub)
+        session.commit()
+        note = models.Note(user_id=reader.id, userbook_id=ub.id, text="great")
+        own_note = models.Note(user_id=owner.id, text="mine")
+        session.add_all([note, own_note,
+                         models.Follow(follower_id=owner.id, followed_id=reader.id),
+                         models.PushToken(user_id=reader.id, token="ExponentPushToken[r]"),
+                         models.ReadingActivity(user_id=reader.id, userbook_id=ub.id, pages_read=20)])
+        session.commit()
+        session.add_all([models.Like(note_id=note.id, user_id=owner.id),
+                         models.Like(note_id=own_note.id, user_id=reader.id),
+                         models.Comment(note_id=own_note.id, user_id=owner.id, text="hi")])
+        session.commit()
+        owner_id, reader_id, own_note_id = owner.id, reader.id, own_note.id
+        job_id = deletion.create_deletion_job(session, "user", reader_id, reader_id).id
+
+    deletion.run_deletion(job_id)
+
+    with Session(engine) as session:
+        assert session.get(models.DeletionJob, job_id).status == "completed"
+        assert session.get(models.User, reader_id) is None
+        for model in (models.UserBook, models.ReadingActivity, models.PushToken, models.Follow,
+                      models.GroupPost, models.GroupActivity, models.Like):
+            assert count(session, model) == 0
+        # The owner's group, note and comment survive; only the reader's membership is gone
+        assert [m.user_id for m in session.exec(select(models.GroupMember)).all()] == [owner_id]
+        assert [n.id for n in session.exec(select(models.Note)).all()] == [own_note_id]
+        assert count(session, models.Comment) == 1
+
+
+def test_deleted_group_is_gone_before_the_job_runs(engine, monkeypatch):
+    from fastapi import HTTPException, Response
+    from app import group_activity
+    from app.routers import groups_router
+
+    queued = []
+    monkeypatch.setattr(groups_router, "enqueue_deletion", queued.append)
+    group_activity._membership_cache.clear()
+    with Session(engine) as session:
+        owner, reader, group, _ = seed(session)
+        stranger = models.User(email="s@example.com", name="S", password_hash="x")
+        session.add(stranger)
+        session.commit()
+        assert group_activity.active_group_ids(session, reader.id) == (group.id,)
+
+        groups_router.delete_group(group.id, Response(), db=session, me=owner)
+
+        assert len(queued) == 1 and count(session, models.GroupMember) == 0
+        for call in (lambda: groups_router.get_group(group.id, db=session, me=owner),
+                     lambda: groups_router.join_by_invite_code(group.invite_code, db=session, me=stranger)):
+            with pytest.raises(HTTPException) as exc:
+                call()
+            assert exc.value.status_code == 404
+        before = count(session, models.GroupActivity)
+        group_activity.fire_group_activity_for_user(session, reader.id, "book_started")
+        assert count(session, models.GroupActivity) == before
+
+    deletion.run_deletion(queued[0])
+    with Session(engine) as session:
+        assert session.get(models.DeletionJob, queued[0]).status == "completed"
+        assert count(session, models.ReadingGroup) == 0
+    group_activity._membership_cache.clear()
+
+
+def test_group_deletion_retries_rows_written_while_it_runs(engine, monkeypatch):
+    run_step, late = deletion.run_step, []
+
+    def run_step_with_late_post(db, job, label, model, condition, values=None):
+        if label == "group_member" and not late:
+            # Another worker's stale membership cache posts into the group mid-job
+            late.append(models.GroupPost(group_id=job.target_id, user_id=job.requested_by, text="late"))
+            db.add(late[0])
+            db.commit()
+        return run_step(db, job, label, model, condition, values)
+
+    monkeypatch.setattr(deletion, "run_step", run_step_with_late_post)
+    with Session(engine) as session:
+        session.connection().exec_driver_sql("PRAGMA foreign_keys=ON")
+        owner, _, group, _ = seed(session)
+        job_id = deletion.create_deletion_job(session, "group", group.id, owner.id).id
+
+    deletion.run_deletion(job_id)
+
+    with Session(engine) as session:
+        job = session.get(models.DeletionJob, job_id)
+        assert job.status == "completed", job.error
+        assert job.progress["group_post"] == 6
+        assert count(session, models.ReadingGroup) == 0
+
+
+def test_deleted_account_can_no_longer_authenticate(engine, monkeypatch):
+    from fastapi import HTTPException
+    from fastapi.security import HTTPAuthorizationCredentials
+    from app import auth, deps
+    from app.notifications import router as notifications_router
+    from app.routers import auth_router
+
+    monkeypatch.setattr(auth_router, "enqueue_deletion", lambda job_id: None)
+    monkeypatch.setattr(notifications_router, "engine", engine)
+    with Session(engine) as session:
+        owner, reader, group, _ = seed(session)
+        creds = lambda user: HTTPAuthorizationCredentials(
+            scheme="Bearer", credentials=auth.create_access_token({"sub": str(user.id)}))
+
+        # The legacy form only flags the account for review
+        reader.deletion_requested_at = reader.created_at
+        session.add(reader)
+        session.commit()
+        assert deps.get_current_user(db=session, creds=creds(reader)).id == reader.id
+
+        auth_router.delete_own_account(current_user=owner, db=session)
+
+        with pytest.raises(HTTPException) as exc:
+            deps.get_current_user(db=session, creds=creds(owner))
+        assert exc.value.status_code == 401
+        assert deps.get_current_user_optional(db=session, creds=creds(owner)) is None
+        # ...and so is the live notification stream
+        assert notifications_router._stream_user_id(creds(owner).credentials) is None
+        assert notifications_router._stream_user_id(creds(reader).credentials) == reader.id
+        # The groups the account created are gone with it
+        assert session.get(models.ReadingGroup, group.id).deleted_at is not None
+        assert count(session, models.GroupMember) == 0
+
+
+def test_plans_cover_every_foreign_key():
+    def before(plan, target):
+        labels = [step[0] for step in plan]
+        return {getattr(step[1], "__table__", step[1]).name for step in plan[:labels.index(target)]}
+
+    group_tables = {c.table.name for c in models.foreign_keys_to(models.ReadingGroup)}
+    assert group_tables <= before(deletion.group_plan(1), "reading_group")
+
+    # Groups the user created are deleted (as whole groups) before the user plan runs
+    user_tables = {c.table.name for c in models.foreign_keys_to(models.User)} - {"reading_group"}
+    assert user_tables <= before(deletion.user_plan(1), "user")
+    userbook_tables = {c.table.name for c in models.foreign_keys_to(models.UserBook)}
+    assert userbook_tables <= before(deletion.user_plan(1), "userbook")
+
+
+def test_account_deletion_clears_other_rows_pointing_at_its_userbooks(engine):
+    with Session(engine) as session:
+        session.connection().exec_driver_sql("PRAGMA foreign_keys=ON")
+        owner, reader, group, book = seed(session)
+        ub = models.UserBook(user_id=reader.id, book_id=book.id, status="reading")
+        session.add(ub)
+        session.commit()
+        session.add_all([models.Journal(user_id=reader.id, entry_id=ub.id, text="Day one"),
+                         models.GroupPost(group_id=group.id, user_id=owner.id, userbook_id=ub.id, text="Look")])
+        session.commit()
+        reader_id = reader.id
+        job_id = deletion.create_deletion_job(session, "user", reader_id, reader_id).id
+
+    deletion.run_deletion(job_id)
+
+    with Session(engine) as session:
+        job = session.get(models.DeletionJob, job_id)
+        assert job.status == "completed", job.error
+        assert job.progress["group_post.userbook_id"] == 1
+        assert count(session, models.Journal) == 0
+        assert [p.userbook_id for p in session.exec(select(models.GroupPost)).all()] == [None]
+
+
+def test_failed_job_is_retried_with_backoff_then_by_an_admin(engine, monkeypatch):
+    from datetime import datetime
+    from app.routers import admin_router
+
+    monkeypatch.setattr(deletion, "MAX_ATTEMPTS", 2)
+    monkeypatch.setattr(admin_router, "enqueue_deletion", lambda job_id: None)
+    delete_group, failures = deletion._delete_group, []
+
+    def flaky_delete_group(db, job, group_id):
+        if len(failures) < 2:
+            failures.append(1)
+            raise RuntimeError("connection reset")
+        delete_group(db, job, group_id)
+
+    monkeypatch.setattr(deletion, "_delete_group", flaky_delete_group)
+    with Session(engine) as session:
+        owner, _, group, _ = seed(session)
+        owner_id = owner.id
+        job_id = deletion.create_deletion_job(session, "group", group.id, owner_id).id
+
+    deletion.run_deletion(job_id)
+    with Session(engine) as session:
+        job = session.get(models.DeletionJob, job_id)
+        assert (job.status, job.attempts) == ("failed", 1)
+        due = deletion.retry_at(job)
+    assert deletion.resumable_deletion_ids(due - deletion.RETRY_BACKOFF / 2) == []
+    assert deletion.resumable_deletion_ids(due) == [job_id]
+
+    deletion.run_deletion(job_id, now=due)
+    assert deletion.resumable_deletion_ids(datetime.max - deletion.STALE_AFTER) == []   # out of attempts
+
+    with Session(engine) as session:
+        admin = session.get(models.User, owner_id)
+        retried = admin_router.retry_deletion_job(job_id, db=session, admin_user=admin)
+        assert (retried["status"], retried["attempts"]) == ("queued", 0)
+    deletion.run_deletion(job_id)
+    with Session(engine) as session:
+        job = session.get(models.DeletionJob, job_id)
+        assert (job.status, job.error) == ("completed", None)
+        assert count(session, models.ReadingGroup) == 0
@@ -0,0 +1,138 @@
+"""
+Tests for the two-tier Google Books response cache.
+Run: pytest tests/test_google_books_cache.py -v
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlmodel import SQLModel, create_engine, Session
+from sqlmodel.pool import StaticPool
+
+from app import google_books_cache as cache, models
+
+
+@pytest.fixture(name="engine")
+def engine_fixture(monkeypatch):
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    SQLModel.metadata.create_all(engine)
+    monkeypatch.setattr("app.database.engine", engine)
+    for state in (cache._lru, cache._metrics, cache._negative):
+        state.clear()
+    yield engine
+    for state in (cache._lru, cache._metrics, cache._negative):
+        state.clear()
+
+
+def counting_fetch(calls: list):
+    async def fetch():
+        calls.append(1)
+        return {"results": [], "total_items": len(calls)}
+    return fetch
+
+
+def test_miss_then_lru_then_shared_table(engine):
+    calls = []
+    key = cache.search_key("  Dune   HERBERT ")
+    assert key == cache.search_key("dune herbert")
+
+    async def scenario():
+        first = await cache.get_or_fetch(key, counting_fetch(calls))
+        second = await cache.get_or_fetch(key, counting_fetch(calls))
+        cache._lru.clear()          # another worker: only the table has it
+        third = await cache.get_or_fetch(key, counting_fetch(calls))
+        return first, second, third
+
+    first, second, third = asyncio.run(scenario())
+
+    assert len(calls) == 1
+    assert first == second == third == {"results": [], "total_items": 1}
+    m = cache.metrics()
+    assert (m["miss"], m["lru_hit"], m["db_hit"]) == (1, 1, 1)
+    with Session(engine) as db:
+        assert db.get(models.GoogleBooksCache, key).payload == first
+
+
+def test_stale_entry_is_served_and_refreshed_in_background(engine):
+    calls = []
+    key = cache.volume_key("abc123")
+
+    async def scenario():
+        await cache.get_or_fetch(key, counting_fetch(calls))
+        later = datetime.utcnow() + cache.VOLUME_TTL + timedelta(minutes=1)
+        stale = await cache.get_or_fetch(key, counting_fetch(calls), now=later)
+        await cache._inflight[key]
+        fresh = await cache.get_or_fetch(key, counting_fetch(calls))
+        expired = datetime.utcnow() + cache.VOLUME_TTL + cache.STALE_TTL + timedelta(minutes=1)
+        refetched = await cache.get_or_fetch(key, counting_fetch(calls), now=expired)
+        return stale, fresh, refetched
+
+    stale, fresh, refetched = asyncio.run(scenario())
+
+    assert stale["total_items"] == 1          # served without waiting for Google
+    assert fresh["total_items"] == 2          # the background refresh landed
+    assert refetched["total_items"] == 3      # too old to serve stale: fetched inline
+    m = cache.metrics()
+    assert (m["stale_hit"], m["refresh"], m["miss"]) == (1, 1, 2)
+
+    with Session(engine) as db:
+        assert cache.prune(db, datetime.utcnow() + cache.VOLUME_TTL + cache.STALE_TTL + timedelta(days=1)) == 1
+
+
+def test_concurrent_misses_share_one_upstream_call(engine):
+    calls = []
+
+    async def slow_fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"results": [], "total_items": 7}
+
+    async def scenario():
+        return await asyncio.gather(*(
+            cache.get_or_fetch(cache.search_key("Project Hail Mary"), slow_fetch) for _ in range(10)
+        ))
+
+    results = asyncio.run(scenario())
+
+    assert len(calls) == 1
+    assert all(r == {"results": [], "total_items": 7} for r in results)
+    assert cache.metrics()["coalesced"] == 9
+    assert not cache._inflight
+
+
+def test_upstream_failure_is_negatively_cached(engine):
+    calls = []
+    key = cache.volume_key("missing")
+
+    async def failing_fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise HTTPException(status_code=502, detail="Google Books API error 503")
+
+    raised = []
+
+    async def lookup(now=None):
+        try:
+            await cache.get_or_fetch(key, failing_fetch, now=now)
+        except HTTPException as e:
+            raised.append(e)
+            return e.status_code
+
+    async def scenario():
+        together = await asyncio.gather(lookup(), lookup())       # one call, both see the error
+        again = await lookup()                                     # within NEGATIVE_TTL: no call
+        once_more = await lookup()
+        later = await lookup(datetime.utcnow() + cache.NEGATIVE_TTL + timedelta(seconds=1))
+        return together, again, once_more, later
+
+    together, again, once_more, later = asyncio.run(scenario())
+
+    assert together == [502, 502] and again == once_more == later == 502
+    # Each negative hit raises its own exception, not the one shared with the first callers
+    assert raised[2] is not raised[0] and raised[3] is not raised[2]
+    assert raised[2].detail == "Google Books API error 503"
+    assert len(calls) == 2
+    assert cache.metrics()["negative_hit"] == 2
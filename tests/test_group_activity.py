@@ -0,0 +1,131 @@
+"""
+Tests for group activity fan-out and the membership cache.
+Run: pytest tests/test_group_activity.py -v
+"""
+import pytest
+from sqlmodel import SQLModel, create_engine, Session, select
+from sqlmodel.pool import StaticPool
+
+from app import models
+from app import group_activity
+from app.group_activity import fire_group_activity_for_user, invalidate_user_groups
+
+
+@pytest.fixture(name="session")
+def session_fixture():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    SQLModel.metadata.create_all(engine)
+    group_activity._membership_cache.clear()
+    with Session(engine) as session:
+        yield session
+    group_activity._membership_cache.clear()
+
+
+def seed(session: Session, n_groups: int):
+    user = models.User(email="r@example.com", name="R", password_hash="x")
+    session.add(user)
+    session.commit()
+    groups = [models.ReadingGroup(name=f"G{i}", created_by=user.id) for i in range(n_groups)]
+    session.add_all(groups)
+    session.commit()
+    return user, groups
+
+
+def test_one_row_per_active_group(session):
+    user, groups = seed(session, 3)
+    session.add(models.GroupMember(group_id=groups[0].id, user_id=user.id, status="active"))
+    session.add(models.GroupMember(group_id=groups[1].id, user_id=user.id, status="active"))
+    session.add(models.GroupMember(group_id=groups[2].id, user_id=user.id, status="pending"))
+    session.commit()
+
+    fire_group_activity_for_user(session, user.id, "note_posted", {"note_id": 7})
+
+    rows = session.exec(select(models.GroupActivity)).all()
+    assert sorted(r.group_id for r in rows) == [groups[0].id, groups[1].id]
+    assert all(r.payload == {"note_id": 7} for r in rows)
+
+
+def test_commit_false_joins_caller_transaction(session):
+    user, groups = seed(session, 1)
+    session.add(models.GroupMember(group_id=groups[0].id, user_id=user.id, status="active"))
+    session.commit()
+
+    fire_group_activity_for_user(session, user.id, "book_started", commit=False)
+    session.rollback()
+
+    assert session.exec(select(models.GroupActivity)).all() == []
+
+
+def test_cache_is_used_until_invalidated(session):
+    user, groups = seed(session, 2)
+    session.add(models.GroupMember(group_id=groups[0].id, user_id=user.id, status="active"))
+    session.commit()
+    fire_group_activity_for_user(session, user.id, "book_started")
+
+    session.add(models.GroupMember(group_id=groups[1].id, user_id=user.id, status="active"))
+    session.commit()
+    fire_group_activity_for_user(session, user.id, "book_started")
+    assert len(session.exec(select(models.GroupActivity)).all()) == 2   # stale cache: 1 group
+
+    invalidate_user_groups(user.id)
+    fire_group_activity_for_user(session, user.id, "book_started")
+    assert len(session.exec(select(models.GroupActivity)).all()) == 4
+
+
+def test_feed_pages_with_cursor_and_filters_by_type(session):
+    from fastapi import Response
+    from app.routers.groups_router import get_group_activity
+
+    user, groups = seed(session, 1)
+    session.add(models.GroupMember(group_id=groups[0].id, user_id=user.id, status="active"))
+    session.commit()
+    for event_type in ["book_started", "note_posted", "book_started", "note_posted", "book_started"]:
+        fire_group_activity_for_user(session, user.id, event_type)
+
+    first = Response()
+    page1 = get_group_activity(groups[0].id, first, limit=2, db=session, me=user)
+    second = Response()
+    page2 = get_group_activity(groups[0].id, second, limit=2, cursor=first.headers["X-Next-Cursor"], db=session, me=user)
+    last = Response()
+    page3 = get_group_activity(groups[0].id, last, limit=2, cursor=second.headers["X-Next-Cursor"], db=session, me=user)
+
+    ids = [e["id"] for e in page1 + page2 + page3]
+    assert ids == sorted(ids, reverse=True) and len(set(ids)) == 5
+    assert "X-Next-Cursor" not in last.headers
+
+    only = get_group_activity(groups[0].id, Response(), event_type="note_posted", db=session, me=user)
+    assert [e["event_type"] for e in only] == ["note_posted", "note_posted"]
+
+    clamped = Response()
+    assert len(get_group_activity(groups[0].id, clamped, limit=-5, db=session, me=user)) == 1
+    assert "X-Next-Cursor" in clamped.headers
+
+
+
+def test_stale_cache_for_deleted_group_keeps_progress_update(session):
+    from app.routers.userbooks_router import update_progress
+    from app.models import UserBookProgress
+
+    session.connection().exec_driver_sql("PRAGMA foreign_keys=ON")
+    user, groups = seed(session, 2)
+    book = models.Book(title="Dune", total_pages=400)
+    session.add(book)
+    session.commit()
+    ub = models.UserBook(user_id=user.id, book_id=book.id, status="reading", current_page=90)
+    session.add(ub)
+    session.add(models.GroupMember(group_id=groups[0].id, user_id=user.id, status="active"))
+    session.add(models.GroupMember(group_id=groups[1].id, user_id=user.id, status="active"))
+    session.commit()
+    group_activity.active_group_ids(session, user.id)   # cached while both groups exist
+
+    session.delete(session.exec(select(models.GroupMember).where(models.GroupMember.group_id == groups[1].id)).one())
+    session.delete(groups[1])
+    session.commit()
+
+    update_progress(ub.id, UserBookProgress(current_page=110), db=session, current_user=user)   # crosses 25 %
+
+    assert session.get(models.UserBook, ub.id).current_page == 110
+    rows = session.exec(select(models.GroupActivity)).all()
+    assert [(r.group_id, r.event_type) for r in rows] == [(groups[0].id, "milestone_reached")]
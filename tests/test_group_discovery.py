@@ -0,0 +1,108 @@
+"""
+Tests for ranked, paginated group discovery.
+Run: pytest tests/test_group_discovery.py -v
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import Response
+from sqlmodel import SQLModel, create_engine, Session
+from sqlmodel.pool import StaticPool
+
+from app import models
+from app import group_discovery
+from app.pagination import NEXT_CURSOR_HEADER, decode_cursor, page
+
+
+@pytest.fixture(name="session")
+def session_fixture():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+
+
+NOW = datetime(2026, 5, 20, 12, 0, 0)
+
+
+def seed(session: Session):
+    me = models.User(email="me@example.com", name="Me", password_hash="x")
+    other = models.User(email="o@example.com", name="O", password_hash="x")
+    session.add_all([me, other])
+    session.commit()
+    groups = [
+        models.ReadingGroup(name="Quiet Sci-Fi", created_by=other.id),
+        models.ReadingGroup(name="Busy Sci-Fi", description="lots going on", created_by=other.id),
+        models.ReadingGroup(name="Mine", created_by=me.id),
+        models.ReadingGroup(name="Secret Sci-Fi", is_private=True, created_by=other.id),
+        models.ReadingGroup(name="Poetry 100%", created_by=other.id),
+    ]
+    session.add_all(groups)
+    session.commit()
+    quiet, busy, mine, secret, poetry = groups
+    session.add_all([
+        models.GroupMember(group_id=quiet.id, user_id=other.id, status="active"),
+        models.GroupMember(group_id=busy.id, user_id=other.id, status="active"),
+        models.GroupMember(group_id=mine.id, user_id=me.id, status="active"),
+        models.GroupActivity(group_id=busy.id, user_id=other.id, event_type="book_finished",
+                             payload={}, created_at=NOW - timedelta(days=1)),
+        models.GroupActivity(group_id=quiet.id, user_id=other.id, event_type="book_finished",
+                             payload={}, created_at=NOW - timedelta(days=90)),   # too old to count
+    ])
+    session.commit()
+    return me, groups
+
+
+def test_ranks_public_unjoined_groups_by_activity(session):
+    me, (quiet, busy, mine, secret, poetry) = seed(session)
+    assert group_discovery.refresh_discovery_rank(session, now=NOW) == 4   # private group excluded
+
+    rows = group_discovery.discover(session, me.id)
+
+    assert [g.name for g, _ in rows] == ["Busy Sci-Fi", "Quiet Sci-Fi", "Poetry 100%"]
+    assert [score for _, score in rows] == [1 + group_discovery.ACTIVITY_WEIGHT, 1, 0]
+
+
+def test_text_filter_matches_name_or_description_and_escapes_wildcards(session):
+    me, _ = seed(session)
+    group_discovery.refresh_discovery_rank(session, now=NOW)
+
+    assert [g.name for g, _ in group_discovery.discover(session, me.id, q="sci-fi")] == ["Busy Sci-Fi", "Quiet Sci-Fi"]
+    assert [g.name for g, _ in group_discovery.discover(session, me.id, q="GOING")] == ["Busy Sci-Fi"]
+    assert [g.name for g, _ in group_discovery.discover(session, me.id, q="100%")] == ["Poetry 100%"]
+    assert group_discovery.discover(session, me.id, q="_") == []   # literal, not a wildcard
+
+
+def test_keyset_pages_cover_every_group_once(session):
+    me, _ = seed(session)
+    group_discovery.refresh_discovery_rank(session, now=NOW)
+
+    seen, after = [], None
+    while True:
+        response = Response()
+        rows = page(group_discovery.discover(session, me.id, after=after, limit=1), 1, response,
+                    lambda r: (r[1], r[0].id))
+        seen += [g.name for g, _ in rows]
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if not cursor:
+            break
+        after = decode_cursor(cursor, 2)
+
+    assert seen == ["Busy Sci-Fi", "Quiet Sci-Fi", "Poetry 100%"]
+
+
+def test_track_group_follows_privacy_changes(session):
+    me, (quiet, *_rest) = seed(session)
+    group_discovery.refresh_discovery_rank(session, now=NOW)
+
+    quiet.is_private = True
+    group_discovery.track_group(session, quiet, now=NOW)
+    session.commit()
+    assert "Quiet Sci-Fi" not in [g.name for g, _ in group_discovery.discover(session, me.id)]
+
+    quiet.is_private = False
+    group_discovery.track_group(session, quiet, now=NOW)
+    session.commit()
+    assert "Quiet Sci-Fi" in [g.name for g, _ in group_discovery.discover(session, me.id)]
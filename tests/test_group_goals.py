@@ -0,0 +1,79 @@
+"""
+Tests for rolling group goal counters.
+Run: pytest tests/test_group_goals.py -v
+"""
+from datetime import datetime
+
+import pytest
+from sqlmodel import SQLModel, create_engine, Session, select
+from sqlmodel.pool import StaticPool
+
+from app import models
+from app import group_activity, group_goals
+
+
+@pytest.fixture(name="session")
+def session_fixture():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    SQLModel.metadata.create_all(engine)
+    group_activity._membership_cache.clear()
+    with Session(engine) as session:
+        yield session
+    group_activity._membership_cache.clear()
+
+
+def seed(session: Session, period: str, start: datetime):
+    user = models.User(email="r@example.com", name="R", password_hash="x")
+    session.add(user)
+    session.commit()
+    group = models.ReadingGroup(name="G", created_by=user.id, goal_pages=1000,
+                                goal_period=period, goal_start_date=start)
+    book = models.Book(title="B")
+    session.add_all([group, book])
+    session.commit()
+    ub = models.UserBook(user_id=user.id, book_id=book.id, status="reading")
+    session.add_all([ub, models.GroupMember(group_id=group.id, user_id=user.id, status="active")])
+    session.commit()
+    return user, group, ub
+
+
+def read(session, user, ub, pages, when):
+    """What update_progress does: log the activity, bump the counters, commit."""
+    session.add(models.ReadingActivity(user_id=user.id, userbook_id=ub.id, date=when, pages_read=pages))
+    group_goals.record_pages_read(session, user.id, pages, now=when)
+    session.commit()
+
+
+def test_yearly_periods_anchor_on_start_date():
+    g = models.ReadingGroup(name="G", created_by=1, goal_period="yearly", goal_start_date=datetime(2025, 3, 1))
+    assert group_goals.period_bounds(g, datetime(2026, 2, 10))[0] == "2025-03-01"
+    assert group_goals.period_bounds(g, datetime(2026, 3, 2))[0] == "2026-03-01"
+
+
+def test_counter_increments_and_rolls_over_monthly(session):
+    user, group, ub = seed(session, "monthly", datetime(2026, 1, 1))
+    may, june = datetime(2026, 5, 10), datetime(2026, 6, 3)
+
+    read(session, user, ub, 40, may)
+    read(session, user, ub, 60, may)
+    assert group_goals.goal_pages_read(session, group, now=may) == 100
+
+    read(session, user, ub, 25, june)
+    assert group_goals.goal_pages_read(session, group, now=june) == 25
+    counters = session.exec(select(models.GroupGoalCounter)).all()
+    assert sorted(c.period_key for c in counters) == ["2026-05-01", "2026-06-01"]
+
+
+def test_verify_fixes_drift_and_drops_past_periods(session):
+    user, group, ub = seed(session, "monthly", datetime(2026, 1, 1))
+    may, june = datetime(2026, 5, 10), datetime(2026, 6, 3)
+    read(session, user, ub, 40, may)
+    read(session, user, ub, 10, june)
+    # Activity written behind the counter's back
+    session.add(models.ReadingActivity(user_id=user.id, userbook_id=ub.id, date=june, pages_read=5))
+    session.commit()
+
+    assert group_goals.verify(session, now=june) == {"checked": 1, "fixed": 1, "removed": 1}
+    assert group_goals.goal_pages_read(session, group, now=june) == 15
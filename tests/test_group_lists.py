@@ -0,0 +1,120 @@
+"""
+Tests for keyset-paginated group posts / members / pending lists and the bulk group serializer.
+Run: pytest tests/test_group_lists.py -v
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import Response
+from sqlmodel import SQLModel, create_engine, Session
+from sqlmodel.pool import StaticPool
+
+from app import models
+from app.routers.groups_router import get_group_posts, get_members, get_pending
+
+
+@pytest.fixture(name="session")
+def session_fixture():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+
+
+T0 = datetime(2026, 5, 1, 12, 0, 0)
+
+
+def seed(session: Session, n_members: int):
+    users = [models.User(email=f"u{i}@example.com", name=f"U{i}", password_hash="x") for i in range(n_members)]
+    session.add_all(users)
+    session.commit()
+    group = models.ReadingGroup(name="Circle", created_by=users[0].id)
+    session.add(group)
+    session.commit()
+    for i, u in enumerate(users):
+        # Same timestamp for two members: the id tie-breaker must keep pages disjoint
+        session.add(models.GroupMember(group_id=group.id, user_id=u.id, status="active",
+                                       role="curator" if i == 0 else "member",
+                                       joined_at=T0 + timedelta(minutes=i // 2)))
+    session.commit()
+    return users, group
+
+
+def walk(endpoint, group_id, me, session, limit):
+    """Follow X-Next-Cursor to the end; returns every page."""
+    pages, cursor = [], None
+    while True:
+        response = Response()
+        pages.append(endpoint(group_id, response, limit=limit, cursor=cursor, db=session, me=me))
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return pages
+
+
+def test_members_and_pending_page_in_join_order(session):
+    users, group = seed(session, 5)
+    requester = models.User(email="p@example.com", name="P", password_hash="x")
+    session.add(requester)
+    session.commit()
+    session.add(models.GroupMember(group_id=group.id, user_id=requester.id, status="pending"))
+    session.commit()
+
+    pages = walk(get_members, group.id, users[0], session, limit=2)
+
+    assert [len(p) for p in pages] == [2, 2, 1]
+    assert [m["name"] for p in pages for m in p] == ["U0", "U1", "U2", "U3", "U4"]
+    assert [m["name"] for p in walk(get_pending, group.id, users[0], session, limit=2) for m in p] == ["P"]
+
+
+def test_posts_page_newest_first_and_hydrate_books(session):
+    users, group = seed(session, 1)
+    book = models.Book(title="Dune", total_pages=400)
+    session.add(book)
+    session.commit()
+    ub = models.UserBook(user_id=users[0].id, book_id=book.id, status="reading")
+    session.add(ub)
+    session.commit()
+    for i in range(5):
+        session.add(models.GroupPost(group_id=group.id, user_id=users[0].id, text=f"post {i}",
+                                     userbook_id=ub.id if i == 4 else None,
+                                     created_at=T0 + timedelta(minutes=i // 2)))
+    session.commit()
+
+    pages = walk(get_group_posts, group.id, users[0], session, limit=2)
+
+    posts = [p for pg in pages for p in pg]
+    assert [p["text"] for p in posts] == ["post 4", "post 3", "post 2", "post 1", "post 0"]
+    assert posts[0]["book"]["title"] == "Dune" and posts[1]["book"] is None
+
+
+def test_serialize_groups_uses_constant_queries(session):
+    from sqlalchemy import event
+    from app.routers.groups_router import _serialize_groups
+
+    user = models.User(email="r@example.com", name="R", password_hash="x")
+    book = models.Book(title="Dune")
+    session.add_all([user, book])
+    session.commit()
+    groups = [models.ReadingGroup(name=f"G{i}", created_by=user.id, current_book_id=book.id) for i in range(5)]
+    session.add_all(groups)
+    session.commit()
+    for g in groups:
+        session.add(models.GroupMember(group_id=g.id, user_id=user.id, status="active", role="curator"))
+    session.commit()
+    for g in groups:
+        session.refresh(g)   # load expired attributes outside the counted window
+    user_id = user.id
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(session.get_bind(), "before_cursor_execute", listener)
+    try:
+        result = _serialize_groups(session, groups, user_id)
+    finally:
+        event.remove(session.get_bind(), "before_cursor_execute", listener)
+
+    assert len(statements) == 4
+    assert [r["member_count"] for r in result] == [1] * 5
+    assert all(r["membership_role"] == "curator" and r["current_book"]["title"] == "Dune" for r in result)
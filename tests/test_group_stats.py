@@ -0,0 +1,113 @@
+"""
+Tests for the incrementally maintained group leaderboard.
+Run: pytest tests/test_group_stats.py -v
+"""
+from datetime import datetime
+
+import pytest
+from sqlmodel import SQLModel, create_engine, Session, select
+from sqlmodel.pool import StaticPool
+
+from app import models
+from app import group_stats
+
+
+@pytest.fixture(name="session")
+def session_fixture():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+
+
+NOW = datetime(2026, 5, 20, 12, 0, 0)
+
+
+def seed(session: Session):
+    a = models.User(email="a@example.com", name="A", password_hash="x")
+    b = models.User(email="b@example.com", name="B", password_hash="x")
+    session.add_all([a, b])
+    session.commit()
+    group = models.ReadingGroup(name="Circle", created_by=a.id)
+    book = models.Book(title="Dune", total_pages=400)
+    session.add_all([group, book])
+    session.commit()
+    for user in (a, b):
+        session.add(models.GroupMember(group_id=group.id, user_id=user.id, status="active"))
+        group_stats.add_member_stats(session, group.id, user.id, now=NOW)
+    session.commit()
+    return a, b, group, book
+
+
+def test_incremental_updates_rank_members(session):
+    a, b, group, book = seed(session)
+    session.add(models.UserBook(user_id=b.id, book_id=book.id, status="reading", updated_at=NOW))
+    group_stats.on_status_change(session, b.id, None, "reading", now=NOW)
+    group_stats.record_pages_read(session, b.id, 120, now=NOW)
+    group_stats.record_pages_read(session, a.id, 30, now=NOW)
+    group_stats.on_status_change(session, a.id, "reading", "finished", now=NOW)
+    session.commit()
+
+    board = group_stats.leaderboard(session, group.id, "monthly", now=NOW)
+
+    assert [(r["name"], r["pages_read"], r["books_finished"], r["rank"]) for r in board] == [
+        ("B", 120, 0, 1), ("A", 30, 1, 2),
+    ]
+    assert board[0]["current_book"] == "Dune"
+
+
+def test_monthly_counters_roll_over(session):
+    a, b, group, _ = seed(session)
+    group_stats.record_pages_read(session, a.id, 50, now=NOW)
+    session.commit()
+
+    next_month = datetime(2026, 6, 2)
+    assert group_stats.leaderboard(session, group.id, "monthly", now=next_month)[0]["pages_read"] == 0
+    alltime = group_stats.leaderboard(session, group.id, "alltime", now=next_month)
+    assert alltime[0]["name"] == "A" and alltime[0]["pages_read"] == 50
+
+    group_stats.record_pages_read(session, a.id, 10, now=next_month)
+    session.commit()
+    row = session.exec(select(models.GroupMemberStats).where(models.GroupMemberStats.user_id == a.id)).one()
+    assert (row.pages_month, row.pages_alltime, row.month_key) == (10, 60, "2026-06")
+
+
+def test_rebuild_matches_source_tables(session):
+    a, b, group, book = seed(session)
+    ub = models.UserBook(user_id=a.id, book_id=book.id, status="finished", updated_at=NOW)
+    session.add(ub)
+    session.commit()
+    session.add(models.ReadingActivity(user_id=a.id, userbook_id=ub.id, date=NOW, pages_read=400))
+    session.commit()
+
+    assert group_stats.rebuild(session, group.id, now=NOW) == 2
+    board = group_stats.leaderboard(session, group.id, "monthly", now=NOW)
+    assert (board[0]["name"], board[0]["pages_read"], board[0]["books_finished"]) == ("A", 400, 1)
+
+
+def test_leaderboard_heals_only_missing_members(session, monkeypatch):
+    a, b, group, _ = seed(session)
+    group_stats.record_pages_read(session, a.id, 30, now=NOW)
+    c = models.User(email="c@example.com", name="C", password_hash="x")
+    session.add(c)
+    session.commit()
+    # Joined before the stats table existed: no row; A's row is left as it is
+    session.add(models.GroupMember(group_id=group.id, user_id=c.id, status="active"))
+    session.commit()
+    a_row_id = session.exec(select(models.GroupMemberStats.id).where(models.GroupMemberStats.user_id == a.id)).one()
+
+    # A concurrent reader stores C's row between our lookup and our insert
+    compute = group_stats._compute
+
+    def compute_after_concurrent_heal(db, user_ids, now):
+        db.add(models.GroupMemberStats(group_id=group.id, user_id=c.id, month_key="2026-05", pages_month=5))
+        db.flush()
+        return compute(db, user_ids, now)
+
+    monkeypatch.setattr(group_stats, "_compute", compute_after_concurrent_heal)
+    board = group_stats.leaderboard(session, group.id, "monthly", now=NOW)
+
+    assert [(r["name"], r["pages_read"]) for r in board] == [("A", 30), ("C", 5), ("B", 0)]
+    assert session.exec(select(models.GroupMemberStats.id).where(models.GroupMemberStats.user_id == a.id)).one() == a_row_id
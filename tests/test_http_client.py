@@ -0,0 +1,31 @@
+"""
+Tests for the shared outbound HTTP client.
+Run: pytest tests/test_http_client.py -v
+"""
+import asyncio
+
+from app import http_client
+
+
+def test_one_client_for_the_app_lifetime():
+    async def lifecycle():
+        await http_client.start()
+        first = http_client.get_client()
+        same = http_client.get_client()
+        await http_client.start()           # a second startup hook does not replace it
+        again = http_client.get_client()
+        await http_client.close()
+        return first, same, again
+
+    first, same, again = asyncio.run(lifecycle())
+
+    assert first is same is again
+    assert first.is_closed
+    assert http_client._client is None
+
+
+def test_per_call_timeout_keeps_connect_and_pool_limits():
+    t = http_client.timeout(10.0)
+    assert (t.read, t.connect, t.pool) == (10.0, http_client.CONNECT_TIMEOUT, http_client.CONNECT_TIMEOUT)
+    assert http_client.get_client().timeout.connect == http_client.CONNECT_TIMEOUT
+    asyncio.run(http_client.close())
@@ -0,0 +1,105 @@
+"""
+Tests for notification coalescing in the dispatcher.
+Run: pytest tests/test_notification_coalescing.py -v
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlmodel import SQLModel, create_engine, Session, select
+from sqlmodel.pool import StaticPool
+
+from app import models
+from app.notifications import coalesce, dispatcher
+
+
+@pytest.fixture(name="engine")
+def engine_fixture():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    SQLModel.metadata.create_all(engine)
+    return engine
+
+
+@pytest.fixture(name="session")
+def session_fixture(engine):
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture(name="pushes")
+def pushes_fixture(monkeypatch):
+    """Record pushes instead of sending them."""
+    sent = []
+    record = lambda db, user_id, title, body, data: sent.append((user_id, body))
+    monkeypatch.setattr(dispatcher, "send_expo_push", record)
+    monkeypatch.setattr(dispatcher, "send_web_push", lambda *a, **k: None)
+    monkeypatch.setattr("app.notifications.push_mobile.send_expo_push", record)
+    monkeypatch.setattr("app.notifications.push_web.send_web_push", lambda *a, **k: None)
+    coalesce._pending_digests.clear()
+    yield sent
+    coalesce._pending_digests.clear()
+
+
+def make_users(session: Session, n: int) -> list[models.User]:
+    users = [models.User(email=f"u{i}@example.com", name=f"User{i}", password_hash="x") for i in range(n)]
+    session.add_all(users)
+    session.commit()
+    return users
+
+
+def like(session, actor, owner, note_id=1):
+    return dispatcher.fire_event(
+        db=session, event_type="post_liked",
+        actor_id=actor.id, actor_name=actor.name,
+        recipient_ids=[owner.id], extra={"note_id": note_id},
+    )
+
+
+def test_likes_in_window_share_one_row_and_push(session, pushes):
+    owner, *likers = make_users(session, 4)
+
+    for liker in likers:
+        like(session, liker, owner)
+
+    logs = session.exec(select(models.NotificationLog)).all()
+    assert len(logs) == 1
+    assert logs[0].body == "User3 and 2 others liked your note"
+    assert logs[0].data["count"] == 3
+    assert len(pushes) == 1                       # only the first like pushed immediately
+    assert list(coalesce._pending_digests) == [logs[0].id]
+
+
+def test_repeat_actor_is_not_counted_twice(session, pushes):
+    owner, liker = make_users(session, 2)
+
+    like(session, liker, owner)
+    summary = like(session, liker, owner)
+
+    log = session.exec(select(models.NotificationLog)).one()
+    assert summary["coalesced"] == 1
+    assert log.data["count"] == 1
+    assert log.body == "User1 liked your note"
+
+
+def test_different_notes_are_separate_groups(session, pushes):
+    owner, a, b = make_users(session, 3)
+
+    like(session, a, owner, note_id=1)
+    like(session, b, owner, note_id=2)
+
+    assert len(session.exec(select(models.NotificationLog)).all()) == 2
+    assert len(pushes) == 2
+
+
+def test_digest_flushes_once_window_closes(engine, session, pushes, monkeypatch):
+    monkeypatch.setattr("app.database.engine", engine)
+    owner, a, b = make_users(session, 3)
+    like(session, a, owner)
+    like(session, b, owner)
+
+    assert coalesce.flush_coalesced_pushes(now=datetime.utcnow()) == 0
+    later = datetime.utcnow() + timedelta(seconds=601)
+    assert coalesce.flush_coalesced_pushes(now=later) == 1
+    assert pushes[-1] == (owner.id, "User2 and 1 other liked your note")
+    assert coalesce._pending_digests == {}
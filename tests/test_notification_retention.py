@@ -0,0 +1,82 @@
+"""
+Tests for the NotificationLog retention job.
+Run: pytest tests/test_notification_retention.py -v
+"""
+import gzip
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from sqlmodel import SQLModel, create_engine, Session, select
+from sqlmodel.pool import StaticPool
+
+from app import models
+from app.notifications.retention import prune_notification_log
+
+
+@pytest.fixture(name="session")
+def session_fixture():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+
+
+NOW = datetime(2026, 6, 1, 12, 0, 0)
+
+
+def seed_logs(session: Session, ages_in_days: list[int]) -> models.User:
+    user = models.User(email="reader@example.com", name="Reader", password_hash="x")
+    session.add(user)
+    session.commit()
+    for age in ages_in_days:
+        session.add(models.NotificationLog(
+            user_id=user.id, actor_id=None, event_type="new_follower",
+            title=f"{age} days old", body="b", data={"age": age},
+            sent_at=NOW - timedelta(days=age),
+        ))
+    session.commit()
+    return user
+
+
+def test_archive_mode_moves_old_rows_to_gzip(session, tmp_path):
+    seed_logs(session, [1, 10, 100, 200, 300])
+
+    run = prune_notification_log(
+        session, max_age_days=90, mode="archive", batch_size=2,
+        archive_dir=str(tmp_path), now=NOW,
+    )
+
+    assert run["rows_deleted"] == 3
+    assert run["rows_archived"] == 3
+    assert run["batches"] == 2
+    remaining = session.exec(select(models.NotificationLog)).all()
+    assert sorted(log.data["age"] for log in remaining) == [1, 10]
+
+    with gzip.open(run["archive_file"], "rt", encoding="utf-8") as f:
+        archived = [json.loads(line) for line in f]
+    assert sorted(r["data"]["age"] for r in archived) == [100, 200, 300]
+
+
+def test_delete_mode_writes_no_archive(session, tmp_path):
+    seed_logs(session, [5, 120])
+
+    run = prune_notification_log(
+        session, max_age_days=90, mode="delete", archive_dir=str(tmp_path), now=NOW,
+    )
+
+    assert run["rows_deleted"] == 1
+    assert run["archive_file"] is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_nothing_to_prune(session, tmp_path):
+    seed_logs(session, [1, 2])
+
+    run = prune_notification_log(session, max_age_days=90, archive_dir=str(tmp_path), now=NOW)
+
+    assert run["rows_deleted"] == 0
+    assert run["batches"] == 0
+    assert len(session.exec(select(models.NotificationLog)).all()) == 2
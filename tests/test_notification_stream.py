@@ -0,0 +1,56 @@
+"""
+Tests for the live notification hub behind GET /notifications/stream.
+Run: pytest tests/test_notification_stream.py -v
+"""
+import asyncio
+
+from app.notifications.live import NotificationHub
+
+
+def drain(queue: asyncio.Queue) -> list:
+    items = []
+    while not queue.empty():
+        items.append(queue.get_nowait())
+    return items
+
+
+def test_publish_reaches_only_the_recipient():
+    async def scenario():
+        hub = NotificationHub()
+        alice, bob = hub.subscribe(1), hub.subscribe(2)
+        hub.publish(1, "unread", {"unread": 3})
+        await asyncio.sleep(0)
+        return drain(alice.queue), drain(bob.queue)
+
+    alice_events, bob_events = asyncio.run(scenario())
+    assert alice_events == [("unread", {"unread": 3})]
+    assert bob_events == []
+
+
+def test_slow_consumer_gets_single_resync():
+    async def scenario():
+        hub = NotificationHub(queue_size=3)
+        sub = hub.subscribe(1)
+        for i in range(5):
+            hub.publish(1, "notification", {"id": i})
+        await asyncio.sleep(0)
+        return drain(sub.queue)
+
+    events = asyncio.run(scenario())
+    assert events[0] == ("resync", {})
+    assert ("notification", {"id": 4}) in events
+    assert len(events) <= 3
+
+
+def test_oldest_stream_evicted_beyond_cap():
+    async def scenario():
+        hub = NotificationHub(max_per_user=2)
+        first = hub.subscribe(1)
+        hub.subscribe(1)
+        hub.subscribe(1)
+        await asyncio.sleep(0)
+        return hub, drain(first.queue)
+
+    hub, first_events = asyncio.run(scenario())
+    assert first_events == [("close", {})]
+    assert hub.connection_count() == 2
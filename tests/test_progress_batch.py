@@ -0,0 +1,113 @@
+"""
+Tests for POST /userbooks/progress/batch (offline progress replay).
+Run: pytest tests/test_progress_batch.py -v
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlmodel import SQLModel, create_engine, Session, select
+from sqlmodel.pool import StaticPool
+
+from app import group_activity, models, reading_bitmap, reading_stats
+from app.routers import userbooks_router
+
+
+@pytest.fixture(name="session")
+def session_fixture():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    SQLModel.metadata.create_all(engine)
+    group_activity._membership_cache.clear()
+    with Session(engine) as session:
+        yield session
+    group_activity._membership_cache.clear()
+
+
+def test_batch_collapses_per_day_and_fires_once_per_book(session, monkeypatch):
+    fired = []
+    monkeypatch.setattr(userbooks_router, "fire_event", lambda **kw: fired.append(kw["extra"]["book_title"]))
+
+    reader = models.User(email="r@example.com", name="R", password_hash="x")
+    session.add(reader)
+    session.commit()
+    short, long_ = models.Book(title="Short", total_pages=100), models.Book(title="Long", total_pages=400)
+    group = models.ReadingGroup(name="G", created_by=reader.id)
+    session.add_all([short, long_, group])
+    session.commit()
+    ub1 = models.UserBook(user_id=reader.id, book_id=short.id, status="reading", current_page=10)
+    ub2 = models.UserBook(user_id=reader.id, book_id=long_.id, status="to-read", current_page=0)
+    session.add_all([ub1, ub2, models.GroupMember(group_id=group.id, user_id=reader.id, status="active")])
+    session.commit()
+
+    now = datetime.utcnow()
+    yesterday = (now - timedelta(days=1)).replace(hour=12, minute=0)
+    updates = [
+        {"userbook_id": ub1.id, "current_page": 40, "recorded_at": yesterday},
+        {"userbook_id": ub1.id, "current_page": 30, "recorded_at": yesterday - timedelta(minutes=5)},
+        {"userbook_id": ub1.id, "current_page": 100, "recorded_at": now - timedelta(seconds=2)},
+        {"userbook_id": ub1.id, "current_page": 100, "recorded_at": now - timedelta(seconds=1)},
+        {"userbook_id": ub2.id, "current_page": 50, "recorded_at": now - timedelta(seconds=3)},
+        {"userbook_id": ub2.id, "current_page": 220, "recorded_at": now - timedelta(seconds=1)},
+        {"userbook_id": 9999, "current_page": 5, "recorded_at": now},
+    ]
+
+    result = userbooks_router.update_progress_batch(
+        models.ProgressBatch(updates=updates), db=session, current_user=reader,
+    )
+
+    assert result["skipped"] == [9999]
+    assert {ub.id: (ub.status, ub.current_page) for ub in result["applied"]} == {
+        ub1.id: ("finished", 100), ub2.id: ("reading", 220),
+    }
+    rows = session.exec(select(models.ReadingActivity).order_by(models.ReadingActivity.date)).all()
+    assert sorted((r.userbook_id, r.date.date(), r.pages_read) for r in rows) == sorted([
+        (ub1.id, yesterday.date(), 30), (ub1.id, now.date(), 60), (ub2.id, now.date(), 220),
+    ])
+
+    events = session.exec(select(models.GroupActivity.event_type, models.GroupActivity.payload)).all()
+    assert sorted(e for e, _ in events) == ["book_finished", "milestone_reached"]
+    assert [p["pct"] for e, p in events if e == "milestone_reached"] == [25]
+    assert fired == ["Short"]
+
+    # Derived rows agree with a rebuild from ReadingActivity
+    stats = session.get(models.UserReadingStats, reader.id)
+    fresh = reading_stats.compute(session, reader.id)
+    assert (stats.daily_pages, stats.finished_this_year) == (fresh.daily_pages, fresh.finished_this_year)
+    assert reading_bitmap.streaks(session, reader.id)["current_streak"] == 2
+    assert reading_bitmap.get_year(session, reader.id, now.year).days == \
+        reading_bitmap.compute(session, reader.id, now.year).days
+
+
+def test_stale_replay_never_rolls_progress_back(session, monkeypatch):
+    monkeypatch.setattr(userbooks_router, "fire_event", lambda **kw: None)
+    reader = models.User(email="r@example.com", name="R", password_hash="x")
+    session.add(reader)
+    session.commit()
+    done, going = models.Book(title="Done", total_pages=300), models.Book(title="Going", total_pages=400)
+    session.add_all([done, going])
+    session.commit()
+    now = datetime.utcnow()
+    finished = models.UserBook(user_id=reader.id, book_id=done.id, status="finished", current_page=300,
+                               updated_at=now - timedelta(hours=1))
+    reading = models.UserBook(user_id=reader.id, book_id=going.id, status="reading", current_page=200,
+                              updated_at=now - timedelta(hours=1))
+    session.add_all([finished, reading])
+    session.commit()
+    session.add(models.UserReadingStats(user_id=reader.id, finished_year=now.year, finished_this_year=1,
+                                        daily_pages={}, monthly_pages={}))
+    session.commit()
+
+    two_days_ago = now - timedelta(days=2)
+    result = userbooks_router.update_progress_batch(models.ProgressBatch(updates=[
+        {"userbook_id": finished.id, "current_page": 120, "recorded_at": two_days_ago},
+        # Newer than the server copy, but behind it
+        {"userbook_id": reading.id, "current_page": 150, "recorded_at": now - timedelta(minutes=1)},
+    ]), db=session, current_user=reader)
+
+    assert result == {"applied": [], "skipped": sorted([finished.id, reading.id])}
+    assert (session.get(models.UserBook, finished.id).status, session.get(models.UserBook, finished.id).current_page) \
+        == ("finished", 300)
+    assert session.get(models.UserBook, reading.id).current_page == 200
+    assert session.get(models.UserReadingStats, reader.id).finished_this_year == 1
+    assert session.exec(select(models.ReadingActivity)).all() == []
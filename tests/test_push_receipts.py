@@ -0,0 +1,90 @@
+"""
+Tests for Expo ticket persistence and receipt polling.
+Run: pytest tests/test_push_receipts.py -v
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from exponent_server_sdk import PushReceipt, PushTicket
+from sqlmodel import SQLModel, create_engine, Session, select
+from sqlmodel.pool import StaticPool
+
+from app import models
+from app.notifications import push_mobile, receipts
+
+
+@pytest.fixture(name="engine")
+def engine_fixture(monkeypatch):
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    SQLModel.metadata.create_all(engine)
+    monkeypatch.setattr("app.database.engine", engine)
+    return engine
+
+
+def seed_user_with_tokens(session: Session, tokens: list[str]) -> models.User:
+    user = models.User(email="u@example.com", name="U", password_hash="x")
+    session.add(user)
+    session.commit()
+    for token in tokens:
+        session.add(models.PushToken(user_id=user.id, token=token))
+    session.commit()
+    return user
+
+
+def test_send_records_tickets_and_drops_rejected_tokens(engine, monkeypatch):
+    class FakeClient:
+        def publish_multiple(self, messages):
+            return [
+                PushTicket(m, "error", "gone", {"error": "DeviceNotRegistered"}, None)
+                if m.to == "ExponentPushToken[old]" else PushTicket(m, "ok", None, None, f"t-{m.to}")
+                for m in messages
+            ]
+
+    monkeypatch.setattr(push_mobile, "PushClient", FakeClient)
+    with Session(engine) as session:
+        user = seed_user_with_tokens(session, ["ExponentPushToken[a]", "ExponentPushToken[old]"])
+        push_mobile.send_expo_push(session, user.id, "T", "B", {})
+        session.commit()
+
+        tickets = session.exec(select(models.ExpoPushTicket)).all()
+        tokens = session.exec(select(models.PushToken.token)).all()
+    assert [t.ticket_id for t in tickets] == ["t-ExponentPushToken[a]"]
+    assert tokens == ["ExponentPushToken[a]"]
+
+
+def test_receipts_remove_unregistered_tokens_in_bulk(engine, monkeypatch):
+    requested = []
+
+    class FakeClient:
+        def check_receipts_multiple(self, tickets):
+            requested.append(len(tickets))
+            return [
+                PushReceipt(t.id, "error", "gone", {"error": "DeviceNotRegistered"})
+                if t.id.startswith("dead") else PushReceipt(t.id, "ok", None, None)
+                for t in tickets
+                if t.id != "pending"
+            ]
+
+    monkeypatch.setattr(receipts, "PushClient", FakeClient)
+    now = datetime.utcnow()
+    with Session(engine) as session:
+        seed_user_with_tokens(session, ["ExponentPushToken[ok]", "ExponentPushToken[d1]", "ExponentPushToken[d2]"])
+        receipts.record_tickets(session, [
+            ("ok-1", "ExponentPushToken[ok]", None),
+            ("dead-1", "ExponentPushToken[d1]", None),
+            ("dead-2", "ExponentPushToken[d2]", None),
+            ("pending", "ExponentPushToken[ok]", None),
+        ])
+        session.commit()
+
+    assert receipts.check_push_receipts(now=now)["checked"] == 0      # too fresh to have receipts
+
+    result = receipts.check_push_receipts(now=now + timedelta(minutes=20))
+
+    assert result == {"checked": 3, "tokens_removed": 2}
+    assert requested == [4]
+    with Session(engine) as session:
+        assert session.exec(select(models.PushToken.token)).all() == ["ExponentPushToken[ok]"]
+        assert session.exec(select(models.ExpoPushTicket.ticket_id)).all() == ["pending"]
@@ -0,0 +1,185 @@
+"""
+Tests for the /reading-activity endpoints.
+Run: pytest tests/test_reading_activity.py -v
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlmodel import SQLModel, create_engine, Session, select
+from sqlmodel.pool import StaticPool
+
+from app import models
+from app.routers.reading_activity_router import get_daily_reading_stats, get_user_daily_reading_stats
+
+
+@pytest.fixture(name="session")
+def session_fixture():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+
+
+def seed(session: Session):
+    reader = models.User(email="r@example.com", name="R", password_hash="x")
+    viewer = models.User(email="v@example.com", name="V", password_hash="x")
+    session.add_all([reader, viewer])
+    session.commit()
+    book = models.Book(title="Dune", total_pages=400)
+    session.add(book)
+    session.commit()
+    ub = models.UserBook(user_id=reader.id, book_id=book.id, status="reading")
+    session.add(ub)
+    session.commit()
+    return reader, viewer, ub
+
+
+def test_daily_stats_are_summed_per_day_and_zero_filled(session):
+    reader, viewer, ub = seed(session)
+    today = datetime.utcnow().replace(hour=12, minute=0, second=0, microsecond=0)
+    for when, pages in [(today, 10), (today.replace(hour=1), 5), (today - timedelta(days=2), 7),
+                        (today - timedelta(days=40), 99)]:
+        session.add(models.ReadingActivity(user_id=reader.id, userbook_id=ub.id, date=when, pages_read=pages))
+    session.commit()
+
+    stats = get_daily_reading_stats(days=3, db=session, current_user=reader)
+
+    assert stats["days"] == 3
+    assert [d["pages_read"] for d in stats["data"]] == [7, 0, 15]
+    assert stats["data"][-1]["date"] == today.date().isoformat()
+    # The profile view shares the same implementation
+    assert get_user_daily_reading_stats(reader.id, days=3, db=session, current_user=viewer) == stats
+
+
+def test_incremental_stats_match_reconciled_rebuild(session):
+    from app import reading_stats
+    from app.routers.reading_activity_router import get_reading_insights
+
+    reader, _, ub = seed(session)
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    # Two days of history before the stats row exists, then live updates for today
+    for days_ago, pages in [(2, 10), (1, 20)]:
+        session.add(models.ReadingActivity(user_id=reader.id, userbook_id=ub.id,
+                                           date=today - timedelta(days=days_ago), pages_read=pages))
+    session.commit()
+    assert sum(reading_stats.get_stats(session, reader.id).daily_pages.values()) == 30
+
+    session.add(models.ReadingActivity(user_id=reader.id, userbook_id=ub.id, date=today, pages_read=30))
+    reading_stats.record_pages_read(session, reader.id, 30)
+    ub.status, ub.updated_at = "finished", datetime.utcnow()
+    session.add(ub)
+    reading_stats.on_status_change(session, reader.id, "reading", "finished")
+    session.commit()
+
+    insights = get_reading_insights(db=session, current_user=reader)
+
+    assert insights["current_streak"] == 3 and insights["longest_streak"] == 3
+    assert insights["avg_pages_per_day"] == 2.0
+    assert insights["finished_this_year"] == 1 and insights["total_finished"] == 1
+    assert insights["total_pages_read"] == 400
+    assert reading_stats.reconcile(session) == {"checked": 1, "fixed": 0}
+
+
+def test_bitmap_streaks_cross_new_year_and_heatmap(session):
+    from datetime import date
+    from app import reading_bitmap
+
+    reader, _, ub = seed(session)
+    # Dec 30 – Jan 2 is one streak over the year boundary; Jan 4 starts another
+    for d, pages in [(date(2025, 12, 30), 5), (date(2025, 12, 31), 6), (date(2026, 1, 1), 7),
+                     (date(2026, 1, 2), 8), (date(2026, 1, 4), 9), (date(2025, 6, 1), 1)]:
+        session.add(models.ReadingActivity(user_id=reader.id, userbook_id=ub.id,
+                                           date=datetime(d.year, d.month, d.day), pages_read=pages))
+    session.commit()
+
+    assert reading_bitmap.streaks(session, reader.id, today=date(2026, 1, 2)) == {
+        "current_streak": 4, "longest_streak": 4,
+    }
+    assert reading_bitmap.streaks(session, reader.id, today=date(2026, 1, 3))["current_streak"] == 0
+
+    # Live write for Jan 5 extends the new run
+    reading_bitmap.record_pages_read(session, reader.id, 11, now=datetime(2026, 1, 5, 9))
+    session.commit()
+    assert reading_bitmap.streaks(session, reader.id, today=date(2026, 1, 5))["current_streak"] == 2
+
+    heat = reading_bitmap.heatmap(session, reader.id, 2026)
+    assert len(heat["days"]) == 365
+    assert heat["active_days"] == 4 and heat["total_pages"] == 7 + 8 + 9 + 11
+    assert heat["days"][3] == {"date": "2026-01-04", "pages_read": 9}
+
+
+@pytest.mark.parametrize("dialect", ["sqlite", "other"])
+def test_log_pages_read_upserts_one_row_per_book_and_day(session, monkeypatch, dialect):
+    from app import crud
+
+    if dialect == "other":      # no ON CONFLICT: the SELECT-then-write fallback
+        monkeypatch.setattr(session.get_bind().dialect, "name", "mssql")
+    reader, _, ub = seed(session)
+    day = datetime.utcnow().date()
+    crud.log_pages_read(session, user_id=reader.id, userbook_id=ub.id, day=day, pages_read=10, current_page=10)
+    crud.log_pages_read(session, user_id=reader.id, userbook_id=ub.id, day=day, pages_read=5, current_page=15)
+    crud.log_pages_read(session, user_id=reader.id, userbook_id=ub.id, day=day - timedelta(days=1),
+                        pages_read=3, current_page=3)
+    session.commit()
+
+    rows = session.exec(
+        select(models.ReadingActivity).order_by(models.ReadingActivity.day)
+    ).all()
+    assert [(r.day, r.pages_read, r.current_page) for r in rows] == [
+        (day - timedelta(days=1), 3, 3), (day, 15, 15),
+    ]
+    assert rows[1].date == datetime(day.year, day.month, day.day)
+
+
+def test_finishing_a_book_without_a_stats_row_counts_it_once(session):
+    from app import reading_stats
+    from app.models import UserBookProgress
+    from app.routers.userbooks_router import update_progress
+
+    reader, _, ub = seed(session)
+    ub.current_page = 390
+    session.add(ub)
+    session.commit()
+    assert session.get(models.UserReadingStats, reader.id) is None
+
+    update_progress(ub.id, UserBookProgress(current_page=400), db=session, current_user=reader)
+
+    row = session.get(models.UserReadingStats, reader.id)
+    assert row.finished_this_year == 1
+    assert row.daily_pages == {datetime.utcnow().date().isoformat(): 10}
+    assert reading_stats.reconcile(session) == {"checked": 1, "fixed": 0}
+
+
+def test_bitmap_reads_store_no_empty_rows_and_concurrent_seed_is_merged(session, monkeypatch):
+    from datetime import date
+    from app import reading_bitmap
+
+    reader, _, ub = seed(session)
+    reading_bitmap.heatmap(session, reader.id, 1970)
+    assert reading_bitmap.streaks(session, reader.id, today=date(2026, 3, 1)) == {
+        "current_streak": 0, "longest_streak": 0,
+    }
+    assert session.exec(select(models.ReadingDayBitmap)).all() == []
+
+    # Another request stored the 2026 row between our lookup and our seed
+    session.add(models.ReadingActivity(user_id=reader.id, userbook_id=ub.id,
+                                       date=datetime(2026, 3, 1, 8), pages_read=5))
+    session.commit()
+    reading_bitmap.get_year(session, reader.id, 2026)
+    session.add(models.ReadingActivity(user_id=reader.id, userbook_id=ub.id,
+                                       date=datetime(2026, 3, 2, 8), pages_read=7))
+    lookups, real_row = [], reading_bitmap._row
+
+    def row_missing_on_first_lookup(db, user_id, year):
+        lookups.append(year)
+        return None if len(lookups) == 1 else real_row(db, user_id, year)
+
+    monkeypatch.setattr(reading_bitmap, "_row", row_missing_on_first_lookup)
+    reading_bitmap.record_pages_read(session, reader.id, 7, now=datetime(2026, 3, 2, 8))
+    session.commit()
+
+    heat = reading_bitmap.heatmap(session, reader.id, 2026)
+    assert heat["active_days"] == 2 and heat["total_pages"] == 12
+    assert len(session.exec(select(models.ReadingDayBitmap)).all()) == 1